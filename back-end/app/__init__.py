@@ -1,41 +1,86 @@
+import importlib
+import time
+
 from flask import Flask
 from .config import get_config
-from .routes.products_routes import products_bp
-from .routes.inventory_routes import inventory_bp
-from .routes.employees_routes import employees_bp
-from .routes.orders_routes import orders_bp
-from .routes.reports_routes import reports_bp
-from .routes.meta_routes import meta_bp
-from .routes.translate_routes import translate_bp
-from .routes.auth_routes import auth_bp
 from .utils.errors import register_error_handlers
+from .utils import compression, json_provider, metrics, timing
 from .db import init_db
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+# (module, blueprint attribute, url prefix). Route modules (and the services they pull
+# in) are imported by create_app, not by `import app`, so the cost shows up per module
+# in the startup report (/api/meta/startup).
+BLUEPRINTS = [
+    ("app.routes.products_routes", "products_bp", "/api/products"),
+    ("app.routes.inventory_routes", "inventory_bp", "/api/inventory"),
+    ("app.routes.employees_routes", "employees_bp", "/api/employees"),
+    ("app.routes.orders_routes", "orders_bp", "/api/orders"),
+    ("app.routes.reports_routes", "reports_bp", "/api/reports"),
+    ("app.routes.meta_routes", "meta_bp", "/api/meta"),
+    ("app.routes.translate_routes", "translate_bp", "/api/translate"),
+    ("app.routes.auth_routes", "auth_bp", "/api/auth"),
+]
+
+
+def _ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000.0, 3)
+
+
+def _register_blueprints(app, report):
+    # The first module to import a shared dependency is charged for it
+    for module_name, attr, prefix in BLUEPRINTS:
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        app.register_blueprint(getattr(module, attr), url_prefix=prefix)
+        report[module_name.rsplit(".", 1)[-1]] = _ms(started)
+
 
 def create_app(env_name: str = "dev"):
+    started = time.perf_counter()
     app = Flask(__name__)
     app.config.from_mapping(get_config(env_name))
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
+    # orjson-backed jsonify when available; dates/datetimes go out as ISO 8601
+    json_provider.init_app(app)
+    # The kiosk echoes X-DB-Primary-Until back (read-your-writes with replicas, app/db/routing.py)
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=["X-DB-Primary-Until"])
+    # Trust X-Forwarded-For only from the configured number of reverse proxies
+    if app.config.get("TRUSTED_PROXY_HOPS"):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["TRUSTED_PROXY_HOPS"])
+    startup = app.extensions.setdefault("startup", {})
+    phases = startup.setdefault("phases_ms", {})
+    phases["config"] = _ms(started)
 
     # initialize db (engine/session etc.)
+    t = time.perf_counter()
     init_db(app)
+    phases["init_db"] = _ms(t)
 
     # register blueprints under /api/*
-    app.register_blueprint(products_bp, url_prefix="/api/products")
-    app.register_blueprint(inventory_bp, url_prefix="/api/inventory")
-    app.register_blueprint(employees_bp, url_prefix="/api/employees")
-    app.register_blueprint(orders_bp, url_prefix="/api/orders")
-    app.register_blueprint(reports_bp, url_prefix="/api/reports")
-    app.register_blueprint(meta_bp, url_prefix="/api/meta")
-    app.register_blueprint(translate_bp, url_prefix="/api/translate")
-    app.register_blueprint(auth_bp, url_prefix="/api/auth")
+    t = time.perf_counter()
+    _register_blueprints(app, startup.setdefault("blueprints_ms", {}))
+    phases["blueprints"] = _ms(t)
 
     # centralize error -> JSON
     register_error_handlers(app)
 
+    # per-route latency/status/in-flight metrics (scraped at /api/meta/metrics)
+    metrics.init_app(app)
+    # sampled Server-Timing phase breakdowns (checkout)
+    timing.init_app(app)
+    # background parsing of order-line customizations (/api/reports/modifiers)
+    from .services import modifier_service
+    modifier_service.init_app(app)
+    # gzip/br/zstd negotiation; registered last so it runs first and is inside the latency metrics
+    compression.init_app(app)
+
     # Add root route for health check
     @app.route('/')
     def root():
         return {"ok": True, "message": "KungFu Tea POS API is running", "version": "1.0"}, 200
 
-    return app
\ No newline at end of file
+    startup["total_ms"] = _ms(started)
+    print(f"✓ App ready in {startup['total_ms']:.0f} ms "
+          f"(db {phases['init_db']:.0f} ms, blueprints {phases['blueprints']:.0f} ms)")
+    return app
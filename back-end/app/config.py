@@ -1,5 +1,93 @@
 import os
 
+def _feature_settings():
+    # Tunables shared by every environment (override via environment variables)
+    return {
+        # Languages /api/products/menu?lang= builds and caches (anything else is a 400)
+        "MENU_LANGUAGES": [l.strip().lower() for l in os.getenv("MENU_LANGUAGES", "en,es,zh,vi,ko,fr").split(",") if l.strip()],
+        # Periodic recompute of running counters to correct drift (0 disables)
+        "COUNTER_RECONCILE_SECONDS": int(os.getenv("COUNTER_RECONCILE_SECONDS", "600")),
+        # Readiness probe: background SELECT 1 interval and degradation thresholds
+        "HEALTH_PROBE_SECONDS": float(os.getenv("HEALTH_PROBE_SECONDS", "5")),
+        "READY_POOL_SATURATION": float(os.getenv("READY_POOL_SATURATION", "0.9")),
+        "READY_MAX_P95_MS": float(os.getenv("READY_MAX_P95_MS", "500")),
+        # Opt-in SQL profiler: per-request query counts, slowest statements, N+1 detection
+        "SQL_PROFILER_ENABLED": os.getenv("SQL_PROFILER_ENABLED", "").lower() in ("1", "true", "yes"),
+        "SQL_PROFILER_N_PLUS_ONE": int(os.getenv("SQL_PROFILER_N_PLUS_ONE", "3")),
+        "SQL_PROFILER_HISTORY": int(os.getenv("SQL_PROFILER_HISTORY", "200")),
+        # Fraction of checkouts that get a Server-Timing phase breakdown (0 disables, 1 = all)
+        "SERVER_TIMING_SAMPLE_RATE": float(os.getenv("SERVER_TIMING_SAMPLE_RATE", "0.1")),
+        # JSON encoder for responses: auto (orjson if installed), orjson or stdlib
+        "JSON_ENCODER": os.getenv("JSON_ENCODER", "auto"),
+        # Negotiated gzip/brotli/zstd for text/JSON bodies of at least COMPRESS_MIN_BYTES
+        "COMPRESS_ENABLED": os.getenv("COMPRESS_ENABLED", "1").lower() in ("1", "true", "yes"),
+        "COMPRESS_MIN_BYTES": int(os.getenv("COMPRESS_MIN_BYTES", "1024")),
+        "COMPRESS_GZIP_LEVEL": int(os.getenv("COMPRESS_GZIP_LEVEL", "6")),
+        # Compressed bodies kept for responses with an ETag (e.g. the menu)
+        "COMPRESS_CACHE_ENTRIES": int(os.getenv("COMPRESS_CACHE_ENTRIES", "64")),
+        # Rendered receipts kept per order id; width in characters (42 fits 80mm Font A with margins)
+        "RECEIPT_CACHE_ENTRIES": int(os.getenv("RECEIPT_CACHE_ENTRIES", "2048")),
+        "RECEIPT_WIDTH": int(os.getenv("RECEIPT_WIDTH", "42")),
+        "RECEIPT_HEADER": os.getenv("RECEIPT_HEADER", "KungFu Tea"),
+        "RECEIPT_FOOTER": os.getenv("RECEIPT_FOOTER", "Thank you!"),
+        # Live order feed (SSE): ring buffer size for Last-Event-ID resume, keep-alive interval,
+        # and how long one stream stays open before the client is told to reconnect
+        "ORDER_EVENTS_HISTORY": int(os.getenv("ORDER_EVENTS_HISTORY", "1000")),
+        "SSE_HEARTBEAT_SECONDS": float(os.getenv("SSE_HEARTBEAT_SECONDS", "15")),
+        "SSE_MAX_STREAM_SECONDS": float(os.getenv("SSE_MAX_STREAM_SECONDS", "3600")),
+        # Live dashboard (/api/reports/live): how often the in-memory buckets are re-read
+        # from the database to pick up other workers' orders (0 = only on day change / Z close)
+        "DASHBOARD_RECONCILE_SECONDS": float(os.getenv("DASHBOARD_RECONCILE_SECONDS", "60")),
+        # Group commit: checkouts are committed in micro-batches by one writer thread
+        # (at most GROUP_COMMIT_MAX_BATCH orders, waiting up to GROUP_COMMIT_MAX_WAIT_MS for more)
+        "GROUP_COMMIT_ENABLED": os.getenv("GROUP_COMMIT_ENABLED", "").lower() in ("1", "true", "yes"),
+        "GROUP_COMMIT_MAX_BATCH": int(os.getenv("GROUP_COMMIT_MAX_BATCH", "32")),
+        "GROUP_COMMIT_MAX_WAIT_MS": float(os.getenv("GROUP_COMMIT_MAX_WAIT_MS", "2")),
+        # Longest a checkout waits for its batch before failing with 503
+        "GROUP_COMMIT_TIMEOUT_SECONDS": float(os.getenv("GROUP_COMMIT_TIMEOUT_SECONDS", "10")),
+        # Read replicas (DATABASE_REPLICA_URLS): clients stay on the primary this long after a write
+        "READ_REPLICA_PIN_SECONDS": float(os.getenv("READ_REPLICA_PIN_SECONDS", "5")),
+        # Reverse proxies in front of the app whose X-Forwarded-For is trusted (0 = use the peer address)
+        "TRUSTED_PROXY_HOPS": int(os.getenv("TRUSTED_PROXY_HOPS", "0")),
+        # Order archival (scripts/order_partitions.py): archive files location (default
+        # <instance>/archive) and how many months, counting the current one, stay in the database
+        "ORDER_ARCHIVE_DIR": os.getenv("ORDER_ARCHIVE_DIR") or None,
+        "ARCHIVE_KEEP_MONTHS": int(os.getenv("ARCHIVE_KEEP_MONTHS", "13")),
+        # Columnar snapshot for ?source=snapshot (scripts/export_snapshot.py): location (default
+        # <instance>/snapshot) and how many exported versions to keep on disk
+        "SNAPSHOT_DIR": os.getenv("SNAPSHOT_DIR") or None,
+        "SNAPSHOT_KEEP": int(os.getenv("SNAPSHOT_KEEP", "2")),
+        # Range reports on SQLite: processes to split long windows across (1 = off), and the
+        # shortest window (days) worth sharding (app/services/shard_service.py)
+        "REPORT_PARALLELISM": int(os.getenv("REPORT_PARALLELISM", "1")),
+        "REPORT_SHARD_MIN_DAYS": float(os.getenv("REPORT_SHARD_MIN_DAYS", "31")),
+        # Background parsing of order-line customizations into orderitem_modifier (0 disables)
+        "MODIFIER_INDEX_SECONDS": float(os.getenv("MODIFIER_INDEX_SECONDS", "60")),
+        # Federated reports (?stores=): answer deadline per request, shared query threads, and
+        # queries one store may be running at once (more are reported busy)
+        "STORE_DATABASE_URLS": _store_urls(),
+        "FEDERATED_STORE_TIMEOUT_SECONDS": float(os.getenv("FEDERATED_STORE_TIMEOUT_SECONDS", "5")),
+        "FEDERATED_MAX_WORKERS": int(os.getenv("FEDERATED_MAX_WORKERS", "8")),
+        "FEDERATED_STORE_CONCURRENCY": int(os.getenv("FEDERATED_STORE_CONCURRENCY", "2")),
+    }
+
+def _replica_binds():
+    # Comma-separated replica URLs become binds replica_0, replica_1, ... (see app/db/routing.py)
+    urls = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    return {"SQLALCHEMY_BINDS": {f"replica_{i}": url for i, url in enumerate(urls)}} if urls else {}
+
+def _store_urls():
+    # Comma-separated "name=url" pairs (a bare url is named store_<n>); see app/services/federation_service.py
+    stores = {}
+    for n, entry in enumerate(e.strip() for e in os.getenv("STORE_DATABASE_URLS", "").split(",")):
+        if not entry:
+            continue
+        name, sep, url = entry.partition("=")
+        if not sep or "://" in name:
+            name, url = f"store_{n}", entry
+        stores[name.strip()] = url.strip()
+    return stores
+
 def get_config(env_name: str):
     # Get PostgreSQL connection details from environment or use defaults
     # These credentials should match your team's database setup
@@ -26,7 +114,9 @@ def get_config(env_name: str):
             "SQLALCHEMY_ENGINE_OPTIONS": {
                 "pool_pre_ping": True,  # Verify connections before using
                 "pool_recycle": 300,  # Recycle connections after 5 minutes
-            }
+            },
+            **_replica_binds(),
+            **_feature_settings(),
         }
 
     # prod example -> use Postgres (matches Java's Postgres idea)
@@ -45,7 +135,9 @@ def get_config(env_name: str):
                 "pool_recycle": 300,
                 "pool_size": 10,
                 "max_overflow": 20,
-            }
+            },
+            **_replica_binds(),
+            **_feature_settings(),
         }
 
     raise ValueError(f"Unknown env_name: {env_name}")
\ No newline at end of file
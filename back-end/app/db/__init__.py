@@ -1,16 +1,43 @@
+import time
+
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from .routing import RoutingSession
+
+# RoutingSession sends read-only requests to a replica when DATABASE_REPLICA_URLS is set
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 def init_db(app):
     db.init_app(app)
+    startup = app.extensions.setdefault("startup", {})
     with app.app_context():
         from . import models  # make sure models are registered
+        from . import instrumentation, profiler, routing
+
+        engines = list(db.engines.values())
+        # statement latency hooks feed /api/meta/ready and metrics
+        for engine in engines:
+            instrumentation.install(engine)
+        # opt-in per-request query profiler (SQL_PROFILER_ENABLED)
+        profiler.init_app(app, *engines)
+        # read-only routes to replicas, pinned to the primary after a write
+        routing.init_app(app)
+        if app.extensions["db_replicas"]:
+            print(f"✓ Read replicas: {', '.join(app.extensions['db_replicas'])}")
 
         # Only create tables if using SQLite (local dev fallback)
         # PostgreSQL tables should already exist from Java schema
         if "sqlite" in app.config.get("SQLALCHEMY_DATABASE_URI", ""):
-            db.create_all()
-            print("✓ SQLite tables created/verified")
+            from .schema import ensure_schema, SCHEMA_VERSION
+
+            started = time.perf_counter()
+            status = ensure_schema(db)
+            startup["schema"] = {"status": status, "version": SCHEMA_VERSION,
+                                 "ms": round((time.perf_counter() - started) * 1000.0, 3)}
+            if status == "created":
+                print("✓ SQLite tables created/verified")
+            else:
+                print(f"✓ SQLite schema v{SCHEMA_VERSION} up to date")
         else:
-            print("✓ Connected to PostgreSQL (using existing schema)")
\ No newline at end of file
+            startup["schema"] = {"status": "external"}
+            print("✓ Connected to PostgreSQL (using existing schema)")
@@ -0,0 +1,92 @@
+"""
+SQLAlchemy engine instrumentation: recent statement latencies and pool status.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+# Latencies (ms) of the most recent statements executed through the engine
+RECENT_QUERY_WINDOW = 1000
+_recent_latencies_ms: deque = deque(maxlen=RECENT_QUERY_WINDOW)
+_installed_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000.0
+    _recent_latencies_ms.append(elapsed_ms)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't fire for a failed statement; drop its start time
+    conn = exception_context.connection
+    starts = conn.info.get("query_start_time") if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def install(engine) -> None:
+    """Attach the cursor timing hooks to engine (idempotent)."""
+    with _installed_lock:
+        if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            return
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+def query_latency_percentiles() -> Dict[str, float]:
+    """p50/p95/p99 (ms) over the last RECENT_QUERY_WINDOW statements."""
+    values = sorted(list(_recent_latencies_ms))
+    return {
+        "samples": len(values),
+        "p50_ms": round(_percentile(values, 50), 3),
+        "p95_ms": round(_percentile(values, 95), 3),
+        "p99_ms": round(_percentile(values, 99), 3),
+    }
+
+
+def pool_status(engine) -> Dict[str, Optional[int]]:
+    """Checked-out/overflow counts for the engine's pool (None where the pool type doesn't track it)."""
+    pool = engine.pool
+
+    def _call(name):
+        fn = getattr(pool, name, None)
+        try:
+            return int(fn()) if callable(fn) else None
+        except Exception:
+            return None
+
+    size = _call("size")
+    overflow = _call("overflow")
+    max_overflow = getattr(pool, "_max_overflow", None)
+    capacity = None
+    if size is not None and max_overflow is not None and max_overflow >= 0:
+        capacity = size + max_overflow
+
+    return {
+        "pool": type(pool).__name__,
+        "size": size,
+        "checked_out": _call("checkedout"),
+        "checked_in": _call("checkedin"),
+        # QueuePool counts unopened slots as negative overflow; report only real overflow
+        "overflow": max(0, overflow) if overflow is not None else None,
+        "max_overflow": max_overflow,
+        "capacity": capacity,
+    }
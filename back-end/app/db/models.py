@@ -56,10 +56,11 @@ class Order(db.Model):
     subtotal = db.Column(db.Float, nullable=False)
     tax = db.Column(db.Float, nullable=False)
     total = db.Column(db.Float, nullable=False)
-    order_time = db.Column("ordertime", db.DateTime, default=datetime.utcnow)  # PostgreSQL uses camelCase
+    order_time = db.Column("ordertime", db.DateTime, default=datetime.utcnow, index=True)  # PostgreSQL uses camelCase
     status = db.Column(db.String, default="Complete")
-    items = db.relationship("OrderItem", backref="order", cascade="all, delete-orphan", lazy="selectin")
-    payments = db.relationship("Payment", backref="order", cascade="all, delete-orphan", lazy="selectin")
+    # Children load on access; list/detail routes ask for them with selectinload()
+    items = db.relationship("OrderItem", backref="order", cascade="all, delete-orphan", lazy="select")
+    payments = db.relationship("Payment", backref="order", cascade="all, delete-orphan", lazy="select")
 
 class OrderItem(db.Model):
     __tablename__ = "orderitem"
@@ -77,17 +78,32 @@ class OrderItem(db.Model):
     )  # PostgreSQL uses camelCase
     quantity = db.Column(db.Integer, nullable=False)
     customizations = db.Column(db.String)  # "50% ice, oat milk, boba"
-    product = db.relationship("Product", lazy="joined")
+    # Prices at sale time (size delta included); rows written before these columns
+    # existed are filled by scripts/backfill_orderitem_prices.py
+    unit_price = db.Column("unitprice", db.Float, nullable=True)
+    line_price = db.Column("lineprice", db.Float, nullable=True)
+    product = db.relationship("Product", lazy="select")
 
-    @property
-    def line_price(self):
-        """
-        OrderItem rows in the legacy schema don't store line prices.
-        Compute it dynamically based on the current product base price.
-        """
-        if not self.product or self.product.base_price is None:
-            return None
-        return round(float(self.product.base_price) * self.quantity, 2)
+class Modifier(db.Model):
+    """One option key from /api/meta/options, e.g. ("toppings", "boba") or ("ice_levels", "50%")"""
+    __tablename__ = "modifier"
+    id = db.Column(db.SmallInteger, primary_key=True)
+    option_group = db.Column("optiongroup", db.String, nullable=False)  # MENU_OPTIONS key
+    option_key = db.Column("optionkey", db.String, nullable=False)
+    label = db.Column(db.String, nullable=False)
+    __table_args__ = (db.UniqueConstraint("optiongroup", "optionkey", name="uq_modifier_option"),)
+
+class OrderItemModifier(db.Model):
+    """Parsed customizations of an order line (see services/modifier_service.py)"""
+    __tablename__ = "orderitem_modifier"
+    order_id = db.Column("orderid", db.Integer, primary_key=True)
+    product_id = db.Column("productid", db.Integer, primary_key=True)
+    modifier_id = db.Column("modifierid", db.SmallInteger, db.ForeignKey("modifier.id"), primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False)  # the line's quantity, so totals need no join to orderitem
+    __table_args__ = (
+        db.ForeignKeyConstraint(["orderid", "productid"], ["orderitem.orderid", "orderitem.productid"]),
+        db.Index("ix_orderitem_modifier_modifier", "modifierid", "orderid", "quantity"),  # covering
+    )
 
 class Payment(db.Model):
     __tablename__ = "payment"  # PostgreSQL uses 'payment' not 'payments'
@@ -102,6 +118,7 @@ class Payment(db.Model):
         db.DateTime,
         primary_key=True,
         default=datetime.utcnow,
+        index=True,
     )  # PostgreSQL uses camelCase
     amount_paid = db.Column("amountpaid", db.Float, nullable=False)  # PostgreSQL uses camelCase
     payment_method = db.Column("paymentmethod", db.String, nullable=False)  # PostgreSQL uses camelCase
@@ -111,3 +128,16 @@ class ZClosure(db.Model):
     __tablename__ = "z_closure"
     id = db.Column(db.Integer, primary_key=True)
     closed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RunningCounter(db.Model):
+    """Maintained running totals (see services/counters_service.py)"""
+    __tablename__ = "running_counter"
+    name = db.Column(db.String, primary_key=True)  # e.g. "orders_total", "revenue:2025-11-02"
+    value = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SchemaVersion(db.Model):
+    """Stamp of the model schema last created on SQLite (see db/schema.py)"""
+    __tablename__ = "schema_version"
+    version = db.Column(db.Integer, primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,134 @@
+"""
+Opt-in SQL profiler (SQL_PROFILER_ENABLED=1).
+
+Hooks cursor execution to record, per request, the number of statements, total
+DB time and the slowest statements. Statements that repeat with the same shape
+(literals/IN-lists stripped) SQL_PROFILER_N_PLUS_ONE or more times in one request
+are flagged as N+1. Results go out as X-DB-* response headers and into a ring
+buffer served by GET /api/meta/profiler.
+"""
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+SLOWEST_PER_REQUEST = 5
+
+_history: deque = deque(maxlen=200)
+_installed_lock = threading.Lock()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s)(?:\s*,\s*(?:\?|%\(\w+\)s|%s))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so repeats with different literals/IN-list sizes compare equal."""
+    s = _WHITESPACE.sub(" ", statement.strip())
+    s = _STRING_LITERAL.sub("?", s)
+    s = _NUMBER_LITERAL.sub("?", s)
+    return _PARAM_LIST.sub("(?...)", s)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "_sql_profile" in g:
+        conn.info.setdefault("profiler_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not (has_request_context() and "_sql_profile" in g):
+        return
+    starts = conn.info.get("profiler_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000.0
+
+    prof = g._sql_profile
+    prof["count"] += 1
+    prof["total_ms"] += elapsed_ms
+    shape = statement_shape(statement)
+    entry = prof["shapes"].setdefault(shape, [0, 0.0])
+    entry[0] += 1
+    entry[1] += elapsed_ms
+
+    slowest = prof["slowest"]
+    if len(slowest) < SLOWEST_PER_REQUEST or elapsed_ms > slowest[-1][0]:
+        slowest.append((elapsed_ms, _WHITESPACE.sub(" ", statement.strip())))
+        slowest.sort(key=lambda t: t[0], reverse=True)
+        del slowest[SLOWEST_PER_REQUEST:]
+
+
+def _summarize(prof: Dict[str, Any], threshold: int, status: int) -> Dict[str, Any]:
+    n_plus_one = [
+        {"statement": shape, "count": cnt, "total_ms": round(total, 3)}
+        for shape, (cnt, total) in prof["shapes"].items()
+        if cnt >= threshold
+    ]
+    n_plus_one.sort(key=lambda e: e["count"], reverse=True)
+    return {
+        "at": datetime.utcnow().isoformat() + "Z",
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "endpoint": request.endpoint,
+        "status": status,
+        "query_count": prof["count"],
+        "db_time_ms": round(prof["total_ms"], 3),
+        "slowest": [{"ms": round(ms, 3), "statement": stmt} for ms, stmt in prof["slowest"]],
+        "n_plus_one": n_plus_one,
+    }
+
+
+def history(n_plus_one_only: bool = False) -> List[Dict[str, Any]]:
+    """Most recent profiled requests first."""
+    rows = list(_history)
+    rows.reverse()
+    if n_plus_one_only:
+        rows = [r for r in rows if r["n_plus_one"]]
+    return rows
+
+
+def clear() -> None:
+    _history.clear()
+
+
+def is_enabled() -> bool:
+    return bool(current_app.config.get("SQL_PROFILER_ENABLED"))
+
+
+def init_app(app, *engines) -> None:
+    """Install the profiler on engines if SQL_PROFILER_ENABLED is set."""
+    if not app.config.get("SQL_PROFILER_ENABLED"):
+        return
+
+    global _history
+    _history = deque(maxlen=int(app.config.get("SQL_PROFILER_HISTORY", 200)))
+    threshold = int(app.config.get("SQL_PROFILER_N_PLUS_ONE", 3))
+
+    with _installed_lock:
+        for engine in engines:
+            if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+                event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def _profile_start():
+        g._sql_profile = {"count": 0, "total_ms": 0.0, "shapes": {}, "slowest": []}
+
+    @app.after_request
+    def _profile_finish(response):
+        prof = g.pop("_sql_profile", None)
+        if prof is None:
+            return response
+        summary = _summarize(prof, threshold, response.status_code)
+        response.headers["X-DB-Query-Count"] = str(summary["query_count"])
+        response.headers["X-DB-Time-Ms"] = f"{summary['db_time_ms']:.3f}"
+        if summary["n_plus_one"]:
+            response.headers["X-DB-N-Plus-One"] = str(len(summary["n_plus_one"]))
+        _history.append(summary)
+        return response
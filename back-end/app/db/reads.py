@@ -0,0 +1,172 @@
+"""
+Core read path for list/detail endpoints.
+
+Each entity has a slotted row type filled positionally from a Core select()
+(no ORM instances, no identity map) and one serializer that turns it into the
+API dict. The serializers only read attributes, so routes that just updated an
+ORM instance can pass it to the same function and return the same shape.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+
+from . import db
+from .models import Cashier, InventoryItem, Product, ProductIngredient
+
+
+# --- inventory ------------------------------------------------------------
+
+@dataclass(slots=True)
+class InventoryRow:
+    id: int
+    item_name: str
+    current_stock: float
+    min_threshold: float
+    unit: str
+    last_restock_date: Optional[date]
+
+
+_INVENTORY_COLS = (
+    InventoryItem.id, InventoryItem.item_name, InventoryItem.current_stock,
+    InventoryItem.min_threshold, InventoryItem.unit, InventoryItem.last_restock_date,
+)
+
+
+def inventory_dict(r) -> Dict[str, Any]:
+    # shape this similar to Manager Inventory table in Java app
+    return {
+        "id": r.id,
+        "item_name": r.item_name,
+        "current_stock": r.current_stock,
+        "min_threshold": r.min_threshold,
+        "unit": r.unit,
+        "last_restock_date": r.last_restock_date,
+    }
+
+
+def inventory_rows() -> List[InventoryRow]:
+    result = db.session.execute(select(*_INVENTORY_COLS).order_by(InventoryItem.id))
+    return [InventoryRow(*r) for r in result]
+
+
+def low_stock_rows() -> List[InventoryRow]:
+    """At or below threshold, most urgent first."""
+    result = db.session.execute(
+        select(*_INVENTORY_COLS)
+        .where(InventoryItem.current_stock <= InventoryItem.min_threshold)
+        .order_by(InventoryItem.current_stock - InventoryItem.min_threshold)
+    )
+    return [InventoryRow(*r) for r in result]
+
+
+def inventory_row(item_id: int) -> Optional[InventoryRow]:
+    r = db.session.execute(select(*_INVENTORY_COLS).where(InventoryItem.id == item_id)).first()
+    return InventoryRow(*r) if r else None
+
+
+# --- cashiers -------------------------------------------------------------
+
+@dataclass(slots=True)
+class CashierRow:
+    id: int
+    name: str
+    employee_code: str
+    role: str
+    is_active: bool
+    hire_date: Optional[date]
+
+
+_CASHIER_COLS = (
+    Cashier.id, Cashier.name, Cashier.employee_code, Cashier.role, Cashier.is_active, Cashier.hire_date,
+)
+
+
+def cashier_dict(r) -> Dict[str, Any]:
+    return {
+        "id": r.id,
+        "name": r.name,
+        "employee_code": r.employee_code,
+        "role": r.role,
+        "is_active": r.is_active,
+        "hire_date": r.hire_date,
+    }
+
+
+def cashier_rows() -> List[CashierRow]:
+    result = db.session.execute(select(*_CASHIER_COLS).order_by(Cashier.id))
+    return [CashierRow(*r) for r in result]
+
+
+def cashier_row(cashier_id: int) -> Optional[CashierRow]:
+    r = db.session.execute(select(*_CASHIER_COLS).where(Cashier.id == cashier_id)).first()
+    return CashierRow(*r) if r else None
+
+
+# --- products -------------------------------------------------------------
+
+@dataclass(slots=True)
+class ProductRow:
+    id: int
+    name: str
+    category: str
+    base_price: float
+    is_popular: bool
+    description: Optional[str]
+
+
+_PRODUCT_COLS = (
+    Product.id, Product.name, Product.category, Product.base_price, Product.is_popular, Product.description,
+)
+
+
+def product_dict(r) -> Dict[str, Any]:
+    return {
+        "id": r.id,
+        "name": r.name,
+        "category": r.category,
+        "base_price": r.base_price,
+        "is_popular": r.is_popular,
+        "description": r.description,
+    }
+
+
+def product_rows() -> List[ProductRow]:
+    result = db.session.execute(select(*_PRODUCT_COLS).order_by(Product.category, Product.name))
+    return [ProductRow(*r) for r in result]
+
+
+def product_row(product_id: int) -> Optional[ProductRow]:
+    r = db.session.execute(select(*_PRODUCT_COLS).where(Product.id == product_id)).first()
+    return ProductRow(*r) if r else None
+
+
+@dataclass(slots=True)
+class IngredientRow:
+    inventory_id: int
+    item_name: Optional[str]
+    quantity_used: float
+    unit: str
+
+
+def ingredient_dict(r) -> Dict[str, Any]:
+    return {
+        "inventory_id": r.inventory_id,
+        "item_name": r.item_name,
+        "quantity_used": r.quantity_used,
+        "unit": r.unit,
+    }
+
+
+def ingredient_rows(product_id: int) -> List[IngredientRow]:
+    """Recipe lines with inventory names in one outer join (no per-link lookup)."""
+    result = db.session.execute(
+        select(
+            ProductIngredient.inventory_id, InventoryItem.item_name,
+            ProductIngredient.quantity_used, ProductIngredient.unit,
+        )
+        .outerjoin(InventoryItem, InventoryItem.id == ProductIngredient.inventory_id)
+        .where(ProductIngredient.product_id == product_id)
+    )
+    return [IngredientRow(*r) for r in result]
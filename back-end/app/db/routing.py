@@ -0,0 +1,127 @@
+"""
+Read-replica routing (DATABASE_REPLICA_URLS).
+
+Replica URLs become Flask-SQLAlchemy binds named replica_0, replica_1, ... and
+RoutingSession.get_bind sends a request's reads to one of them when the request
+is a GET/HEAD to a read-only route: every reports_bp and orders_bp GET plus
+meta stats. Everything else, flushes, and work outside a request (background
+threads, the group-commit writer, scripts) use the primary.
+
+Read-your-writes: a successful write request pins its client to the primary for
+READ_REPLICA_PIN_SECONDS, so the order history or receipt fetched right after a
+checkout can't come from a replica that hasn't caught up yet. The pin is kept in
+this process (keyed by client address) and returned in the X-DB-Primary-Until
+response header; a client that echoes the header back stays pinned when its
+next request lands on another worker (the kiosk sends no cookies cross-origin).
+The client address is request.remote_addr, which only reflects X-Forwarded-For
+behind TRUSTED_PROXY_HOPS proxies (ProxyFix).
+
+Work that reads and then writes (counters_service.reconcile) runs inside
+primary() so it never computes from a lagging replica.
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+REPLICA_BLUEPRINTS = {"reports", "orders"}
+REPLICA_ENDPOINTS = {"meta.stats"}
+READ_METHODS = {"GET", "HEAD"}
+PIN_HEADER = "X-DB-Primary-Until"
+
+_pins: Dict[str, float] = {}
+_pins_lock = threading.Lock()
+_round_robin = itertools.count()
+
+
+def _client_key() -> str:
+    return request.remote_addr or ""
+
+
+def _pinned() -> bool:
+    now = time.time()
+    try:
+        # Ignored once it expires; can't pin a client for longer than one write would
+        until = float(request.headers.get(PIN_HEADER, 0))
+        if now < until <= now + float(current_app.config.get("READ_REPLICA_PIN_SECONDS", 5)):
+            return True
+    except ValueError:
+        pass
+    with _pins_lock:
+        return _pins.get(_client_key(), 0.0) > now
+
+
+def _routable() -> bool:
+    if request.method not in READ_METHODS:
+        return False
+    return request.blueprint in REPLICA_BLUEPRINTS or request.endpoint in REPLICA_ENDPOINTS
+
+
+def _replica_engine(db):
+    """The replica engine chosen for this request, or None to use the primary."""
+    if not has_request_context() or g.get("_db_primary_only"):
+        return None
+    choice = g.get("_db_replica", False)
+    if choice is False:
+        choice = None
+        names = current_app.extensions.get("db_replicas") or []
+        if names and _routable() and not _pinned():
+            choice = names[next(_round_robin) % len(names)]
+        g._db_replica = choice
+    return db.engines[choice] if choice else None
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing:
+            replica = _replica_engine(self._db)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def primary():
+    """Send this request's statements to the primary inside the block."""
+    if not has_request_context():
+        yield
+        return
+    depth = g.get("_db_primary_only", 0)
+    g._db_primary_only = depth + 1
+    try:
+        yield
+    finally:
+        g._db_primary_only = depth
+
+
+def route_name() -> Optional[str]:
+    """Bind name that served this request's reads ("primary" if none was chosen)."""
+    return g.get("_db_replica") or "primary"
+
+
+def init_app(app) -> None:
+    """Register replica binds' names and the pin-after-write hook (no-op without replicas)."""
+    names = sorted(k for k in (app.config.get("SQLALCHEMY_BINDS") or {}) if k.startswith("replica_"))
+    app.extensions["db_replicas"] = names
+    if not names:
+        return
+    pin_seconds = float(app.config.get("READ_REPLICA_PIN_SECONDS", 5))
+
+    @app.after_request
+    def _pin_after_write(response):
+        if request.method not in READ_METHODS and request.method != "OPTIONS" and response.status_code < 400:
+            until = time.time() + pin_seconds
+            with _pins_lock:
+                _pins[_client_key()] = until
+                if len(_pins) > 10000:
+                    now = time.time()
+                    for key in [k for k, v in _pins.items() if v <= now]:
+                        del _pins[key]
+            response.headers[PIN_HEADER] = f"{until:.3f}"
+        elif "_db_replica" in g:
+            response.headers["X-DB-Route"] = route_name()
+        return response
@@ -0,0 +1,66 @@
+"""
+Schema-version stamp for the SQLite dev/test database.
+
+create_all() reflects every table on each boot. Instead we store SCHEMA_VERSION in
+schema_version and only run create_all() when the stamp is missing or different.
+Bump SCHEMA_VERSION whenever a model adds/changes a table or column; columns added
+to an existing table also go in ADDED_COLUMNS, and indexes in ADDED_INDEXES
+(create_all() never alters tables).
+PostgreSQL is managed by migrations/ and never touched here.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+SCHEMA_VERSION = 4
+
+# (table, column, SQLite type) added after the table first shipped; mirrors migrations/
+ADDED_COLUMNS = [
+    ("orderitem", "unitprice", "FLOAT"),  # v2, migrations/003
+    ("orderitem", "lineprice", "FLOAT"),  # v2, migrations/003
+]
+
+# (index, table, column) added to existing tables; SQLite's stand-in for migrations/004's
+# monthly partitions is a range-scannable timestamp index on each table
+ADDED_INDEXES = [
+    ("ix_orders_ordertime", "orders", "ordertime"),  # v3
+    ("ix_payment_paymenttime", "payment", "paymenttime"),  # v3
+]
+
+
+def stored_version(engine):
+    """The stamped version, or None if the database has never been stamped."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    except (OperationalError, ProgrammingError):
+        return None
+
+
+def _add_missing_columns(engine) -> None:
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, column, sql_type in ADDED_COLUMNS:
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}"))
+                print(f"  + {table}.{column}")
+        for index, table, column in ADDED_INDEXES:
+            if column not in {c["name"] for c in inspector.get_columns(table)}:
+                continue  # pre-rename dev file; nothing to index
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({column})"))
+
+
+def ensure_schema(db) -> str:
+    """Create missing tables/columns unless the stamp is current. Returns 'current' or 'created'."""
+    from .models import SchemaVersion
+
+    if stored_version(db.engine) == SCHEMA_VERSION:
+        return "current"
+
+    db.create_all()
+    _add_missing_columns(db.engine)
+    if db.session.get(SchemaVersion, SCHEMA_VERSION) is None:
+        db.session.add(SchemaVersion(version=SCHEMA_VERSION))
+    db.session.commit()
+    db.session.remove()
+    return "created"
@@ -83,8 +83,8 @@ def get_current_user():
         "name": user.name,
         "picture": user.picture,
         "role": user.role,
-        "created_at": user.created_at.isoformat() if user.created_at else None,
-        "last_login": user.last_login.isoformat() if user.last_login else None,
+        "created_at": user.created_at,
+        "last_login": user.last_login,
     }), 200
 
 
@@ -155,6 +155,6 @@ def list_users():
         "name": user.name,
         "role": user.role,
         "is_active": user.is_active,
-        "created_at": user.created_at.isoformat() if user.created_at else None,
-        "last_login": user.last_login.isoformat() if user.last_login else None,
+        "created_at": user.created_at,
+        "last_login": user.last_login,
     } for user in users]), 200
@@ -6,7 +6,7 @@ from app.services.employees_service import (
     delete_cashier as svc_delete,
 )
 from app.db.models import Cashier
-from app.db import db
+from app.db import db, reads
 from app.utils.errors import BadRequestError, NotFoundError
 
 employees_bp = Blueprint("employees", __name__)
@@ -23,20 +23,13 @@ def create_employee():
 
 @employees_bp.get("/<int:employee_id>")
 def get_employee(employee_id: int):
-    c = Cashier.query.get(employee_id)
+    c = reads.cashier_row(employee_id)
     if not c:
         return jsonify({
             "error": "not_found",
             "message": f"employee {employee_id} not found",
         }), 404
-    return jsonify({
-        "id": c.id,
-        "name": c.name,
-        "employee_code": c.employee_code,
-        "role": c.role,
-        "is_active": c.is_active,
-        "hire_date": c.hire_date.isoformat() if c.hire_date else None,
-    }), 200
+    return jsonify(reads.cashier_dict(c)), 200
 
 @employees_bp.put("/<int:employee_id>")
 def update_employee(employee_id: int):
@@ -60,14 +53,7 @@ def update_employee(employee_id: int):
 
     db.session.commit()
 
-    return jsonify({
-        "id": c.id,
-        "name": c.name,
-        "employee_code": c.employee_code,
-        "role": c.role,
-        "is_active": c.is_active,
-        "hire_date": c.hire_date.isoformat() if c.hire_date else None,
-    }), 200
+    return jsonify(reads.cashier_dict(c)), 200
 
 @employees_bp.patch("/<int:employee_id>/active")
 def toggle_employee_active(employee_id: int):
@@ -4,7 +4,7 @@ from app.schemas import InventoryCreate, InventoryUpdate, RestockRequest
 from app.services.inventory_service import list_inventory as svc_list, create_inventory_item as svc_create, delete_inventory_item as svc_delete
 from app.db.models import InventoryItem
 from datetime import datetime
-from app.db import db
+from app.db import db, reads
 from flask import Blueprint, jsonify, request
 
 inventory_bp = Blueprint("inventory", __name__)
@@ -37,23 +37,14 @@ def restock_inventory_item(item_id: int):
 
 @inventory_bp.get("/low-stock")
 def list_low_stock():
-    rows = InventoryItem.query.filter(InventoryItem.current_stock <= InventoryItem.min_threshold) \
-                              .order_by((InventoryItem.current_stock - InventoryItem.min_threshold)).all()
-    data = [{"id": r.id, "item_name": r.item_name, "current_stock": r.current_stock,
-             "min_threshold": r.min_threshold, "unit": r.unit,
-             "last_restock_date": r.last_restock_date.isoformat() if r.last_restock_date else None} for r in rows]
-    return jsonify(data), 200
+    return jsonify([reads.inventory_dict(r) for r in reads.low_stock_rows()]), 200
 
 @inventory_bp.get("/<int:item_id>")
 def get_inventory_item(item_id: int):
-    row = InventoryItem.query.get(item_id)
+    row = reads.inventory_row(item_id)
     if not row:
         return jsonify({"error": "not_found", "message": f"inventory {item_id} not found"}), 404
-    return jsonify({
-        "id": row.id, "item_name": row.item_name, "current_stock": row.current_stock,
-        "min_threshold": row.min_threshold, "unit": row.unit,
-        "last_restock_date": row.last_restock_date.isoformat() if row.last_restock_date else None
-    }), 200
+    return jsonify(reads.inventory_dict(row)), 200
 
 @inventory_bp.put("/<int:item_id>")
 def update_inventory_item(item_id: int):
@@ -1,48 +1,87 @@
-from flask import Blueprint, jsonify
+from datetime import datetime
+from flask import Blueprint, Response, current_app, jsonify, request
 from app.db import db
+from app.db import profiler
+from app.db.instrumentation import pool_status
+from app.utils import metrics
 
-from sqlalchemy import func
-from app.db.models import Order, OrderItem
+from app.services import counters_service, health_service
+from app.services.meta_service import get_options as svc_get_options
 
 meta_bp = Blueprint("meta", __name__)
 
 @meta_bp.get("/options")
 def get_options():
-    # Static for now; you can move these to DB later if you want
-    return jsonify({
-        "ice_levels": ["No Ice", "25%", "50%", "75%", "Normal", "Extra Ice"],
-        "sweetness_levels": ["0%", "25%", "50%", "75%", "100%"],
-        "sizes": ["Small", "Medium", "Large"],
-        "bases": ["Whole Milk", "Oat Milk", "Almond Milk", "Soy Milk", "Tea Base"],
-        "toppings": [
-            {"key": "boba", "label": "Boba"},
-            {"key": "lychee_jelly", "label": "Lychee Jelly"},
-            {"key": "pudding", "label": "Egg Pudding"},
-            {"key": "grass_jelly", "label": "Grass Jelly"}
-        ],
-        "flavor_shots": [
-            {"key": "vanilla", "label": "Vanilla"},
-            {"key": "caramel", "label": "Caramel"},
-            {"key": "hazelnut", "label": "Hazelnut"}
-        ]
-    }), 200
+    return jsonify(svc_get_options()), 200
+
+@meta_bp.get("/live")
+def live():
+    # Liveness: the process is serving requests; never touches the database
+    return jsonify({"ok": True}), 200
+
+@meta_bp.get("/ready")
+def ready():
+    # Readiness: cached background DB probe + pool saturation, so probes stay cheap
+    result = health_service.readiness()
+    return jsonify(result), 200 if result["ok"] else 503
 
 @meta_bp.get("/health")
 def health():
-    # Simple DB probe so deploys/readiness checks catch DB issues
-    from app.db import db
-    try:
-        db.session.execute(db.text("SELECT 1"))
-        return jsonify({"ok": True}), 200
-    except Exception as e:
-        return jsonify({"ok": False, "error": str(e)}), 500
+    # Kept for existing deploy checks; same answer as /ready
+    return ready()
 
 @meta_bp.get("/stats")
 def stats():
-    total_orders = db.session.query(func.count(Order.id)).scalar() or 0
-    total_items = db.session.query(func.coalesce(func.sum(OrderItem.quantity), 0)).scalar() or 0
+    # Maintained counters: a primary-key lookup instead of aggregating all orders
+    today = datetime.utcnow().date()
+    revenue_key = counters_service.daily_name("revenue", today)
+    drinks_key = counters_service.daily_name("drinks", today)
+    values = counters_service.read(["orders_total", "items_total", revenue_key, drinks_key])
 
     return jsonify({
-        "total_orders": int(total_orders),
-        "total_items": int(total_items),
+        "total_orders": int(values["orders_total"]),
+        "total_items": int(values["items_total"]),
+        "today": {
+            "date": today,
+            "revenue": round(values[revenue_key], 2),
+            "drinks": int(values[drinks_key]),
+        },
     }), 200
+
+@meta_bp.post("/stats/reconcile")
+def reconcile_stats():
+    # Manual trigger for the counter reconciliation job
+    return jsonify({"ok": True, "counters": counters_service.reconcile()}), 200
+
+@meta_bp.get("/metrics")
+def prometheus_metrics():
+    # Prometheus text exposition: per-route histograms/counters + pool stats sampled now
+    pool = pool_status(db.engine)
+    body = metrics.render({
+        "db_pool_size": ("Configured pool size.", pool["size"]),
+        "db_pool_checked_out": ("Connections currently checked out of the pool.", pool["checked_out"]),
+        "db_pool_checked_in": ("Idle connections in the pool.", pool["checked_in"]),
+        "db_pool_overflow": ("Overflow connections currently open.", pool["overflow"]),
+        "app_startup_seconds": ("Time create_app took for this process.",
+                                current_app.extensions["startup"]["total_ms"] / 1000.0),
+    })
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+@meta_bp.get("/startup")
+def startup_report():
+    # create_app breakdown for this process: phases, per-blueprint import cost, schema check
+    return jsonify(current_app.extensions["startup"]), 200
+
+@meta_bp.get("/profiler")
+def profiler_history():
+    # Ring buffer of profiled requests (opt-in via SQL_PROFILER_ENABLED); ?n_plus_one=1 filters
+    n_plus_one_only = request.args.get("n_plus_one", "").lower() in ("1", "true", "yes")
+    return jsonify({
+        "enabled": profiler.is_enabled(),
+        "requests": profiler.history(n_plus_one_only),
+    }), 200
+
+@meta_bp.delete("/profiler")
+def profiler_clear():
+    profiler.clear()
+    return ("", 204)
@@ -2,24 +2,33 @@
 from app.db.models import Order, OrderItem, Payment
 from app.utils.errors import NotFoundError, BadRequestError
 from app.db import db
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from marshmallow import ValidationError
 from app.schemas import OrderCreate
 from datetime import datetime, timedelta
 from sqlalchemy.orm import selectinload
 from app.services.orders_service import create_order as svc_create_order
+from app.services import events_service, receipt_service as svc_receipts
+from app.services.orders_service import (
+    count_orders as svc_count_orders,
+    list_order_summaries as svc_list_summaries,
+    order_filters as svc_order_filters,
+)
+from app.utils import timing
+from app.utils.timing import phase
 
 orders_bp = Blueprint("orders", __name__)
 
 def _format_order_items(items):
     data = []
+    # Stored sale-time prices; no product lookup
     for itm in items:
-        line_price = itm.line_price if itm.line_price is not None else 0.0
         data.append({
             "product_id": itm.product_id,
             "quantity": itm.quantity,
             "customizations": itm.customizations,
-            "line_price": line_price,
+            "unit_price": itm.unit_price if itm.unit_price is not None else 0.0,
+            "line_price": itm.line_price if itm.line_price is not None else 0.0,
         })
     return data
 
@@ -31,7 +40,7 @@ def _format_payments(payments, include_time=False):
             "amount": p.amount_paid,
         }
         if include_time:
-            entry["time"] = p.payment_time.isoformat() if p.payment_time else None
+            entry["time"] = p.payment_time
         result.append(entry)
     return result
 
@@ -51,7 +60,7 @@ def get_order(order_id: int):
         "subtotal": o.subtotal,
         "tax": o.tax,
         "total": o.total,
-        "order_time": o.order_time.isoformat(),
+        "order_time": o.order_time,
         "status": o.status,
         "items": _format_order_items(o.items),
         "payments": _format_payments(o.payments),
@@ -61,11 +70,34 @@ from app.services.orders_service import recent_transactions as svc_recent
 
 @orders_bp.get("/recent")
 def recent_transactions():
-    return jsonify({"transactions": svc_recent()}), 200
+    try:
+        limit = min(max(int(request.args.get("limit", 10)), 1), 100)
+    except ValueError:
+        limit = 10
+    return jsonify({"transactions": svc_recent(limit)}), 200
+
+@orders_bp.get("/stream")
+def order_stream():
+    # SSE feed of order.created / order.refunded. Resumes after Last-Event-ID (header, or
+    # ?last_event_id= for the first connect); without one, starts with new events only.
+    broker = events_service.broker
+    raw_last = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_id = int(raw_last) if raw_last else broker.last_id
+    except ValueError:
+        raise BadRequestError("Last-Event-ID must be an integer")
+    heartbeat = float(current_app.config.get("SSE_HEARTBEAT_SECONDS", 15))
+    max_seconds = float(current_app.config.get("SSE_MAX_STREAM_SECONDS", 3600))
+
+    resp = Response(events_service.sse_stream(broker, last_id, heartbeat, max_seconds),
+                    mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return resp
 
 @orders_bp.get("/")
 def list_orders():
-    # Query params: page, page_size, from, to, status
+    # Query params: page, page_size, from, to, status, fields=summary (+ item_counts=1)
     # page/page_size defaults align with PaginationQuery schema
     page_param = request.args.get("page")
     size_param = request.args.get("page_size")
@@ -109,15 +141,17 @@ def list_orders():
             return jsonify({"error": "invalid_status", "message": "status must be Complete, Refunded, or Voided"}), 400
         status_filter = s.capitalize()
 
-    q = Order.query
-    if start_ts is not None:
-        q = q.filter(Order.order_time >= start_ts)
-    if end_ts is not None:
-        q = q.filter(Order.order_time < end_ts)
-    if status_filter is not None:
-        q = q.filter(Order.status == status_filter)
+    if request.args.get("fields") == "summary":
+        # Order columns only: no items/payments, optional aggregated item counts
+        with_counts = request.args.get("item_counts", "").lower() in ("1", "true", "yes")
+        data, total = svc_list_summaries(
+            page, page_size, start_ts, end_ts, status_filter, with_item_counts=with_counts
+        )
+        return jsonify({"orders": data, "page": page, "page_size": page_size, "total": total}), 200
 
-    total = q.count()
+    clauses = svc_order_filters(start_ts, end_ts, status_filter)
+    q = Order.query.filter(*clauses)
+    total = svc_count_orders(clauses)
 
     rows = (
         q.options(
@@ -137,7 +171,7 @@ def list_orders():
             "subtotal": o.subtotal,
             "tax": o.tax,
             "total": o.total,
-            "order_time": o.order_time.isoformat(),
+            "order_time": o.order_time,
             "status": o.status,
             "items": _format_order_items(o.items),
             "payments": _format_payments(o.payments),
@@ -149,8 +183,11 @@ def list_orders():
 
 @orders_bp.post("/")
 def create_order():
+    # Sampled Server-Timing breakdown of the checkout phases
+    timing.begin("checkout")
     try:
-        payload = OrderCreate().load(request.get_json() or {})
+        with phase("validate"):
+            payload = OrderCreate().load(request.get_json() or {})
     except ValidationError as e:
         return jsonify({"errors": e.messages}), 400
     except Exception as e:
@@ -168,33 +205,60 @@ def create_order():
         traceback.print_exc()
         raise  # Re-raise so error handler catches it
 
+def _receipt_format():
+    fmt = (request.args.get("format") or "json").lower()
+    if fmt not in svc_receipts.FORMATS:
+        raise BadRequestError("format must be json, text or escpos")
+    return fmt
+
 @orders_bp.get("/<int:order_id>/receipt")
 def get_order_receipt(order_id: int):
-    o = (
-        Order.query.options(
-            selectinload(Order.items),
-            selectinload(Order.payments),
-        ).get(order_id)
-    )
-    if not o:
+    # Cached per order; rebuilt only when a refund has added a payment
+    fmt = _receipt_format()
+    found = svc_receipts.get_receipt(order_id, fmt)
+    if found is None:
         raise NotFoundError(f"order {order_id} not found")
+    body, payment_count = found
 
-    items = _format_order_items(o.items)
-    payments = _format_payments(o.payments, include_time=True)
+    if fmt == "json":
+        resp = jsonify(body)
+    elif fmt == "text":
+        resp = Response(body, mimetype="text/plain")
+    else:
+        resp = Response(body, mimetype="application/octet-stream")
+        resp.headers["Content-Disposition"] = f'inline; filename="receipt-{order_id}.bin"'
+    resp.set_etag(f"receipt-{order_id}-{payment_count}-{fmt}")
+    return resp.make_conditional(request)
 
-    receipt = {
-        "order_id": o.id,
-        "cashier_id": o.cashier_id,
-        "status": o.status,
-        "order_time": o.order_time.isoformat(),
-        "subtotal": o.subtotal,
-        "tax": o.tax,
-        "total": o.total,
-        "items": items,
-        "payments": payments,
-    }
+MAX_BULK_RECEIPTS = 500
+
+@orders_bp.post("/receipts")
+def bulk_receipts():
+    # Body: {"order_ids": [...], "format": "json"|"text"|"escpos"}
+    body = request.get_json(silent=True) or {}
+    order_ids = body.get("order_ids")
+    if not isinstance(order_ids, list) or not order_ids:
+        raise BadRequestError("order_ids must be a non-empty list")
+    if len(order_ids) > MAX_BULK_RECEIPTS:
+        raise BadRequestError(f"at most {MAX_BULK_RECEIPTS} receipts per call")
+    try:
+        order_ids = [int(v) for v in order_ids]
+    except (TypeError, ValueError):
+        raise BadRequestError("order_ids must be integers")
+    fmt = (body.get("format") or "json").lower()
+    if fmt not in svc_receipts.FORMATS:
+        raise BadRequestError("format must be json, text or escpos")
 
-    return jsonify(receipt), 200
+    found, missing = svc_receipts.get_receipts(order_ids, fmt)
+    if fmt == "escpos":
+        # One print job: receipts back to back, each ends with its own cut
+        resp = Response(b"".join(data for _, data in found), mimetype="application/octet-stream")
+        resp.headers["X-Missing-Orders"] = ",".join(map(str, missing))
+        return resp
+    if fmt == "text":
+        return jsonify({"receipts": [{"order_id": oid, "text": text} for oid, text in found],
+                        "missing": missing}), 200
+    return jsonify({"receipts": [receipt for _, receipt in found], "missing": missing}), 200
 
 @orders_bp.post("/<int:order_id>/refund")
 def refund_order(order_id: int):
@@ -246,6 +310,15 @@ def refund_order(order_id: int):
         o.status = "Refunded"
 
     db.session.commit()
+    svc_receipts.invalidate(o.id)
+    events_service.publish("order.refunded", {
+        "order_id": o.id,
+        "refunded": amount,
+        "method": method,
+        "time": refund_payment.payment_time,
+        "remaining_refundable": max(0.0, new_net_paid),
+        "status": o.status,
+    })
 
     return jsonify({
         "ok": True,
@@ -2,18 +2,26 @@
 from marshmallow import ValidationError
 from app.schemas import ProductCreate, ProductUpdate
 from app.services.products_service import create_product as svc_create, update_product as svc_update, delete_product as svc_delete
+from app.db import reads
 from app.db.models import Product
 from flask import Blueprint, jsonify, request
 from app.services.products_service import list_products_grouped_by_category
+from app.services.menu_service import get_localized_menu
 
 products_bp = Blueprint("products", __name__)
 
 @products_bp.get("/all")
 def list_products_flat():
-    items = Product.query.order_by(Product.category, Product.name).all()
-    data = [{"id": p.id, "name": p.name, "category": p.category, "base_price": p.base_price,
-             "is_popular": p.is_popular, "description": p.description} for p in items]
-    return jsonify(data), 200
+    return jsonify([reads.product_dict(p) for p in reads.product_rows()]), 200
+
+@products_bp.get("/menu")
+def get_menu():
+    # Fully localized menu document, cached per (menu version, language)
+    lang = request.args.get("lang", "en")
+    doc = get_localized_menu(lang)
+    resp = jsonify(doc)
+    resp.set_etag(f"menu-{doc['version']}-{doc['lang']}")
+    return resp.make_conditional(request)
 
 @products_bp.post("/")
 def create_product():
@@ -68,14 +76,10 @@ def list_products_grouped():
 
 @products_bp.get("/<int:product_id>")
 def get_product(product_id: int):
-    p = Product.query.get(product_id)
+    p = reads.product_row(product_id)
     if not p:
         return jsonify({"error":"not_found", "message": f"product {product_id} not found"}), 404
-    return jsonify({
-        "id": p.id, "name": p.name, "category": p.category,
-        "base_price": p.base_price, "is_popular": p.is_popular,
-        "description": p.description
-    }), 200
+    return jsonify(reads.product_dict(p)), 200
 
 from app.services.products_service import (
     list_product_ingredients as svc_list_ing,
@@ -1,91 +1,70 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from datetime import datetime, timedelta
 from sqlalchemy import text
 from app.db import db
 from app.db.models import ZClosure
+from app.services import dashboard_service, events_service
+from app.services import reports_service as svc_reports
+from app.utils.errors import BadRequestError
 
 reports_bp = Blueprint("reports", __name__)
 
+
+def _include_archive() -> bool:
+    # ?include_archive=1 also reads months moved out by scripts/order_partitions.py archive
+    return request.args.get("include_archive", "").lower() in ("1", "true", "yes")
+
+
 @reports_bp.get("/")
 def reports_root():
-    return jsonify({"ok": True, "reports": ["x-report", "z-report", "summary", "weekly-items", "daily-top"]}), 200
+    return jsonify({"ok": True, "reports": ["x-report", "live", "z-report", "summary", "weekly-items", "daily-top"]}), 200
 
 @reports_bp.get("/x-report")
 def x_report():
-    # Determine start time = last Z close; if none, start of current UTC day
-    last_close = db.session.query(ZClosure.closed_at).order_by(ZClosure.closed_at.desc()).first()
-    now = datetime.utcnow()
-    if last_close and last_close[0] is not None:
-        start_ts = last_close[0]
-    else:
-        start_ts = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    # Hourly buckets (UTC) since the last Z close, or start of day if none
+    return jsonify(svc_reports.get_x_report_today()), 200
+
+@reports_bp.get("/live")
+def live_dashboard():
+    # SSE: a "snapshot" of the X-report buckets, then a "delta" per order/refund
+    # (add its fields to that hour's bucket). A later "snapshot" replaces everything.
+    max_age = float(current_app.config.get("DASHBOARD_RECONCILE_SECONDS", 60))
+    dashboard_service.reconcile(max_age)
+    broker = dashboard_service.broker
+    raw_last = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_id = int(raw_last) if raw_last else None
+    except ValueError:
+        raise BadRequestError("Last-Event-ID must be an integer")
 
-    # Aggregate orders by hour (UTC) since start_ts
-    # PostgreSQL uses EXTRACT instead of STRFTIME, and camelCase column names
-    orders_sql = text(
-        """
-        SELECT EXTRACT(HOUR FROM ordertime)::integer AS hr,
-               COUNT(1) AS orders_cnt,
-               COALESCE(SUM(total), 0.0) AS sales_sum
-        FROM orders
-        WHERE ordertime >= :start_ts
-        GROUP BY hr
-        ORDER BY hr
-        """
-    )
-    payments_sql = text(
-        """
-        SELECT EXTRACT(HOUR FROM paymenttime)::integer AS hr,
-               LOWER(paymentmethod) AS method,
-               COALESCE(SUM(amountpaid), 0.0) AS amt
-        FROM payment
-        WHERE paymenttime >= :start_ts
-        GROUP BY hr, method
-        """
-    )
+    first = ""
+    if last_id is None or last_id > broker.last_id or broker.since(last_id)[1]:
+        first, last_id = dashboard_service.snapshot_frame()
 
-    orders_rows = db.session.execute(orders_sql, {"start_ts": start_ts}).all()
-    payments_rows = db.session.execute(payments_sql, {"start_ts": start_ts}).all()
-
-    # Build result keyed by hour with zeroed defaults
-    result_map: dict[int, dict] = {}
-
-    for hr, orders_cnt, sales_sum in orders_rows:
-        result_map[int(hr)] = {
-            "hour": int(hr),
-            "sales": float(sales_sum or 0.0),
-            "orders": int(orders_cnt or 0),
-            "returns": 0.0,
-            "voids": 0.0,
-            "discards": 0.0,
-            "cash": 0.0,
-            "card": 0.0,
-            "other": 0.0,
-        }
-
-    for hr, method, amt in payments_rows:
-        hr_i = int(hr)
-        row = result_map.get(hr_i)
-        if row is None:
-            row = {
-                "hour": hr_i,
-                "sales": 0.0,
-                "orders": 0,
-                "returns": 0.0,
-                "voids": 0.0,
-                "discards": 0.0,
-                "cash": 0.0,
-                "card": 0.0,
-                "other": 0.0,
-            }
-            result_map[hr_i] = row
-        m = (method or "").lower()
-        if m in ("cash", "card", "other"):
-            row[m] = float(amt or 0.0)
+    app = current_app._get_current_object()
+
+    def _reconcile():
+        with app.app_context():
+            dashboard_service.reconcile(max_age)
 
-    # Return sorted by hour ascending
-    data = [result_map[k] for k in sorted(result_map.keys())]
-    return jsonify(data), 200
+    def _resync():
+        with app.app_context():
+            return dashboard_service.snapshot_frame()
+
+    def _frames():
+        if first:
+            yield first
+        yield from events_service.sse_stream(
+            broker, last_id,
+            float(app.config.get("SSE_HEARTBEAT_SECONDS", 15)),
+            float(app.config.get("SSE_MAX_STREAM_SECONDS", 3600)),
+            on_wake=_reconcile, resync=_resync,
+        )
+
+    resp = Response(_frames(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
 
 @reports_bp.post("/z-report")
 def z_report():
@@ -153,6 +132,7 @@ def z_report():
         z = ZClosure(closed_at=now)
         db.session.add(z)
         db.session.commit()
+        dashboard_service.mark_stale()
 
     return jsonify({
         "period_start": start_ts.isoformat() + "Z",
@@ -169,6 +149,55 @@ def z_report():
         "reset_performed": reset
     }), 200
 
+# Range-report services (numpy, process pools, store engines, archive files) are imported
+# by the first request that needs them, not at startup
+
+def _snapshot():
+    # ?source=snapshot answers from the nightly columnar export (snapshot_service), not the database
+    source = request.args.get("source", "live")
+    if source not in ("live", "snapshot"):
+        raise BadRequestError("source must be 'live' or 'snapshot'.")
+    if source == "live":
+        return None
+    from app.services import snapshot_service
+
+    return snapshot_service.current()
+
+_ARCHIVE_READS = {
+    "sales_totals": "sales_summary",
+    "item_quantities": "item_quantities",
+    "daily_item_quantities": "daily_item_quantities",
+}
+
+def _local(report, start_ts, end_ts):
+    # This database (sharded across processes when configured), plus archived months on request
+    from app.services import shard_service
+
+    result = shard_service.aggregate(report, start_ts, end_ts)
+    if _include_archive():
+        from app.services import archive_service
+
+        archived = getattr(archive_service, _ARCHIVE_READS[report])(start_ts, end_ts)
+        if isinstance(result, tuple):
+            return tuple(a + b for a, b in zip(result, archived))
+        svc_reports.merge_counts(result, archived)
+    return result
+
+def _snapshot_response(data, snapshot):
+    resp = jsonify(data)
+    resp.headers["X-Snapshot-As-Of"] = snapshot.meta["as_of"]
+    return resp, 200
+
+def _federated(query, merge, empty, shape):
+    # ?stores=all|name,... runs the report on every selected store database (federation_service)
+    from app.services import federation_service
+
+    report = federation_service.run(
+        federation_service.select_stores(request.args.get("stores")), query, merge, empty
+    )
+    report["data"] = shape(report["data"])
+    return jsonify(report), 200 if report["stores_answered"] else 502
+
 @reports_bp.get("/summary")
 def summary():
     start_str = request.args.get("from")
@@ -185,25 +214,21 @@ def summary():
     start_ts = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
     end_ts = (end_date + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
 
-    # PostgreSQL uses COALESCE and camelCase column names
-    sql = text(
-        """
-        SELECT COALESCE(SUM(total), 0.0) AS gross_sales,
-               COUNT(1)                AS orders_cnt
-        FROM orders
-        WHERE ordertime >= :start_ts AND ordertime < :end_ts
-        """
-    )
-    row = db.session.execute(sql, {"start_ts": start_ts, "end_ts": end_ts}).first()
-    gross_sales = float(row[0] or 0.0) if row else 0.0
-    orders_cnt = int(row[1] or 0) if row else 0
+    def _shape(totals):
+        return {"from": start_str, "to": end_str, "gross_sales": round(totals[0], 2), "orders": totals[1]}
 
-    return jsonify({
-        "from": start_str,
-        "to": end_str,
-        "gross_sales": gross_sales,
-        "orders": orders_cnt,
-    }), 200
+    if "stores" in request.args:
+        return _federated(
+            lambda conn: svc_reports.sales_totals(conn, start_ts, end_ts),
+            lambda acc, t: (acc[0] + t[0], acc[1] + t[1]),
+            (0.0, 0),
+            _shape,
+        )
+    snapshot = _snapshot()
+    if snapshot is not None:
+        return _snapshot_response(_shape(snapshot.sales_totals(start_ts, end_ts)), snapshot)
+
+    return jsonify(_shape(_local("sales_totals", start_ts, end_ts))), 200
 
 @reports_bp.get("/weekly-items")
 def weekly_items():
@@ -222,24 +247,28 @@ def weekly_items():
             start_ts = now - timedelta(days=7)
     except ValueError:
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD for from/to."}), 400
-
-    # PostgreSQL uses COALESCE and camelCase column names
-    sql = text(
-        """
-        SELECT p.name AS name,
-               COALESCE(SUM(oi.quantity), 0) AS qty
-        FROM orderitem oi
-        JOIN product p ON p.id = oi.productid
-        JOIN orders o  ON o.id = oi.orderid
-        WHERE o.ordertime >= :start_ts AND o.ordertime < :end_ts
-        GROUP BY p.name
-        ORDER BY qty DESC
-        """
-    )
-
-    rows = db.session.execute(sql, {"start_ts": start_ts, "end_ts": end_ts}).all()
-    data = [{"name": r[0], "value": int(r[1] or 0)} for r in rows]
-    return jsonify(data), 200
+    limit = request.args.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return jsonify({"error": "limit must be a positive integer."}), 400
+
+    if "stores" in request.args:
+        return _federated(
+            lambda conn: svc_reports.item_quantities(conn, start_ts, end_ts),
+            svc_reports.merge_counts,
+            {},
+            lambda qty: svc_reports.top_items(qty, limit),
+        )
+    snapshot = _snapshot()
+    if snapshot is not None:
+        return _snapshot_response(svc_reports.top_items(snapshot.item_quantities(start_ts, end_ts), limit), snapshot)
+
+    qty = _local("item_quantities", start_ts, end_ts)
+    return jsonify(svc_reports.top_items(qty, limit)), 200
 
 @reports_bp.get("/daily-top")
 def daily_top_item():
@@ -271,65 +300,47 @@ def daily_top_item():
         start_ts = now - timedelta(days=days)
         end_ts = now
 
-    # PostgreSQL uses COALESCE and camelCase column names
-    sql = text(
-        """
-        SELECT t.day, t.name, t.qty
-        FROM (
-            SELECT DATE(o.ordertime) AS day,
-                   p.name AS name,
-                   COALESCE(SUM(oi.quantity), 0) AS qty
-            FROM orderitem oi
-            JOIN product p ON p.id = oi.productid
-            JOIN orders  o ON o.id = oi.orderid
-            WHERE o.ordertime >= :start_ts AND o.ordertime < :end_ts
-            GROUP BY day, p.name
-        ) AS t
-        JOIN (
-            SELECT day, MAX(qty) AS max_qty
-            FROM (
-                SELECT DATE(o.ordertime) AS day,
-                       p.name AS name,
-                       COALESCE(SUM(oi.quantity), 0) AS qty
-                FROM orderitem oi
-                JOIN product p ON p.id = oi.productid
-                JOIN orders  o ON o.id = oi.orderid
-                WHERE o.ordertime >= :start_ts AND o.ordertime < :end_ts
-                GROUP BY day, p.name
-            ) x
-            GROUP BY day
-        ) AS m
-        ON m.day = t.day AND m.max_qty = t.qty
-        ORDER BY t.day ASC, t.name ASC
-        """
-    )
-
-    rows = db.session.execute(sql, {"start_ts": start_ts, "end_ts": end_ts}).all()
-
-    # If multiple items tie for a day, pick the first alphabetically
-    seen_days = set()
-    data = []
-    for day_raw, name, qty in rows:
-        if day_raw in seen_days:
-            continue
-        seen_days.add(day_raw)
-
-        # Normalize day to ISO string (YYYY-MM-DD)
-        day_iso: str
-        if hasattr(day_raw, "isoformat"):
-            # datetime/date from SQLAlchemy comes as date/datetime
-            day_iso = day_raw.isoformat()
+    # Winners are picked after adding up per-day counts, whether across stores or with the archive
+    if "stores" in request.args:
+        return _federated(
+            lambda conn: svc_reports.daily_item_quantities(conn, start_ts, end_ts),
+            svc_reports.merge_counts,
+            {},
+            svc_reports.top_item_per_day,
+        )
+    snapshot = _snapshot()
+    if snapshot is not None:
+        days_qty = snapshot.daily_item_quantities(start_ts, end_ts)
+        return _snapshot_response(svc_reports.top_item_per_day(days_qty), snapshot)
+
+    days_qty = _local("daily_item_quantities", start_ts, end_ts)
+    return jsonify(svc_reports.top_item_per_day(days_qty)), 200
+
+@reports_bp.get("/modifiers")
+def modifiers():
+    from app.services import modifier_service
+
+    # Toppings, ice, sweetness, bases, sizes and flavor shots sold; optional ?group=toppings
+    # and ?from=YYYY-MM-DD&to=YYYY-MM-DD (default last 7 days ending now, UTC)
+    start_str = request.args.get("from")
+    end_str = request.args.get("to")
+    group = request.args.get("group")
+    now = datetime.utcnow()
+    try:
+        if start_str and end_str:
+            start_ts = datetime.strptime(start_str, "%Y-%m-%d").replace(hour=0, minute=0, second=0, microsecond=0)
+            end_ts = (datetime.strptime(end_str, "%Y-%m-%d") + timedelta(days=1)).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
         else:
-            # fall back to string parsing
-            try:
-                day_iso = datetime.strptime(str(day_raw), "%Y-%m-%d").date().isoformat()
-            except Exception:
-                day_iso = str(day_raw)
-
-        data.append({
-            "day": day_iso,
-            "item": name,
-            "value": int(qty or 0)
-        })
-
-    return jsonify(data), 200
+            end_ts = now
+            start_ts = now - timedelta(days=7)
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD for from/to."}), 400
+    if group is not None and group not in modifier_service.MENU_OPTIONS:
+        raise BadRequestError(f"Unknown group '{group}'. Use one of: {', '.join(modifier_service.MENU_OPTIONS)}.")
+
+    resp = jsonify(modifier_service.modifier_totals(start_ts, end_ts, group))
+    # Orders after this id aren't counted yet (see modifier_service)
+    resp.headers["X-Modifiers-Indexed-Through"] = str(modifier_service.indexed_through())
+    return resp, 200
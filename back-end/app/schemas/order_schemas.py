@@ -20,6 +20,7 @@ class OrderItemOut(Schema):
     product_id = fields.Int(required=True)
     quantity = fields.Int(required=True)
     customizations = fields.String(required=True)
+    unit_price = fields.Float(required=True)  # stored at sale time, size delta included
     line_price = fields.Float(required=True)
 
 class PaymentOut(Schema):
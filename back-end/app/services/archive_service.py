@@ -0,0 +1,350 @@
+"""
+Archived months of orders, and the report reads over them.
+
+`python -m scripts.order_partitions archive` moves each closed month out of
+orders / orderitem / payment into <ORDER_ARCHIVE_DIR>/orders-YYYY-MM.jsonl.gz: one
+order per line, with its items (product names resolved at archive time) and
+payments. The month's totals go into manifest.json. A month is archived in this
+order: file (fsync + rename), manifest entry marked "pending", delete the rows,
+then the entry without "pending". Readers trust a pending month only once its
+file exists and its orders are gone from the database, so a crash at any step
+neither loses nor double-counts it. Re-running archive finishes pending months and
+merges with the file that's already there.
+
+Payments are deleted with their orders and, on PostgreSQL, where payment is
+partitioned by paymenttime, the month's payments whose order is no longer in the
+database are written to the file (as payment-only lines) and deleted too, so the
+month's payment partition ends up empty and can be dropped.
+
+Reports read archives only when asked (?include_archive=1), and only the months
+that overlap the requested window. A month's file is parsed once into compact
+rows and kept in a small LRU, since an archived month never changes.
+"""
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from flask import current_app
+from sqlalchemy import delete, func, select, text
+
+from app.db import db
+from app.db.models import Order, OrderItem, OrderItemModifier, Payment, Product
+
+MANIFEST = "manifest.json"
+CHUNK = 1000
+CACHED_MONTHS = 24
+
+# (month, file mtime) -> [(order_time, total, ((name, qty), ...)), ...]
+_rows_cache: "OrderedDict[Tuple[str, float], List[tuple]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+# --- months ---------------------------------------------------------------
+
+def month_bounds(month: str) -> Tuple[datetime, datetime]:
+    """[start, end) of a "YYYY-MM" month."""
+    start = datetime.strptime(month, "%Y-%m")
+    end = datetime(start.year + (start.month == 12), start.month % 12 + 1, 1)
+    return start, end
+
+
+def month_of(ts: datetime) -> str:
+    return ts.strftime("%Y-%m")
+
+
+def closed_months_before(cutoff: datetime) -> List[str]:
+    """Months with orders that end on or before cutoff's month start, oldest first."""
+    o = Order.__table__.c
+    first = db.session.execute(select(func.min(o.ordertime))).scalar()
+    if first is None:
+        return []
+    if isinstance(first, str):  # SQLite without type affinity on raw rows
+        first = datetime.fromisoformat(first)
+    months, month = [], month_of(first)
+    limit = month_of(cutoff)
+    while month < limit:
+        months.append(month)
+        month = month_of(month_bounds(month)[1])
+    return months
+
+
+# --- manifest -------------------------------------------------------------
+
+def archive_dir() -> Path:
+    configured = current_app.config.get("ORDER_ARCHIVE_DIR")
+    return Path(configured) if configured else Path(current_app.instance_path) / "archive"
+
+
+def _month_file(month: str) -> Path:
+    return archive_dir() / f"orders-{month}.jsonl.gz"
+
+
+def manifest() -> Dict[str, Any]:
+    path = archive_dir() / MANIFEST
+    if not path.exists():
+        return {"months": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_atomic(path: Path, write) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _save_manifest(data: Dict[str, Any]) -> None:
+    _write_atomic(archive_dir() / MANIFEST, lambda f: f.write(json.dumps(data, indent=2, sort_keys=True).encode()))
+
+
+def _has_live_orders(month: str) -> bool:
+    start, end = month_bounds(month)
+    o = Order.__table__.c
+    return db.session.execute(select(o.id).where(o.ordertime >= start, o.ordertime < end).limit(1)).first() is not None
+
+
+def archived_months() -> Dict[str, Dict[str, Any]]:
+    """Manifest entries of months whose orders have left the database (settled or pending)."""
+    months = {}
+    for month, entry in manifest()["months"].items():
+        if entry.get("pending") and (not _month_file(month).exists() or _has_live_orders(month)):
+            continue  # interrupted before its rows were deleted: the database still has them
+        months[month] = entry
+    return months
+
+
+def pending_months() -> List[str]:
+    """Months an interrupted archive run left unfinished."""
+    return sorted(m for m, entry in manifest()["months"].items() if entry.get("pending"))
+
+
+def archived_totals() -> Dict[str, float]:
+    """Orders and item quantity across every archived month (added back into running counters)."""
+    months = archived_months().values()
+    return {"orders": sum(m["orders"] for m in months), "items": sum(m["items"] for m in months)}
+
+
+# --- archiving ------------------------------------------------------------
+
+def _load_orders(order_ids: List[int]) -> List[Dict[str, Any]]:
+    o, i, p, pay = Order.__table__.c, OrderItem.__table__.c, Product.__table__.c, Payment.__table__.c
+    orders = {
+        r.id: {
+            "id": r.id, "customer_id": r.customerid, "cashier_id": r.cashierid,
+            "subtotal": r.subtotal, "tax": r.tax, "total": r.total,
+            "order_time": r.ordertime, "status": r.status, "items": [], "payments": [],
+        }
+        for r in db.session.execute(
+            select(o.id, o.customerid, o.cashierid, o.subtotal, o.tax, o.total, o.ordertime, o.status)
+            .where(o.id.in_(order_ids))
+        )
+    }
+    for r in db.session.execute(
+        select(i.orderid, i.productid, p.name, i.quantity, i.customizations, i.unitprice, i.lineprice)
+        .outerjoin(Product.__table__, p.id == i.productid)
+        .where(i.orderid.in_(order_ids))
+    ):
+        orders[r.orderid]["items"].append({
+            "product_id": r.productid, "name": r.name, "quantity": r.quantity,
+            "customizations": r.customizations, "unit_price": r.unitprice, "line_price": r.lineprice,
+        })
+    for r in db.session.execute(
+        select(pay.orderid, pay.paymenttime, pay.amountpaid, pay.paymentmethod, pay.tipamount)
+        .where(pay.orderid.in_(order_ids))
+    ):
+        orders[r.orderid]["payments"].append({
+            "time": r.paymenttime, "amount": r.amountpaid, "method": r.paymentmethod, "tip": r.tipamount,
+        })
+    return [orders[oid] for oid in sorted(orders)]
+
+
+def _stray_payments(start: datetime, end: datetime):
+    """Payments made in [start, end) whose order is no longer in the database (filter for payment)."""
+    o, pay = Order.__table__, Payment.__table__
+    return (
+        pay.c.paymenttime >= start,
+        pay.c.paymenttime < end,
+        ~select(o.c.id).where(o.c.id == pay.c.orderid).exists(),
+    )
+
+
+def _load_stray_payments(start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    pay = Payment.__table__.c
+    rows: Dict[int, Dict[str, Any]] = {}
+    for r in db.session.execute(
+        select(pay.orderid, pay.paymenttime, pay.amountpaid, pay.paymentmethod, pay.tipamount)
+        .where(*_stray_payments(start, end))
+        .order_by(pay.orderid, pay.paymenttime)
+    ):
+        rows.setdefault(r.orderid, {"order_id": r.orderid, "payments": []})["payments"].append({
+            "time": r.paymenttime, "amount": r.amountpaid, "method": r.paymentmethod, "tip": r.tipamount,
+        })
+    return list(rows.values())
+
+
+def _read_lines(path: Path) -> Iterator[Dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _drop_month_partitions(month: str) -> None:
+    # PostgreSQL (migrations/004): drop the month's partitions once they're empty
+    if db.engine.dialect.name != "postgresql":
+        return
+    suffix = month.replace("-", "_")
+    for parent in ("orders", "payment"):
+        name = f"{parent}_{suffix}"
+        if db.session.execute(text("SELECT to_regclass(:n)"), {"n": name}).scalar() is None:
+            continue
+        if db.session.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+            continue
+        db.session.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {name}"))
+        db.session.execute(text(f"DROP TABLE {name}"))
+
+
+def archive_month(month: str, dry_run: bool = False) -> Dict[str, Any]:
+    """Move one closed month's orders into its archive file; returns the month's manifest entry."""
+    start, end = month_bounds(month)
+    if end > datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0):
+        raise ValueError(f"{month} is not closed yet")
+
+    o = Order.__table__.c
+    order_ids = [
+        r[0] for r in db.session.execute(
+            select(o.id).where(o.ordertime >= start, o.ordertime < end).order_by(o.id)
+        )
+    ]
+    path = _month_file(month)
+    existing = list(_read_lines(path)) if path.exists() else []
+    if dry_run:
+        already = sum(1 for row in existing if "id" in row)
+        return {"month": month, "orders": len(order_ids), "already_archived": already, "dry_run": True}
+
+    archive_dir().mkdir(parents=True, exist_ok=True)
+    seen = {row["id"] for row in existing if "id" in row}
+    seen_stray = {row["order_id"] for row in existing if "id" not in row}
+    totals = {"orders": 0, "items": 0, "sales": 0.0}
+
+    def _write(raw):
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+            def _emit(row):
+                gz.write(current_app.json.dumps(row).encode("utf-8") + b"\n")
+                if "id" in row:  # payment-only lines don't count as orders
+                    totals["orders"] += 1
+                    totals["items"] += sum(int(it["quantity"] or 0) for it in row["items"])
+                    totals["sales"] += float(row["total"] or 0.0)
+
+            for row in existing:
+                _emit(row)
+            for n in range(0, len(order_ids), CHUNK):
+                for row in _load_orders(order_ids[n:n + CHUNK]):
+                    if row["id"] not in seen:
+                        _emit(row)
+            for row in _load_stray_payments(start, end):
+                if row["order_id"] not in seen_stray:
+                    _emit(row)
+
+    _write_atomic(path, _write)
+
+    entry = {
+        "file": path.name,
+        "orders": totals["orders"],
+        "items": totals["items"],
+        "sales": round(totals["sales"], 2),
+        "archived_at": datetime.utcnow().isoformat() + "Z",
+    }
+    # Recorded before the delete, so a crash after it can't leave the month nowhere
+    data = manifest()
+    data["months"][month] = {**entry, "pending": True}
+    _save_manifest(data)
+
+    # The file is durable; now remove the rows (one transaction)
+    i, pay, om = OrderItem.__table__, Payment.__table__, OrderItemModifier.__table__
+    month_ids = select(o.id).where(o.ordertime >= start, o.ordertime < end).scalar_subquery()
+    db.session.execute(delete(om).where(om.c.orderid.in_(month_ids)))
+    db.session.execute(delete(i).where(i.c.orderid.in_(month_ids)))
+    db.session.execute(delete(pay).where(pay.c.orderid.in_(month_ids)))
+    db.session.execute(delete(Order.__table__).where(o.ordertime >= start, o.ordertime < end))
+    db.session.execute(delete(pay).where(*_stray_payments(start, end)))
+    _drop_month_partitions(month)
+    db.session.commit()
+
+    data = manifest()
+    data["months"][month] = entry
+    _save_manifest(data)
+    return {"month": month, **entry}
+
+
+# --- report reads ---------------------------------------------------------
+
+def _month_rows(month: str) -> List[tuple]:
+    path = _month_file(month)
+    key = (month, path.stat().st_mtime)
+    with _cache_lock:
+        rows = _rows_cache.get(key)
+        if rows is not None:
+            _rows_cache.move_to_end(key)
+            return rows
+    rows = [
+        (
+            datetime.fromisoformat(row["order_time"]),
+            float(row["total"] or 0.0),
+            tuple((it["name"], int(it["quantity"] or 0)) for it in row["items"]),
+        )
+        for row in _read_lines(path)
+        if row.get("order_time")
+    ]
+    with _cache_lock:
+        _rows_cache[key] = rows
+        while len(_rows_cache) > CACHED_MONTHS:
+            _rows_cache.popitem(last=False)
+    return rows
+
+
+def _rows(start_ts: datetime, end_ts: datetime) -> Iterator[tuple]:
+    """Archived (order_time, total, items) in [start_ts, end_ts), reading only overlapping months."""
+    for month in sorted(archived_months()):
+        m_start, m_end = month_bounds(month)
+        if m_end <= start_ts or m_start >= end_ts:
+            continue
+        for row in _month_rows(month):
+            if start_ts <= row[0] < end_ts:
+                yield row
+
+
+def sales_summary(start_ts: datetime, end_ts: datetime) -> Tuple[float, int]:
+    """(gross sales, order count) from the archive."""
+    gross, count = 0.0, 0
+    for _when, total, _items in _rows(start_ts, end_ts):
+        gross += total
+        count += 1
+    return round(gross, 2), count
+
+
+def item_quantities(start_ts: datetime, end_ts: datetime) -> Dict[str, int]:
+    qty: Dict[str, int] = {}
+    for _when, _total, items in _rows(start_ts, end_ts):
+        for name, n in items:
+            qty[name] = qty.get(name, 0) + n
+    return qty
+
+
+def daily_item_quantities(start_ts: datetime, end_ts: datetime) -> Dict[str, Dict[str, int]]:
+    """{"YYYY-MM-DD": {product name: quantity}} from the archive."""
+    days: Dict[str, Dict[str, int]] = {}
+    for when, _total, items in _rows(start_ts, end_ts):
+        day = days.setdefault(when.date().isoformat(), {})
+        for name, n in items:
+            day[name] = day.get(name, 0) + n
+    return days
+
@@ -5,7 +5,6 @@ import os
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-import requests
 from app.db import db
 from app.db.models import User
 from app.utils.errors import BadRequestError, NotFoundError, UnauthorizedError
@@ -78,6 +77,8 @@ class AuthService:
             "grant_type": "authorization_code",
         }
 
+        import requests  # deferred: only the OAuth callback needs it
+
         response = requests.post(config["token_uri"], data=data)
 
         if response.status_code != 200:
@@ -90,6 +91,8 @@ class AuthService:
         """Get user info from Google using access token"""
         config = AuthService.get_google_oauth_config()
 
+        import requests  # deferred: only the OAuth callback needs it
+
         headers = {"Authorization": f"Bearer {access_token}"}
         response = requests.get(config["userinfo_uri"], headers=headers)
 
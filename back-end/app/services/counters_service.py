@@ -0,0 +1,227 @@
+"""
+Maintained running totals.
+
+Checkout bumps counter rows inside its own transaction, so reads are a primary-key
+lookup instead of an aggregate over the whole order history. Every counter has a
+reconciler that recomputes it from the source tables; it seeds new rows on first
+read and a periodic job uses it to correct drift.
+
+A row checkout creates (the first order of a day, or before the first read) holds
+only the orders since it was created, so it is stored "unseeded" (updated_at NULL)
+and the next read reconciles it. Reconciliation locks the row before computing
+the aggregate, so a checkout committing meanwhile waits and then adds its delta
+on top instead of being overwritten.
+
+Counter names are either global ("orders_total") or per UTC day ("revenue:2025-11-02").
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+
+from flask import current_app
+from sqlalchemy import case, func
+
+from app.db import db, routing
+from app.db.models import Order, OrderItem, Product, RunningCounter
+
+
+def _day_window(day: date):
+    start = datetime(day.year, day.month, day.day)
+    return start, start + timedelta(days=1)
+
+
+def _orders_total(_day=None) -> float:
+    from app.services.archive_service import archived_totals
+
+    return float(db.session.query(func.count(Order.id)).scalar() or 0) + archived_totals()["orders"]
+
+
+def _items_total(_day=None) -> float:
+    from app.services.archive_service import archived_totals
+
+    live = float(db.session.query(func.coalesce(func.sum(OrderItem.quantity), 0)).scalar() or 0)
+    return live + archived_totals()["items"]
+
+
+def _revenue_for_day(day: date) -> float:
+    start, end = _day_window(day)
+    total = (
+        db.session.query(func.coalesce(func.sum(Order.total), 0.0))
+        .filter(Order.order_time >= start, Order.order_time < end)
+        .scalar()
+    )
+    return round(float(total or 0.0), 2)
+
+
+def _drinks_for_day(day: date) -> float:
+    from app.services.orders_service import _is_drink_category
+
+    start, end = _day_window(day)
+    rows = (
+        db.session.query(Product.category, func.coalesce(func.sum(OrderItem.quantity), 0))
+        .join(OrderItem, OrderItem.product_id == Product.id)
+        .join(Order, Order.id == OrderItem.order_id)
+        .filter(Order.order_time >= start, Order.order_time < end)
+        .group_by(Product.category)
+        .all()
+    )
+    return float(sum(qty for category, qty in rows if _is_drink_category(category)))
+
+
+# name -> reconciler for global counters
+GLOBAL_COUNTERS: Dict[str, Callable] = {
+    "orders_total": _orders_total,
+    "items_total": _items_total,
+}
+
+# prefix -> reconciler(day) for per-day counters
+DAILY_COUNTERS: Dict[str, Callable[[date], float]] = {
+    "revenue": _revenue_for_day,
+    "drinks": _drinks_for_day,
+}
+
+
+def daily_name(kind: str, day: date) -> str:
+    return f"{kind}:{day.isoformat()}"
+
+
+def _reconciler_for(name: str) -> Callable[[], float]:
+    if name in GLOBAL_COUNTERS:
+        return GLOBAL_COUNTERS[name]
+    kind, _, day_str = name.partition(":")
+    if kind in DAILY_COUNTERS and day_str:
+        day = date.fromisoformat(day_str)
+        return lambda: DAILY_COUNTERS[kind](day)
+    raise KeyError(f"unknown counter {name!r}")
+
+
+def _insert():
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(RunningCounter.__table__)
+
+
+def increment(deltas: Dict[str, float]) -> None:
+    """
+    Add deltas to the counter rows in the caller's transaction (commit happens there),
+    with a single upsert. Rows that don't exist yet are created unseeded, holding just
+    this delta, until a read reconciles them.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if deltas:
+        table = RunningCounter.__table__
+        # Same row order in every checkout, so concurrent upserts can't deadlock
+        stmt = _insert().values([{"name": n, "value": deltas[n], "updated_at": None} for n in sorted(deltas)])
+        db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.name],
+                set_={
+                    "value": table.c.value + stmt.excluded.value,
+                    # keep unseeded rows marked as such
+                    "updated_at": case((table.c.updated_at.is_(None), None), else_=datetime.utcnow()),
+                },
+            )
+        )
+    _ensure_reconciler()
+
+
+def _lock(name: str) -> Optional[float]:
+    """Create or row-lock counter name for the rest of the transaction; its value if seeded."""
+    table = RunningCounter.__table__
+    stmt = _insert().values(name=name, value=0.0, updated_at=None)
+    row = db.session.execute(
+        stmt.on_conflict_do_update(index_elements=[table.c.name], set_={"value": table.c.value})
+        .returning(table.c.value, table.c.updated_at)
+    ).one()
+    return row.value if row.updated_at is not None else None
+
+
+def _store(name: str, value: float) -> None:
+    table = RunningCounter.__table__
+    db.session.execute(
+        table.update().where(table.c.name == name).values(value=value, updated_at=datetime.utcnow())
+    )
+
+
+def reconcile(names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Recompute counters from the source tables and store them, one transaction per
+    counter with its row locked meanwhile. Defaults to every global counter plus
+    today's daily ones. Returns {name: {"before", "after"}}; "before" is None for a
+    row that wasn't seeded yet.
+    """
+    if names is None:
+        today = datetime.utcnow().date()
+        names = list(GLOBAL_COUNTERS) + [daily_name(kind, today) for kind in DAILY_COUNTERS]
+
+    report: Dict[str, Dict[str, Optional[float]]] = {}
+    # Even from a replica-routed request (/api/meta/stats): computed and stored on the primary
+    with routing.primary():
+        for name in names:
+            try:
+                before = _lock(name)
+                after = _reconciler_for(name)()
+                _store(name, after)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            report[name] = {"before": before, "after": after}
+    return report
+
+
+def read(names: Iterable[str]) -> Dict[str, float]:
+    """Primary-key lookup of counters; missing or unseeded rows are seeded via reconcile."""
+    names = list(names)
+    rows = {
+        name: value
+        for name, value, updated_at in db.session.query(
+            RunningCounter.name, RunningCounter.value, RunningCounter.updated_at
+        ).filter(RunningCounter.name.in_(names))
+        if updated_at is not None
+    }
+    missing = [n for n in names if n not in rows]
+    if missing:
+        for name, entry in reconcile(missing).items():
+            rows[name] = entry["after"]
+    _ensure_reconciler()
+    return {n: float(rows[n] or 0.0) for n in names}
+
+
+_reconciler_thread: Optional[threading.Thread] = None
+_reconciler_lock = threading.Lock()
+
+
+def _reconcile_loop(app, interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                drift = {n: e for n, e in reconcile().items() if e["before"] is not None and e["before"] != e["after"]}
+                if drift:
+                    print(f"Counter drift corrected: {drift}")
+            except Exception as e:
+                print(f"ERROR reconciling counters: {repr(e)}")
+            finally:
+                db.session.remove()
+
+
+def _ensure_reconciler() -> None:
+    """Start the periodic reconciliation thread once per process (COUNTER_RECONCILE_SECONDS, 0 = off)."""
+    global _reconciler_thread
+    if _reconciler_thread is not None:
+        return
+    interval = float(current_app.config.get("COUNTER_RECONCILE_SECONDS", 0) or 0)
+    if interval <= 0:
+        return
+    with _reconciler_lock:
+        if _reconciler_thread is not None:
+            return
+        app = current_app._get_current_object()
+        _reconciler_thread = threading.Thread(
+            target=_reconcile_loop, args=(app, interval), name="counter-reconcile", daemon=True
+        )
+        _reconciler_thread.start()
@@ -0,0 +1,142 @@
+"""
+Live manager dashboard: the X-report's hourly buckets kept in memory and pushed
+as deltas (served as SSE at /api/reports/live).
+
+The aggregate is read from the database (reports_service.hourly_buckets) when the
+first dashboard connects. After that, every order.created / order.refunded this
+process publishes is folded in and becomes a small "delta" event on the
+dashboard's own broker, encoded once for all subscribers. An open dashboard costs
+an idle stream, not an hourly aggregation per refresh.
+
+Checkouts handled by other worker processes never reach this process, so the
+aggregate is re-read every DASHBOARD_RECONCILE_SECONDS by whichever stream wakes
+first, and at once after a Z close or when the UTC day changes. If the
+re-read differs from memory, subscribers get a fresh "snapshot" to replace theirs.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from flask import current_app
+
+from app.services import events_service, reports_service
+from app.services.events_service import EventBroker
+from app.services.reports_service import BUCKET_FIELDS, TENDERS
+
+broker = EventBroker(history=256)
+
+
+class DashboardState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start_ts: Optional[datetime] = None  # None until the first dashboard connects
+        self.day = None
+        self.buckets: Dict[int, Dict[str, Any]] = {}
+        self.reconciled_at = 0.0  # time.monotonic(); 0 forces a re-read
+
+
+state = DashboardState()
+_reconcile_lock = threading.Lock()
+
+
+def _rounded(buckets: Dict[int, Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    # cents, so a re-read doesn't differ from the running sums by float noise
+    return {
+        hr: {k: (round(v, 2) if isinstance(v, float) else v) for k, v in b.items()}
+        for hr, b in buckets.items()
+    }
+
+
+def _snapshot_data() -> Dict[str, Any]:
+    # caller holds state.lock
+    rows = [state.buckets[hr] for hr in sorted(state.buckets)]
+    totals = {f: round(sum(r[f] for r in rows), 2) if f != "orders" else sum(r[f] for r in rows)
+              for f in BUCKET_FIELDS}
+    return {"period_start": state.start_ts, "buckets": rows, "totals": totals}
+
+
+def _stale(max_age: float) -> bool:
+    if state.start_ts is None or state.reconciled_at == 0.0:
+        return True
+    if state.day != datetime.utcnow().date():
+        return True
+    return max_age > 0 and time.monotonic() - state.reconciled_at >= max_age
+
+
+def reconcile(max_age: float = 0.0, force: bool = False) -> None:
+    """Re-read the buckets if stale (needs an app context); broadcast a snapshot if they changed."""
+    with _reconcile_lock:
+        if not force and not _stale(max_age):
+            return
+        start_ts = reports_service.x_report_start()
+        buckets = _rounded(reports_service.hourly_buckets(start_ts))
+        with state.lock:
+            had_state = state.start_ts is not None
+            changed = start_ts != state.start_ts or buckets != state.buckets
+            state.start_ts = start_ts
+            state.day = datetime.utcnow().date()
+            state.buckets = buckets
+            state.reconciled_at = time.monotonic()
+            if had_state and changed:
+                data = _snapshot_data()
+                broker.publish("snapshot", data, current_app.json.dumps(data))
+
+
+def mark_stale() -> None:
+    """The window moved (Z close); the next stream wake re-reads it."""
+    with state.lock:
+        state.reconciled_at = 0.0
+
+
+def snapshot_frame() -> Tuple[str, int]:
+    """Current buckets as an SSE "snapshot" frame carrying the broker's last id."""
+    with state.lock:
+        data = _snapshot_data()
+        last_id = broker.last_id
+    return f"id: {last_id}\nevent: snapshot\ndata: {current_app.json.dumps(data)}\n\n", last_id
+
+
+def _delta(event_type: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if event_type == "order.created":
+        when = data["order_time"]
+        delta = {"sales": float(data["total"]), "orders": 1}
+        payment = data.get("payment") or {}
+        method = str(payment.get("method") or "").lower()
+        if method in TENDERS:
+            delta[method] = float(payment["amount"])
+    elif event_type == "order.refunded":
+        when = data.get("time") or datetime.utcnow()
+        amount = float(data["refunded"])
+        delta = {"returns": amount}
+        method = str(data.get("method") or "").lower()
+        if method in TENDERS:
+            delta[method] = -amount
+    else:
+        return None
+    if when < state.start_ts:
+        return None
+    delta["hour"] = when.hour
+    return delta
+
+
+def _on_order_event(event_type: str, data: Dict[str, Any]) -> None:
+    # Called from events_service.publish in the request that made the change
+    if state.start_ts is None:
+        return  # no dashboard has connected yet; the first one reads the database
+    with state.lock:
+        try:
+            delta = _delta(event_type, data)
+        except (KeyError, TypeError, ValueError):
+            state.reconciled_at = 0.0  # unexpected payload: fall back to a re-read
+            return
+        if delta is None:
+            return
+        bucket = state.buckets.setdefault(delta["hour"], reports_service.empty_bucket(delta["hour"]))
+        for field, value in delta.items():
+            if field != "hour":
+                bucket[field] = round(bucket[field] + value, 2) if isinstance(value, float) else bucket[field] + value
+        broker.publish("delta", delta, current_app.json.dumps(delta))
+
+
+events_service.subscribe(_on_order_event)
@@ -1,20 +1,9 @@
-from app.db import db
+from app.db import db, reads
 from app.db.models import Cashier, Order
 from app.utils.errors import NotFoundError, BadRequestError
 
 def list_cashiers():
-    people = Cashier.query.all()
-    return [
-        {
-            "id": c.id,
-            "name": c.name,
-            "employee_code": c.employee_code,
-            "role": c.role,
-            "is_active": c.is_active,
-            "hire_date": c.hire_date.isoformat() if c.hire_date else None,
-        }
-        for c in people
-    ]
+    return [reads.cashier_dict(r) for r in reads.cashier_rows()]
 
 def create_cashier(body: dict):
     required = ["name", "employee_code", "role"]
@@ -0,0 +1,123 @@
+"""
+In-process pub/sub for live order events (served as SSE at /api/orders/stream).
+
+Publishers (create_order, refund) append an event to a bounded ring buffer and
+wake every waiting subscriber. Each event is encoded to its SSE frame once, at
+publish time, so fan-out costs the same however many screens are connected.
+Event ids increase monotonically, so a reconnecting client resumes from its
+Last-Event-ID as long as that id is still in the buffer. If it isn't, the client
+gets a "reset" event and should reload from the REST API.
+
+Events are per process: with several gunicorn workers, run the stream on one
+worker with threads (gthread) so every checkout reaches it.
+"""
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from flask import current_app
+
+DEFAULT_HISTORY = 1000
+
+
+class EventBroker:
+    def __init__(self, history: int = DEFAULT_HISTORY):
+        self._cond = threading.Condition()
+        self._events: deque = deque(maxlen=history)  # (id, type, data, frame)
+        self._last_id = 0
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def resize(self, history: int) -> None:
+        with self._cond:
+            if history != self._events.maxlen:
+                self._events = deque(self._events, maxlen=history)
+
+    def publish(self, event_type: str, data: Dict[str, Any], encoded: str) -> int:
+        """Append an event (encoded = its JSON payload) and wake subscribers; returns its id."""
+        with self._cond:
+            self._last_id += 1
+            event_id = self._last_id
+            frame = f"id: {event_id}\nevent: {event_type}\ndata: {encoded}\n\n"
+            self._events.append((event_id, event_type, data, frame))
+            self._cond.notify_all()
+            return event_id
+
+    def _after(self, last_id: int) -> Tuple[List[tuple], bool]:
+        # caller holds the lock; ids in the buffer are contiguous
+        if not self._events or last_id >= self._last_id:
+            return [], False
+        first_id = self._events[0][0]
+        if last_id < first_id - 1:
+            return list(self._events), True  # the client missed events that fell off the buffer
+        return list(islice(self._events, last_id - first_id + 1, None)), False
+
+    def since(self, last_id: int) -> Tuple[List[tuple], bool]:
+        """Events after last_id, plus whether some were already dropped from the buffer."""
+        with self._cond:
+            return self._after(last_id)
+
+    def wait(self, last_id: int, timeout: float) -> Tuple[List[tuple], bool]:
+        """Block until there's something after last_id or timeout passes."""
+        with self._cond:
+            if self._last_id <= last_id:
+                self._cond.wait(timeout)
+            return self._after(last_id)
+
+    def recent(self, limit: int, event_type: Optional[str] = None) -> List[tuple]:
+        with self._cond:
+            events = [e for e in self._events if event_type is None or e[1] == event_type]
+        return events[-limit:]
+
+
+broker = EventBroker()
+
+# In-process consumers (e.g. the live dashboard aggregate), called after each publish
+_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+
+def subscribe(listener: Callable[[str, Dict[str, Any]], None]) -> None:
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def publish(event_type: str, data: Dict[str, Any]) -> int:
+    """Publish from request code (uses the app's JSON provider for datetimes)."""
+    broker.resize(int(current_app.config.get("ORDER_EVENTS_HISTORY", DEFAULT_HISTORY)))
+    event_id = broker.publish(event_type, data, current_app.json.dumps(data))
+    for listener in _listeners:
+        listener(event_type, data)
+    return event_id
+
+
+def sse_stream(source: EventBroker, last_id: int, heartbeat: float, max_seconds: float,
+               on_wake: Optional[Callable[[], None]] = None,
+               resync: Optional[Callable[[], Tuple[str, int]]] = None) -> Iterator[str]:
+    """
+    SSE frames from source after last_id, with keep-alive comments while idle. Closes
+    after max_seconds (0 = never); clients reconnect on their own with Last-Event-ID.
+    on_wake runs after every wait. When the client has fallen off the buffer it gets
+    resync()'s (frame, last_id) if given, else a "reset" event.
+    """
+    deadline = time.monotonic() + max_seconds if max_seconds > 0 else None
+    yield "retry: 3000\n\n"
+    while deadline is None or time.monotonic() < deadline:
+        events, gap = source.wait(last_id, heartbeat)
+        if on_wake is not None:
+            on_wake()
+        if gap and resync is not None:
+            frame, last_id = resync()
+            yield frame
+            continue
+        if gap:
+            yield f"event: reset\ndata: {{\"last_event_id\": {source.last_id}}}\n\n"
+        if not events:
+            yield ": keep-alive\n\n"
+            continue
+        for event_id, _type, _data, frame in events:
+            yield frame
+            last_id = event_id
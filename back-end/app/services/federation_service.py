@@ -0,0 +1,171 @@
+"""
+Chain-wide reports across several store databases (STORE_DATABASE_URLS).
+
+A federated report (?stores=all or ?stores=downtown,campus on summary,
+weekly-items and daily-top) runs the report's partial aggregate
+(reports_service.sales_totals / item_quantities / daily_item_quantities) against
+every selected store at once on a shared thread pool. The per-store results are
+added together before any winner is picked, so the chain's top item is the one
+with the most combined sales, not a vote among each store's own winners.
+
+Each request has one deadline, FEDERATED_STORE_TIMEOUT_SECONDS after it starts,
+and time spent queued for a thread counts against it. A running query is bounded by
+the same deadline: on PostgreSQL through statement_timeout, on SQLite through a
+progress handler that interrupts it, so threads free up when the request gives up
+(a started future can't be cancelled). Each store runs at most
+FEDERATED_STORE_CONCURRENCY queries at once; a store already at its limit is
+reported "busy" rather than queued, so one slow store can't fill the pool. A store
+that times out, is busy or fails is reported under "stores", and the rest still
+answer (with "partial": true). Store engines are created on first use and kept,
+with small pools, for the life of the process.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from app.utils import metrics
+from app.utils.errors import BadRequestError
+
+STORE_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Federation:
+    def __init__(self, stores: Dict[str, str], timeout: float, max_workers: int, per_store: int):
+        self.stores = stores
+        self.timeout = timeout
+        self._slots = {name: threading.BoundedSemaphore(max(1, per_store)) for name in stores}
+        self._engines: Dict[str, Engine] = {}
+        self._engines_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="federated-report")
+
+    def _engine(self, name: str) -> Engine:
+        engine = self._engines.get(name)
+        if engine is None:
+            with self._engines_lock:
+                engine = self._engines.get(name)
+                if engine is None:
+                    url = self.stores[name]
+                    options: Dict[str, Any] = {"pool_pre_ping": True}
+                    if url.startswith("postgresql"):
+                        options.update(pool_size=2, max_overflow=2,
+                                       connect_args={"connect_timeout": max(1, int(self.timeout))})
+                    engine = create_engine(url, **options)
+                    self._engines[name] = engine
+        return engine
+
+    def _run_store(self, name: str, query: Callable, deadline: float) -> Tuple[Any, float]:
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("deadline passed while queued")
+            started = time.perf_counter()
+            try:
+                result = self._query(name, query, deadline)
+            except Exception as exc:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError("interrupted at the deadline") from exc
+                raise
+            return result, time.perf_counter() - started
+        finally:
+            self._slots[name].release()
+
+    def _query(self, name: str, query: Callable, deadline: float) -> Any:
+        with self._engine(name).connect() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text(f"SET LOCAL statement_timeout = {max(1, int((deadline - time.monotonic()) * 1000))}"))
+                return query(conn)
+            raw = conn.connection.driver_connection
+            # A non-zero return aborts the running statement (sqlite3.OperationalError: interrupted)
+            raw.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+            try:
+                return query(conn)
+            finally:
+                raw.set_progress_handler(None, 0)
+
+    def fan_out(self, names: List[str], query: Callable) -> Tuple[Dict[str, Any], Dict[str, dict]]:
+        """Run query(conn) on each store; returns ({store: result}, {store: status})."""
+        deadline = time.monotonic() + self.timeout
+        status: Dict[str, dict] = {}
+        futures = {}
+        for name in names:
+            if self._slots[name].acquire(blocking=False):
+                futures[name] = self._pool.submit(self._run_store, name, query, deadline)
+            else:
+                status[name] = {"status": "busy", "error": "store is still answering earlier reports"}
+        wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+
+        results: Dict[str, Any] = {}
+        for name in names:
+            future = futures.get(name)
+            if future is None:
+                pass  # already reported busy
+            elif not future.done() or isinstance(future.exception(), TimeoutError):
+                status[name] = {"status": "timeout", "error": f"no answer within {self.timeout:g}s"}
+            elif future.exception() is not None:
+                status[name] = {"status": "error", "error": str(future.exception()).splitlines()[0][:200]}
+            else:
+                results[name], seconds = future.result()
+                status[name] = {"status": "ok", "ms": round(seconds * 1000, 1)}
+                metrics.observe("federated_store_query_seconds", {"store": name}, seconds,
+                                buckets=STORE_LATENCY_BUCKETS)
+            if status[name]["status"] != "ok":
+                metrics.inc("federated_store_failures_total", {"store": name, "reason": status[name]["status"]})
+        return results, status
+
+
+_federations_lock = threading.Lock()
+
+
+def _federation() -> Federation:
+    federation = current_app.extensions.get("federation")
+    if federation is None:
+        with _federations_lock:
+            federation = current_app.extensions.get("federation")
+            if federation is None:
+                metrics.describe("federated_store_query_seconds", "histogram",
+                                 "Time for one store to answer a federated report query.")
+                metrics.describe("federated_store_failures_total", "counter",
+                                 "Federated report queries a store failed or timed out on.")
+                federation = Federation(
+                    dict(current_app.config.get("STORE_DATABASE_URLS") or {}),
+                    float(current_app.config.get("FEDERATED_STORE_TIMEOUT_SECONDS", 5)),
+                    int(current_app.config.get("FEDERATED_MAX_WORKERS", 8)),
+                    int(current_app.config.get("FEDERATED_STORE_CONCURRENCY", 2)),
+                )
+                current_app.extensions["federation"] = federation
+    return federation
+
+
+def select_stores(param: Optional[str]) -> List[str]:
+    """Store names for ?stores= ("all" or a comma-separated list of configured names)."""
+    configured = list((current_app.config.get("STORE_DATABASE_URLS") or {}).keys())
+    if not configured:
+        raise BadRequestError("No stores configured; set STORE_DATABASE_URLS for federated reports.")
+    if not param or param.strip().lower() == "all":
+        return configured
+    # Each store once, in the order given; a repeated name would be counted twice
+    names = list(dict.fromkeys(n.strip() for n in param.split(",") if n.strip()))
+    unknown = [n for n in names if n not in configured]
+    if unknown:
+        raise BadRequestError(f"Unknown store(s): {', '.join(unknown)}. Configured: {', '.join(configured)}.")
+    return names
+
+
+def run(names: List[str], query: Callable, merge: Callable, empty) -> Dict[str, Any]:
+    """Fan query out to the stores, fold the answers with merge(acc, result), and report per-store status."""
+    results, status = _federation().fan_out(names, query)
+    merged = empty
+    for name in names:
+        if name in results:
+            merged = merge(merged, results[name])
+    return {
+        "data": merged,
+        "stores": status,
+        "partial": len(results) < len(names),
+        "stores_answered": len(results),
+    }
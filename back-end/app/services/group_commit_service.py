@@ -0,0 +1,159 @@
+"""
+Group commit for checkout (GROUP_COMMIT_ENABLED).
+
+Normally every checkout pays for its own commit, and on a durable database that
+commit (the fsync) is most of its latency, so commits per second cap checkouts per
+second during a rush. In group-commit mode the request still validates and prices
+its order (orders_service.prepare_order), then hands the plan to one writer thread
+and waits on a Future. The writer takes up to GROUP_COMMIT_MAX_BATCH queued plans,
+waiting at most GROUP_COMMIT_MAX_WAIT_MS after the first for more to arrive (only
+while the previous batch had more than one), writes them in one transaction and
+commits once (orders_service.persist_orders).
+
+A request is answered only after the commit that contains its order, so a 201 is
+as durable as before. If a batch fails to commit, its orders are retried one per
+transaction so a single bad order can't fail the others. One writer per app per process.
+
+A request waits at most GROUP_COMMIT_TIMEOUT_SECONDS. If its order is still queued
+by then it is withdrawn and the request fails with 503, so nothing is written. An
+order the writer has already started may still commit, and the 503 says so. A
+writer thread that has died is replaced on the next checkout.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import List, Tuple
+
+from flask import current_app
+
+from app.db import db
+from app.utils import metrics
+from app.utils.errors import ServiceUnavailableError
+
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class GroupCommitWriter:
+    def __init__(self, app, max_batch: int, max_wait: float):
+        self._app = app
+        self._max_batch = max(1, max_batch)
+        self._max_wait = max(0.0, max_wait)
+        self._last_batch = 1
+        self._queue: "queue.Queue[Tuple[dict, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def submit(self, plan: dict) -> Future:
+        future: Future = Future()
+        self._queue.put((plan, future))
+        return future
+
+    def _next_batch(self) -> List[Tuple[dict, Future]]:
+        batch = [self._queue.get()]
+        # Only linger for company when the last batch had some; a lone register shouldn't pay the wait
+        deadline = time.monotonic() + (self._max_wait if self._last_batch > 1 else 0.0)
+        while len(batch) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                # past the deadline, still take whatever is already queued
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._last_batch = len(batch)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            # Skip orders whose request gave up waiting while they were queued
+            batch = [(plan, future) for plan, future in self._next_batch() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            with self._app.app_context():
+                try:
+                    self._write(batch)
+                except Exception as e:  # never leave a request waiting
+                    for _plan, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                finally:
+                    db.session.remove()
+
+    def _write(self, batch: List[Tuple[dict, Future]]) -> None:
+        from app.services.orders_service import persist_orders
+
+        metrics.observe("checkout_group_commit_batch_size", {}, len(batch), buckets=BATCH_BUCKETS)
+        try:
+            results = persist_orders([plan for plan, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            print(f"Group commit of {len(batch)} orders failed ({e!r}); retrying one by one")
+            # Nothing the failed batch flushed may ride along with the retries
+            db.session.rollback()
+            for plan, future in batch:
+                try:
+                    _resolve(future, persist_orders([plan])[0])
+                except Exception as single_error:
+                    future.set_exception(single_error)
+            return
+        for (_plan, future), result in zip(batch, results):
+            _resolve(future, result)
+
+
+_writers_lock = threading.Lock()
+
+
+def _resolve(future: Future, result) -> None:
+    if isinstance(result, Exception):
+        future.set_exception(result)
+    else:
+        future.set_result(result)
+
+
+def _writer() -> GroupCommitWriter:
+    writer = current_app.extensions.get("group_commit")
+    if writer is None or not writer.alive:
+        with _writers_lock:
+            writer = current_app.extensions.get("group_commit")
+            if writer is not None and not writer.alive:
+                print("Group-commit writer thread died; starting a new one")
+                metrics.inc("checkout_group_commit_restarts_total", {})
+                writer = None
+            if writer is None:
+                metrics.describe("checkout_group_commit_batch_size", "histogram",
+                                 "Orders written per group commit.")
+                metrics.describe("checkout_group_commit_restarts_total", "counter",
+                                 "Group-commit writer threads replaced after dying.")
+                writer = GroupCommitWriter(
+                    current_app._get_current_object(),
+                    int(current_app.config.get("GROUP_COMMIT_MAX_BATCH", 32)),
+                    float(current_app.config.get("GROUP_COMMIT_MAX_WAIT_MS", 2)) / 1000.0,
+                )
+                current_app.extensions["group_commit"] = writer
+    return writer
+
+
+def submit(plan: dict):
+    """
+    Queue a prepared order and block until its batch commits; returns persist_orders' entry.
+    Raises ServiceUnavailableError after GROUP_COMMIT_TIMEOUT_SECONDS.
+    """
+    timeout = float(current_app.config.get("GROUP_COMMIT_TIMEOUT_SECONDS", 10))
+    future = _writer().submit(plan)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        if future.cancel():
+            raise ServiceUnavailableError(
+                f"Checkout is busy: the order was not saved within {timeout:g}s. Please try again."
+            ) from None
+        raise ServiceUnavailableError(
+            f"Checkout is slow: the order is still being saved after {timeout:g}s. "
+            "Check recent orders before retrying."
+        ) from None
@@ -0,0 +1,121 @@
+"""
+Liveness/readiness probes.
+
+Readiness never touches the request session: a background thread runs SELECT 1
+on its own pooled connection every HEALTH_PROBE_SECONDS and /ready only reads the
+cached result plus pool and query-latency diagnostics.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from flask import current_app
+
+from app.db import db
+from app.db.instrumentation import pool_status, query_latency_percentiles
+
+_probe: Dict[str, Any] = {"ok": None, "error": None, "latency_ms": None, "checked_at": None, "monotonic": None}
+_probe_lock = threading.Lock()
+_probe_start_lock = threading.Lock()
+_probe_thread: Optional[threading.Thread] = None
+
+
+def _run_probe(engine) -> None:
+    started = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(db.text("SELECT 1"))
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, str(e)
+    latency_ms = (time.perf_counter() - started) * 1000.0
+    with _probe_lock:
+        _probe.update({
+            "ok": ok,
+            "error": error,
+            "latency_ms": round(latency_ms, 3),
+            "checked_at": datetime.utcnow().isoformat() + "Z",
+            "monotonic": time.monotonic(),
+        })
+
+
+def _probe_loop(app, interval: float) -> None:
+    with app.app_context():
+        engine = db.engine
+    while True:
+        time.sleep(interval)
+        _run_probe(engine)
+
+
+def _ensure_probe() -> None:
+    """Run the first probe inline, then keep it fresh from a daemon thread."""
+    global _probe_thread
+    if _probe_thread is not None:
+        return
+    with _probe_start_lock:
+        if _probe_thread is not None:
+            return
+        app = current_app._get_current_object()
+        interval = float(app.config.get("HEALTH_PROBE_SECONDS", 5))
+        # Concurrent first callers wait here, so none of them sees a probe that hasn't run
+        _run_probe(db.engine)
+        thread = threading.Thread(target=_probe_loop, args=(app, interval), name="db-probe", daemon=True)
+        thread.start()
+        _probe_thread = thread
+
+
+def readiness() -> Dict[str, Any]:
+    """Cached DB probe + pool/latency diagnostics, with the reasons we're degraded/unready."""
+    _ensure_probe()
+    cfg = current_app.config
+    interval = float(cfg.get("HEALTH_PROBE_SECONDS", 5))
+
+    with _probe_lock:
+        probe = dict(_probe)
+    age = time.monotonic() - probe.pop("monotonic") if probe["checked_at"] else None
+    probe["age_seconds"] = round(age, 3) if age is not None else None
+
+    pool = pool_status(db.engine)
+    latency = query_latency_percentiles()
+
+    # Hard failures take the node out of rotation; soft ones are reported only
+    unready = []
+    degraded = []
+    if probe["ok"] is None:
+        unready.append("database probe has not completed yet")
+    elif not probe["ok"]:
+        unready.append(f"database probe failed: {probe['error']}")
+    if age is not None and age > interval * 3:
+        unready.append(f"database probe is stale ({age:.1f}s old)")
+
+    capacity = pool["capacity"]
+    if capacity and pool["checked_out"] is not None:
+        saturation = pool["checked_out"] / capacity
+        pool["saturation"] = round(saturation, 3)
+        if saturation >= 1.0:
+            unready.append(f"connection pool exhausted ({pool['checked_out']}/{capacity} checked out)")
+        elif saturation >= float(cfg.get("READY_POOL_SATURATION", 0.9)):
+            degraded.append(f"connection pool nearly saturated ({pool['checked_out']}/{capacity} checked out)")
+    if pool["overflow"]:
+        degraded.append(f"connection pool running {pool['overflow']} overflow connection(s)")
+
+    max_p95 = float(cfg.get("READY_MAX_P95_MS", 500))
+    if latency["samples"] and latency["p95_ms"] > max_p95:
+        degraded.append(f"query p95 latency {latency['p95_ms']:.1f}ms exceeds {max_p95:.0f}ms")
+
+    if unready:
+        status = "unready"
+    elif degraded:
+        status = "degraded"
+    else:
+        status = "ok"
+
+    return {
+        "ok": not unready,
+        "status": status,
+        "reasons": unready + degraded,
+        "probe": probe,
+        "pool": pool,
+        "query_latency": latency,
+    }
@@ -1,22 +1,9 @@
-from app.db import db
+from app.db import db, reads
 from app.db.models import InventoryItem
 from app.utils.errors import NotFoundError, BadRequestError
 
 def list_inventory():
-    items = InventoryItem.query.all()
-    # shape this similar to Manager Inventory table in Java app
-    return [
-        {
-            "id": i.id,
-            "item_name": i.item_name,
-            "current_stock": i.current_stock,
-            "min_threshold": i.min_threshold,
-            "unit": i.unit,
-            "last_restock_date": i.last_restock_date.isoformat() if i.last_restock_date else None,
-            # priority fields (Low Stock / High etc.) can be derived here later
-        }
-        for i in items
-    ]
+    return [reads.inventory_dict(r) for r in reads.inventory_rows()]
 
 def create_inventory_item(body: dict):
     required = ["item_name", "current_stock", "min_threshold", "unit"]
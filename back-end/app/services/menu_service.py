@@ -0,0 +1,198 @@
+"""
+Pre-materialized, localized menu documents.
+
+A menu document (products grouped by category + the /api/meta/options labels)
+is built once per (menu version, language) and kept in memory, for the languages
+in MENU_LANGUAGES only. The menu version comes from one cheap query: a generation
+counter that product writes bump in the same commit (running_counter
+"menu_version"), plus the product count and highest id, so every worker notices
+product changes without any coordination. Product writes also schedule a
+background rebuild of the languages we have already served, so kiosks switching
+language get one cached response instead of N translation calls.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import text
+
+from app.db import db
+from app.db.models import Product, RunningCounter
+from app.services.meta_service import MENU_OPTIONS
+from app.utils.errors import BadRequestError
+
+SOURCE_LANGUAGE = "en"
+VERSION_COUNTER = "menu_version"
+
+VERSION_SQL = text(
+    "SELECT (SELECT value FROM running_counter WHERE name = :name), COUNT(*), MAX(id) FROM product"
+)
+
+# Documents built with translation failures are served, but retried after this many seconds
+DEGRADED_RETRY_SECONDS = 60
+
+# lang -> {"version", "document", "retry_at"}
+_documents: Dict[str, Dict[str, Any]] = {}
+_documents_lock = threading.Lock()
+_build_locks: Dict[str, threading.Lock] = {}
+
+_rebuild_pending = threading.Event()
+
+
+def _product_rows():
+    return (
+        db.session.query(
+            Product.id, Product.name, Product.category, Product.base_price,
+            Product.is_popular, Product.description,
+        )
+        .order_by(Product.category, Product.name)
+        .all()
+    )
+
+
+def _menu_version() -> str:
+    generation, count, max_id = db.session.execute(VERSION_SQL, {"name": VERSION_COUNTER}).one()
+    return f"{int(generation or 0)}-{count}-{max_id or 0}"
+
+
+def bump_version() -> None:
+    """Mark the menu changed; call inside the product write's transaction, before its commit."""
+    row = db.session.get(RunningCounter, VERSION_COUNTER)
+    if row is None:
+        db.session.add(RunningCounter(name=VERSION_COUNTER, value=1, updated_at=datetime.utcnow()))
+    else:
+        row.value = RunningCounter.value + 1
+        row.updated_at = datetime.utcnow()
+
+
+def supported_languages() -> List[str]:
+    return list(current_app.config.get("MENU_LANGUAGES") or [SOURCE_LANGUAGE])
+
+
+def normalize_language(lang: Optional[str]) -> str:
+    """lang lowercased, or BadRequestError if it isn't one of MENU_LANGUAGES."""
+    lang = (lang or SOURCE_LANGUAGE).strip().lower()
+    supported = supported_languages()
+    if lang not in supported:
+        raise BadRequestError(f"Unsupported language '{lang}'. Use one of: {', '.join(supported)}.")
+    return lang
+
+
+def _build_document(rows, version: str, lang: str) -> Tuple[Dict[str, Any], int]:
+    # Collect every user-facing string once, then translate them in a single batch
+    texts = set()
+    for r in rows:
+        texts.update(t for t in (r.name, r.category, r.description) if t)
+    for key in ("ice_levels", "sweetness_levels", "sizes", "bases"):
+        texts.update(MENU_OPTIONS[key])
+    for key in ("toppings", "flavor_shots"):
+        texts.update(opt["label"] for opt in MENU_OPTIONS[key])
+
+    from app.services.translate_service import translate_many  # only when a document is built
+
+    tr, failures = translate_many(texts, target=lang, source=SOURCE_LANGUAGE)
+
+    categories: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        cat = categories.setdefault(r.category, {
+            "name": r.category,
+            "label": tr.get(r.category, r.category),
+            "products": [],
+        })
+        cat["products"].append({
+            "id": r.id,
+            "name": tr.get(r.name, r.name),
+            "description": tr.get(r.description, r.description) if r.description else r.description,
+            "price": r.base_price,
+            "is_popular": r.is_popular,
+        })
+
+    options: Dict[str, Any] = {}
+    for key in ("ice_levels", "sweetness_levels", "sizes", "bases"):
+        # keep the original value so the kiosk can send it back in customizations
+        options[key] = [{"value": v, "label": tr.get(v, v)} for v in MENU_OPTIONS[key]]
+    for key in ("toppings", "flavor_shots"):
+        options[key] = [{"key": o["key"], "label": tr.get(o["label"], o["label"])} for o in MENU_OPTIONS[key]]
+
+    document = {
+        "lang": lang,
+        "version": version,
+        "categories": list(categories.values()),
+        "options": options,
+    }
+    return document, failures
+
+
+def _store(lang: str, version: str, document: Dict[str, Any], failures: int) -> None:
+    with _documents_lock:
+        _documents[lang] = {
+            "version": version,
+            "document": document,
+            "retry_at": time.time() + DEGRADED_RETRY_SECONDS if failures else None,
+        }
+
+
+def _build_lock(lang: str) -> threading.Lock:
+    with _documents_lock:
+        return _build_locks.setdefault(lang, threading.Lock())
+
+
+def get_localized_menu(lang: str) -> Dict[str, Any]:
+    """Return the menu document for lang, building it only if the menu changed."""
+    lang = normalize_language(lang)
+    version = _menu_version()
+
+    entry = _documents.get(lang)
+    if entry is not None and entry["version"] == version:
+        if entry["retry_at"] is not None and time.time() >= entry["retry_at"]:
+            schedule_rebuild()
+        return entry["document"]
+
+    # Only one request per language pays for the build; the others wait for it
+    with _build_lock(lang):
+        entry = _documents.get(lang)
+        if entry is not None and entry["version"] == version:
+            return entry["document"]
+        document, failures = _build_document(_product_rows(), version, lang)
+        _store(lang, version, document, failures)
+        return document
+
+
+_rebuild_thread: Optional[threading.Thread] = None
+_rebuild_thread_lock = threading.Lock()
+
+
+def _rebuild_all(app) -> None:
+    global _rebuild_thread
+    while True:
+        with _rebuild_thread_lock:
+            if not _rebuild_pending.is_set():
+                _rebuild_thread = None
+                return
+            _rebuild_pending.clear()
+        with app.app_context():
+            try:
+                version = _menu_version()
+                rows = _product_rows()
+                for lang in list(_documents.keys()):
+                    with _build_lock(lang):
+                        document, failures = _build_document(rows, version, lang)
+                        _store(lang, version, document, failures)
+            except Exception as e:
+                print(f"ERROR rebuilding localized menus: {repr(e)}")
+            finally:
+                db.session.remove()
+
+
+def schedule_rebuild() -> None:
+    """Rebuild every language we've served in a background thread (call after product writes)."""
+    global _rebuild_thread
+    with _rebuild_thread_lock:
+        _rebuild_pending.set()
+        if _rebuild_thread is not None:
+            return  # the running thread picks the new request up before exiting
+        app = current_app._get_current_object()
+        _rebuild_thread = threading.Thread(target=_rebuild_all, args=(app,), name="menu-rebuild", daemon=True)
+        _rebuild_thread.start()
@@ -0,0 +1,22 @@
+# Static for now; you can move these to DB later if you want
+MENU_OPTIONS = {
+    "ice_levels": ["No Ice", "25%", "50%", "75%", "Normal", "Extra Ice"],
+    "sweetness_levels": ["0%", "25%", "50%", "75%", "100%"],
+    "sizes": ["Small", "Medium", "Large"],
+    "bases": ["Whole Milk", "Oat Milk", "Almond Milk", "Soy Milk", "Tea Base"],
+    "toppings": [
+        {"key": "boba", "label": "Boba"},
+        {"key": "lychee_jelly", "label": "Lychee Jelly"},
+        {"key": "pudding", "label": "Egg Pudding"},
+        {"key": "grass_jelly", "label": "Grass Jelly"}
+    ],
+    "flavor_shots": [
+        {"key": "vanilla", "label": "Vanilla"},
+        {"key": "caramel", "label": "Caramel"},
+        {"key": "hazelnut", "label": "Hazelnut"}
+    ]
+}
+
+
+def get_options():
+    return MENU_OPTIONS
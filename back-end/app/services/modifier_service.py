@@ -0,0 +1,338 @@
+"""
+Structured order-line modifiers (toppings, ice, sweetness, base, size, flavor shots).
+
+orderitem.customizations stays the free text the register shows ("Size: Large
+(+$0.75); 50% ice, Oat Milk, Boba"). parse_customizations() maps it onto the option
+keys of /api/meta/options (MENU_OPTIONS). Those keys are rows of `modifier`
+(small-int ids), and every order line gets one `orderitem_modifier` row per option,
+which carries the line's quantity. With the covering (modifierid, orderid, quantity)
+index, "how much boba did we sell" is an index range scan with no text parsing.
+
+Checkout doesn't write these rows, so it keeps its fixed round trips. Instead an
+indexer parses orders placed more than INDEX_LAG_SECONDS ago past a watermark
+(running_counter "modifiers_indexed_through"): every MODIFIER_INDEX_SECONDS in a
+background thread that each worker starts on its first request (init_app), and in
+bulk via scripts/backfill_modifiers.py. Order ids are drawn before commit, so an
+order below the watermark can still become visible late (a slow transaction, a
+group-commit batch); every pass also re-indexes the orders of the last
+RESCAN_SECONDS. Inserts ignore rows that already exist, so re-scans and several
+workers indexing at once are harmless.
+"""
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import bindparam, delete, func, select, text
+from sqlalchemy.exc import IntegrityError
+
+from app.db import db
+from app.db.models import Modifier, Order, OrderItem, OrderItemModifier, RunningCounter
+from app.services.meta_service import MENU_OPTIONS
+from app.services.orders_service import size_from_customizations
+
+WATERMARK = "modifiers_indexed_through"
+INDEX_LAG_SECONDS = 10  # leave in-flight checkouts alone
+RESCAN_SECONDS = 900  # longest a checkout transaction may take to commit and still be indexed
+BATCH_ORDERS = 5000
+
+# "Size: Large (+$0.75);" written by create_order / the register in front of the rest
+_SIZE_PREFIX = re.compile(r"^\s*Size:\s*(Small|Medium|Large)\b[^;]*;?", re.IGNORECASE)
+_PERCENT_ICE = re.compile(r"^(\d{1,3})\s*%\s*ice$")
+_PERCENT_SWEET = re.compile(r"^(\d{1,3})\s*%\s*(?:sweet|sweetness|sugar)$")
+_SPACES = re.compile(r"\s+")
+
+
+# --- parsing --------------------------------------------------------------
+
+def _options() -> List[Tuple[str, str, str]]:
+    """(group, key, label) for every option in MENU_OPTIONS."""
+    options = []
+    for group, values in MENU_OPTIONS.items():
+        for value in values:
+            if isinstance(value, dict):
+                options.append((group, value["key"], value["label"]))
+            else:
+                options.append((group, value, value))
+    return options
+
+
+def _build_lookup() -> Dict[str, Tuple[str, str]]:
+    lookup: Dict[str, Tuple[str, str]] = {}
+    for group, key, label in _options():
+        if group in ("sizes", "ice_levels", "sweetness_levels"):
+            continue  # matched by pattern below
+        for token in (label, key, key.replace("_", " ")):
+            lookup.setdefault(_normalize(token), (group, key))
+    lookup.update({
+        "no ice": ("ice_levels", "No Ice"),
+        "extra ice": ("ice_levels", "Extra Ice"),
+        "normal ice": ("ice_levels", "Normal"),
+        "regular ice": ("ice_levels", "Normal"),
+    })
+    return lookup
+
+
+def _normalize(token: str) -> str:
+    return _SPACES.sub(" ", token.strip().lower())
+
+
+_LOOKUP = _build_lookup()
+_ICE_KEYS = set(MENU_OPTIONS["ice_levels"])
+_SWEET_KEYS = set(MENU_OPTIONS["sweetness_levels"])
+
+
+def parse_customizations(customizations: Optional[str]) -> List[Tuple[str, str]]:
+    """(group, key) options named in a customizations string, in order, without repeats."""
+    found: List[Tuple[str, str]] = []
+    size = size_from_customizations(customizations)
+    if size:
+        found.append(("sizes", size))
+    rest = _SIZE_PREFIX.sub("", customizations or "", count=1)
+    for raw in re.split(r"[;,]", rest):
+        token = _normalize(raw)
+        if not token:
+            continue
+        match = _LOOKUP.get(token)
+        if match is None:
+            ice, sweet = _PERCENT_ICE.match(token), _PERCENT_SWEET.match(token)
+            if ice and f"{ice.group(1)}%" in _ICE_KEYS:
+                match = ("ice_levels", f"{ice.group(1)}%")
+            elif sweet and f"{sweet.group(1)}%" in _SWEET_KEYS:
+                match = ("sweetness_levels", f"{sweet.group(1)}%")
+        if match is not None and match not in found:
+            found.append(match)
+    return found
+
+
+# --- modifier ids ---------------------------------------------------------
+
+_ids: Dict[Tuple[str, str], int] = {}
+_ids_lock = threading.Lock()
+
+
+def modifier_ids() -> Dict[Tuple[str, str], int]:
+    """{(group, key): modifier id}, creating rows for options added to MENU_OPTIONS since last time."""
+    if _ids:
+        return _ids
+    with _ids_lock:
+        if _ids:
+            return _ids
+        m = Modifier.__table__
+        existing = {(r.optiongroup, r.optionkey): r.id for r in db.session.execute(select(m))}
+        # ids are assigned here: a SMALLINT key isn't auto-numbered on SQLite
+        next_id = max(existing.values(), default=0) + 1
+        missing = [
+            {"id": next_id + n, "optiongroup": group, "optionkey": key, "label": label}
+            for n, (group, key, label) in enumerate(
+                opt for opt in _options() if (opt[0], opt[1]) not in existing
+            )
+        ]
+        if missing:
+            try:
+                db.session.execute(m.insert(), missing)
+                db.session.commit()
+            except IntegrityError:  # another worker added them first
+                db.session.rollback()
+            existing = {(r.optiongroup, r.optionkey): r.id for r in db.session.execute(select(m))}
+        _ids.update(existing)
+    return _ids
+
+
+def _labels() -> Dict[int, Tuple[str, str, str]]:
+    m = Modifier.__table__
+    return {r.id: (r.optiongroup, r.optionkey, r.label) for r in db.session.execute(select(m))}
+
+
+# --- indexing -------------------------------------------------------------
+
+def _insert_ignoring_duplicates(table):
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table).on_conflict_do_nothing()
+
+
+def indexed_through() -> int:
+    """Highest order id whose lines have been parsed into orderitem_modifier."""
+    value = db.session.query(RunningCounter.value).filter(RunningCounter.name == WATERMARK).scalar()
+    return int(value or 0)
+
+
+def _set_watermark(order_id: int) -> None:
+    row = db.session.get(RunningCounter, WATERMARK)
+    if row is None:
+        db.session.add(RunningCounter(name=WATERMARK, value=order_id, updated_at=datetime.utcnow()))
+    elif order_id > row.value:
+        row.value = order_id
+        row.updated_at = datetime.utcnow()
+
+
+def index_lines(rows: Iterable) -> int:
+    """Write orderitem_modifier rows for (orderid, productid, quantity, customizations) rows; returns rows written."""
+    ids = modifier_ids()
+    values = [
+        {"orderid": order_id, "productid": product_id, "modifierid": ids[option], "quantity": int(quantity or 0)}
+        for order_id, product_id, quantity, customizations in rows
+        for option in parse_customizations(customizations)
+        if option in ids
+    ]
+    if values:
+        db.session.execute(_insert_ignoring_duplicates(OrderItemModifier.__table__), values)
+    return len(values)
+
+
+def _rescan(after: int, cutoff: datetime) -> int:
+    # Orders at or below the watermark placed in the trailing RESCAN_SECONDS, indexed again
+    o, i = Order.__table__.c, OrderItem.__table__.c
+    recent = select(o.id).where(
+        o.id <= after, o.ordertime >= cutoff - timedelta(seconds=RESCAN_SECONDS), o.ordertime < cutoff
+    )
+    rows = db.session.execute(
+        select(i.orderid, i.productid, i.quantity, i.customizations).where(i.orderid.in_(recent))
+    )
+    written = index_lines(rows)
+    db.session.commit()
+    return written
+
+
+def catch_up(batch: int = BATCH_ORDERS, max_batches: Optional[int] = None) -> Dict[str, int]:
+    """Index every order past the watermark placed before now - INDEX_LAG_SECONDS, a batch per transaction."""
+    o, i = Order.__table__.c, OrderItem.__table__.c
+    cutoff = datetime.utcnow() - timedelta(seconds=INDEX_LAG_SECONDS)
+    after = indexed_through()
+    rescanned = _rescan(after, cutoff) if after else 0
+    # Stop short of the first order that's still too recent, even if later ids are older
+    ceiling = db.session.execute(
+        select(func.min(o.id)).where(o.id > after, o.ordertime >= cutoff)
+    ).scalar()
+    orders = lines = batches = 0
+    while max_batches is None or batches < max_batches:
+        query = select(o.id).where(o.id > after).order_by(o.id).limit(batch)
+        if ceiling is not None:
+            query = query.where(o.id < ceiling)
+        order_ids = [r[0] for r in db.session.execute(query)]
+        if not order_ids:
+            break
+        rows = db.session.execute(
+            select(i.orderid, i.productid, i.quantity, i.customizations).where(i.orderid.in_(order_ids))
+        )
+        lines += index_lines(rows)
+        after = order_ids[-1]
+        _set_watermark(after)
+        db.session.commit()
+        orders += len(order_ids)
+        batches += 1
+    return {"orders": orders, "modifier_rows": lines, "rescanned_rows": rescanned, "indexed_through": after}
+
+
+def rebuild(batch: int = BATCH_ORDERS) -> Dict[str, int]:
+    """Drop every parsed modifier and index all orders again (after parser changes)."""
+    db.session.execute(delete(OrderItemModifier.__table__))
+    row = db.session.get(RunningCounter, WATERMARK)
+    if row is not None:
+        row.value = 0
+    db.session.commit()
+    return catch_up(batch)
+
+
+_indexer_thread: Optional[threading.Thread] = None
+_indexer_lock = threading.Lock()
+
+
+def _index_loop(app, interval: float) -> None:
+    while True:
+        with app.app_context():
+            try:
+                catch_up()
+            except Exception as e:
+                print(f"ERROR indexing order modifiers: {repr(e)}")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+        time.sleep(interval)
+
+
+def ensure_indexer() -> None:
+    """Start the periodic indexing thread once per process (MODIFIER_INDEX_SECONDS, 0 = off)."""
+    global _indexer_thread
+    if _indexer_thread is not None:
+        return
+    interval = float(current_app.config.get("MODIFIER_INDEX_SECONDS", 0) or 0)
+    if interval <= 0:
+        return
+    with _indexer_lock:
+        if _indexer_thread is not None:
+            return
+        app = current_app._get_current_object()
+        _indexer_thread = threading.Thread(target=_index_loop, args=(app, interval), name="modifier-index", daemon=True)
+        _indexer_thread.start()
+
+
+def init_app(app) -> None:
+    """Start the indexer with each worker's first request (a thread started before a fork wouldn't survive it)."""
+
+    @app.before_request
+    def _start_modifier_indexer():
+        if _indexer_thread is None:
+            ensure_indexer()
+
+
+# --- reporting ------------------------------------------------------------
+
+# Order ids grow with order time, so a window is usually an id range and the totals come
+# straight off the covering (modifierid, orderid, quantity) index. If any order inside that
+# id range falls outside the window (backdated imports), join orders instead.
+ORDER_ID_RANGE_SQL = text(
+    """
+    SELECT MIN(id), MAX(id), COUNT(1)
+    FROM orders
+    WHERE ordertime >= :start_ts AND ordertime < :end_ts
+    """
+)
+ORDERS_IN_ID_RANGE_SQL = text("SELECT COUNT(1) FROM orders WHERE id BETWEEN :lo AND :hi")
+
+MODIFIER_TOTALS_BY_ID_SQL = text(
+    """
+    SELECT modifierid, COUNT(1) AS lines, COALESCE(SUM(quantity), 0) AS qty
+    FROM orderitem_modifier
+    WHERE modifierid IN :ids AND orderid BETWEEN :lo AND :hi
+    GROUP BY modifierid
+    """
+).bindparams(bindparam("ids", expanding=True))
+
+MODIFIER_TOTALS_BY_TIME_SQL = text(
+    """
+    SELECT om.modifierid, COUNT(1) AS lines, COALESCE(SUM(om.quantity), 0) AS qty
+    FROM orderitem_modifier om
+    JOIN orders o ON o.id = om.orderid
+    WHERE om.modifierid IN :ids AND o.ordertime >= :start_ts AND o.ordertime < :end_ts
+    GROUP BY om.modifierid
+    """
+).bindparams(bindparam("ids", expanding=True))
+
+
+def modifier_totals(start_ts: datetime, end_ts: datetime, group: Optional[str] = None) -> List[dict]:
+    """Lines and drink quantity per option in [start_ts, end_ts), grouped like /api/meta/options."""
+    labels = _labels()
+    ids = [mid for mid, (g, _key, _label) in labels.items() if group is None or g == group]
+    window = {"start_ts": start_ts, "end_ts": end_ts}
+    lo, hi, count = db.session.execute(ORDER_ID_RANGE_SQL, window).one()
+    if not ids or not count:
+        return []
+    if db.session.execute(ORDERS_IN_ID_RANGE_SQL, {"lo": lo, "hi": hi}).scalar() == count:
+        rows = db.session.execute(MODIFIER_TOTALS_BY_ID_SQL, {"ids": ids, "lo": lo, "hi": hi})
+    else:
+        rows = db.session.execute(MODIFIER_TOTALS_BY_TIME_SQL, {**window, "ids": ids})
+
+    order = {g: n for n, g in enumerate(MENU_OPTIONS)}
+    data = [
+        {"group": labels[mid][0], "key": labels[mid][1], "label": labels[mid][2],
+         "lines": int(n_lines or 0), "quantity": int(qty or 0)}
+        for mid, n_lines, qty in rows
+    ]
+    data.sort(key=lambda d: (order.get(d["group"], len(order)), -d["quantity"], d["key"]))
+    return data
@@ -1,10 +1,14 @@
+import re
 from datetime import datetime
 
-from sqlalchemy import func
+from flask import current_app
+from sqlalchemy import Float, Integer, String, column, func, insert, literal, select, true, values
 
 from app.db import db
-from app.db.models import Order, OrderItem, Payment, Product, InventoryItem
+from app.db.models import Cashier, Order, OrderItem, Payment, Product, InventoryItem
+from app.services import counters_service, events_service
 from app.utils.errors import BadRequestError
+from app.utils.timing import phase
 
 SIZE_PRICE_DELTAS = {
     "Small": 0.00,
@@ -12,6 +16,16 @@ SIZE_PRICE_DELTAS = {
     "Large": 2.00,
 }
 
+# create_order writes "Size: <label>" at the front of customizations
+_SIZE_PATTERN = re.compile(r"Size:\s*(Small|Medium|Large)\b", re.IGNORECASE)
+
+
+def size_from_customizations(customizations: str | None) -> str | None:
+    """The size label recorded in an order line's customizations, if any."""
+    match = _SIZE_PATTERN.search(customizations or "")
+    return match.group(1).capitalize() if match else None
+
+
 DISPOSABLE_INVENTORY_ITEMS = [
     "Plastic Cups",
     "Cup Lids",
@@ -27,18 +41,14 @@ def _is_drink_category(category: str | None) -> bool:
     return not any(tok in c for tok in ["snack", "snacks", "food", "dessert"])
 
 
-def _decrement_disposables(drink_count: int):
-    """Decrement Plastic Cups / Cup Lids / Straws by drink_count (fails if missing/insufficient)."""
-    if drink_count <= 0:
-        return
-
+def _disposable_stock() -> dict:
+    """{lower-case name: [inventory id, current stock]} for the disposables (fails if any is missing)."""
+    inv = InventoryItem.__table__.c
     wanted_lc = [n.lower() for n in DISPOSABLE_INVENTORY_ITEMS]
-    rows = (
-        InventoryItem.query
-        .filter(func.lower(InventoryItem.item_name).in_(wanted_lc))
-        .all()
+    rows = db.session.execute(
+        select(inv.id, inv.itemname, inv.currentstock).where(func.lower(inv.itemname).in_(wanted_lc))
     )
-    found = {r.item_name.lower(): r for r in rows}
+    found = {name.lower(): [item_id, float(stock)] for item_id, name, stock in rows}
 
     missing = [name for name in DISPOSABLE_INVENTORY_ITEMS if name.lower() not in found]
     if missing:
@@ -46,22 +56,28 @@ def _decrement_disposables(drink_count: int):
             "Missing required inventory item(s): " + ", ".join(missing) +
             ". Add them in Admin → Inventory before checking out."
         )
+    return found
 
+
+def _take_disposables(found: dict, drink_count: int):
+    """Take drink_count of each disposable from found (fails, changing nothing, if any is short)."""
     # Validate stock before mutating anything
     for name in DISPOSABLE_INVENTORY_ITEMS:
-        row = found[name.lower()]
-        if float(row.current_stock) < float(drink_count):
+        stock = found[name.lower()][1]
+        if stock < float(drink_count):
             raise BadRequestError(
-                f"Insufficient stock for '{name}'. Needed {drink_count}, available {row.current_stock}."
+                f"Insufficient stock for '{name}'. Needed {drink_count}, available {stock}."
             )
 
-    # Mutate rows (commit happens in create_order)
     for name in DISPOSABLE_INVENTORY_ITEMS:
-        row = found[name.lower()]
-        row.current_stock = float(row.current_stock) - float(drink_count)
+        found[name.lower()][1] -= float(drink_count)
 
 
-def create_order(payload: dict):
+def prepare_order(payload: dict) -> dict:
+    """
+    Validate and price a checkout payload without writing anything (reads products only).
+    The returned plan is what persist_orders writes.
+    """
     cashier_id = payload.get("cashier_id")
     items = payload.get("items", [])
     payment = payload.get("payment")
@@ -75,15 +91,17 @@ def create_order(payload: dict):
     if not product_ids:
         raise BadRequestError("order must reference valid products")
 
-    rows = Product.query.filter(Product.id.in_(product_ids)).all()
+    with phase("lookup"):
+        rows = Product.query.filter(Product.id.in_(product_ids)).all()
     price_map = {row.id: float(row.base_price) for row in rows}
+    name_map = {row.id: row.name for row in rows}
     category_map = {row.id: (row.category or "") for row in rows}
 
     missing = sorted({pid for pid in product_ids if pid not in price_map})
     if missing:
         raise BadRequestError(f"product(s) not found: {', '.join(map(str, missing))}")
 
-    # Decrement disposable inventory for each drink in the order
+    # Disposable inventory is taken for each drink in the order
     # (Plastic Cups, Cup Lids, Straws — 1 each per drink)
     drink_count = 0
     for raw in items:
@@ -91,7 +109,6 @@ def create_order(payload: dict):
         qty = int(raw["quantity"])
         if _is_drink_category(category_map.get(pid)):
             drink_count += qty
-    _decrement_disposables(drink_count)
 
     computed_items = []
     subtotal = 0.0
@@ -117,8 +134,10 @@ def create_order(payload: dict):
         computed_items.append(
             {
                 "product_id": pid,
+                "name": name_map.get(pid),
                 "quantity": qty,
                 "customizations": customizations,
+                "unit_price": round(unit_price, 2),
                 "line_total": line_total,
             }
         )
@@ -127,68 +146,300 @@ def create_order(payload: dict):
     tax = round(subtotal * 0.0825, 2)
     total = round(subtotal + tax, 2)
 
-    order = Order(
-        cashier_id=cashier_id,
-        subtotal=subtotal,
-        tax=tax,
-        total=total,
-        order_time=datetime.utcnow(),
-        status="Complete",
+    return {
+        "cashier_id": cashier_id,
+        "items": computed_items,
+        "payment": payment,
+        "drink_count": drink_count,
+        "subtotal": subtotal,
+        "tax": tax,
+        "total": total,
+    }
+
+
+_ITEM_COLUMNS = ("orderid", "productid", "quantity", "customizations", "unitprice", "lineprice")
+_PAYMENT_COLUMNS = ("orderid", "paymenttime", "amountpaid", "paymentmethod", "tipamount")
+
+
+def _order_values(plan: dict, now: datetime) -> dict:
+    return {
+        "cashierid": plan["cashier_id"],
+        "subtotal": plan["subtotal"],
+        "tax": plan["tax"],
+        "total": plan["total"],
+        "ordertime": now,
+        "status": "Complete",
+    }
+
+
+def _item_rows(plan: dict) -> list:
+    return [
+        (it["product_id"], it["quantity"], it["customizations"], it["unit_price"], it["line_total"])
+        for it in plan["items"]
+    ]
+
+
+def _payment_values(plan: dict, now: datetime) -> tuple:
+    payment = plan["payment"]
+    return now, payment["amount"], payment["method"], payment.get("tip_amount", 0.0)
+
+
+def order_insert_cte(plan: dict, now: datetime):
+    """
+    PostgreSQL: the order, all of its items and the payment as one statement that
+    selects the new id. Each child INSERT is a data-modifying CTE reading the order's
+    RETURNING id.
+    """
+    o, i, p = Order.__table__, OrderItem.__table__, Payment.__table__
+    new_order = insert(o).values(**_order_values(plan, now)).returning(o.c.id).cte("new_order")
+    lines = values(
+        column("productid", Integer), column("quantity", Integer), column("customizations", String),
+        column("unitprice", Float), column("lineprice", Float), name="lines",
+    ).data(_item_rows(plan))
+    new_items = insert(i).from_select(
+        _ITEM_COLUMNS,
+        select(new_order.c.id, *lines.c).select_from(new_order).join(lines, true()),
     )
-    db.session.add(order)
-    db.session.flush()
-
-    for it in computed_items:
-        row = OrderItem(
-            order_id=order.id,
-            product_id=it["product_id"],
-            quantity=it["quantity"],
-            customizations=it["customizations"],
-        )
-        db.session.add(row)
-
-    pay_row = Payment(
-        order_id=order.id,
-        amount_paid=payment["amount"],
-        payment_method=payment["method"],
-        payment_time=datetime.utcnow(),
-        tip_amount=payment.get("tip_amount", 0.0),
+    new_payment = insert(p).from_select(
+        _PAYMENT_COLUMNS,
+        select(new_order.c.id, *(literal(v) for v in _payment_values(plan, now))).select_from(new_order),
     )
-    db.session.add(pay_row)
+    return select(new_order.c.id).add_cte(new_items.cte("new_items")).add_cte(new_payment.cte("new_payment"))
+
+
+def _insert_order_statements(plan: dict, now: datetime) -> int:
+    """Other databases: INSERT ... RETURNING id, then one multi-row INSERT each for items and payment."""
+    o, i, p = Order.__table__, OrderItem.__table__, Payment.__table__
+    order_id = db.session.execute(
+        insert(o).values(**_order_values(plan, now)).returning(o.c.id)
+    ).scalar_one()
+    db.session.execute(insert(i).values([dict(zip(_ITEM_COLUMNS, (order_id, *row))) for row in _item_rows(plan)]))
+    db.session.execute(insert(p).values(dict(zip(_PAYMENT_COLUMNS, (order_id, *_payment_values(plan, now))))))
+    return order_id
+
+
+def _insert_order(plan: dict, now: datetime) -> int:
+    # A fixed number of round trips per order, however many items it has
+    if db.engine.dialect.name == "postgresql":
+        return db.session.execute(order_insert_cte(plan, now)).scalar_one()
+    return _insert_order_statements(plan, now)
+
+
+def persist_orders(plans: list) -> list:
+    """
+    Write prepared orders in one transaction and commit once. Returns one entry per
+    plan, in order: {"order_id", "order_time"}, or the BadRequestError that rejected it
+    (e.g. out of cups) — rejected plans write nothing. If any write or the commit fails
+    the session is rolled back and the error raised, so none of the batch is stored.
 
+    Writes go through Core: per order one INSERT (PostgreSQL) or three, plus one
+    inventory UPDATE, one counters UPDATE and the COMMIT per batch.
+    """
+    results: list = [None] * len(plans)
+    written = []
+    found = None
+    drinks_taken = 0
+    deltas: dict = {"orders_total": 0, "items_total": 0}
+    now = datetime.utcnow()
+
+    # Any failure (a rejected insert, the counters, the commit) leaves none of the batch behind
     try:
-        db.session.commit()
+        for i, plan in enumerate(plans):
+            # Stock is checked cumulatively, so a batch can't oversell what one commit would
+            with phase("inventory"):
+                try:
+                    if plan["drink_count"] > 0:
+                        if found is None:
+                            found = _disposable_stock()
+                        _take_disposables(found, plan["drink_count"])
+                except BadRequestError as e:
+                    results[i] = e
+                    continue
+            with phase("items"):
+                written.append((i, _insert_order(plan, now)))
+            drinks_taken += plan["drink_count"]
+
+            # Keep /api/meta/stats and the daily totals in step with these orders
+            day = now.date()
+            deltas["orders_total"] += 1
+            deltas["items_total"] += sum(int(it["quantity"]) for it in plan["items"])
+            revenue, drinks = counters_service.daily_name("revenue", day), counters_service.daily_name("drinks", day)
+            deltas[revenue] = round(deltas.get(revenue, 0.0) + plan["total"], 2)
+            deltas[drinks] = deltas.get(drinks, 0) + plan["drink_count"]
+
+        if not written:
+            db.session.rollback()
+            return results
+
+        if drinks_taken:
+            # Relative decrement, so concurrent checkouts in other processes can't lose updates
+            inv = InventoryItem.__table__
+            with phase("inventory"):
+                db.session.execute(
+                    inv.update()
+                    .where(inv.c.id.in_([item_id for item_id, _stock in found.values()]))
+                    .values(currentstock=inv.c.currentstock - drinks_taken)
+                )
+
+        with phase("counters"):
+            counters_service.increment(deltas)
+
+        with phase("commit"):
+            db.session.commit()
     except Exception as e:
         db.session.rollback()
-        print(f"ERROR in db.session.commit(): {repr(e)}")
+        print(f"ERROR persisting {len(plans)} order(s): {repr(e)}")
         import traceback
         traceback.print_exc()
         raise
 
+    for i, order_id in written:
+        results[i] = {"order_id": order_id, "order_time": now}
+    return results
+
+
+def _publish_created(plan: dict, order_id: int, order_time: datetime):
+    # Push to kitchen displays / dashboards (GET /api/orders/stream) once it's durable
+    events_service.publish("order.created", {
+        "order_id": order_id,
+        "order_time": order_time,
+        "cashier_id": plan["cashier_id"],
+        "status": "Complete",
+        "subtotal": plan["subtotal"],
+        "tax": plan["tax"],
+        "total": plan["total"],
+        "payment": {"method": plan["payment"]["method"], "amount": plan["payment"]["amount"]},
+        "items": [
+            {
+                "product_id": it["product_id"],
+                "name": it["name"],
+                "quantity": it["quantity"],
+                "customizations": it["customizations"],
+                "line_price": it["line_total"],
+            }
+            for it in plan["items"]
+        ],
+    })
+
+
+def create_order(payload: dict):
+    plan = prepare_order(payload)
+    if current_app.config.get("GROUP_COMMIT_ENABLED"):
+        # Committed together with other registers' orders by the group-commit writer
+        from app.services import group_commit_service
+        # Hand the pooled connection back first: the writer needs one while we wait
+        db.session.close()
+        with phase("group_commit"):
+            result = group_commit_service.submit(plan)
+    else:
+        result = persist_orders([plan])[0]
+    if isinstance(result, Exception):
+        raise result
+
+    _publish_created(plan, result["order_id"], result["order_time"])
     return {
-        "order_id": order.id,
-        "subtotal": subtotal,
-        "tax": tax,
-        "total": total,
+        "order_id": result["order_id"],
+        "subtotal": plan["subtotal"],
+        "tax": plan["tax"],
+        "total": plan["total"],
     }
 
 
-def recent_transactions():
-    return [
-        {
-            "title": "Brown Sugar Milk Tea",
-            "description": "XTRA boba, 50% ice",
-            "status": "Complete",
-            "assignee": "Benjamin",
-            "time": "2:41 PM",
-            "total_money": "$10.49",
-        },
-        {
-            "title": "Strawberry Fruit Tea",
-            "description": "25% sweet, no ice",
-            "status": "Complete",
-            "assignee": "Leenser",
-            "time": "2:37 PM",
-            "total_money": "$6.25",
+ORDER_SUMMARY_COLUMNS = ("id", "cashierid", "subtotal", "tax", "total", "ordertime", "status")
+_SUMMARY_KEYS = ("id", "cashier_id", "subtotal", "tax", "total", "order_time", "status")
+
+
+def order_filters(start_ts=None, end_ts=None, status=None):
+    """WHERE clauses shared by the full and summary order listings."""
+    clauses = []
+    if start_ts is not None:
+        clauses.append(Order.order_time >= start_ts)
+    if end_ts is not None:
+        clauses.append(Order.order_time < end_ts)
+    if status is not None:
+        clauses.append(Order.status == status)
+    return clauses
+
+
+def count_orders(clauses) -> int:
+    return db.session.execute(
+        select(func.count()).select_from(Order.__table__).where(*clauses)
+    ).scalar_one()
+
+
+def list_order_summaries(page=1, page_size=50, start_ts=None, end_ts=None, status=None,
+                         with_item_counts=False):
+    """
+    Order columns only (Core select, no items/payments), newest first.
+    with_item_counts adds item_count (lines) and item_quantity from one grouped query.
+    Returns (rows, total).
+    """
+    clauses = order_filters(start_ts, end_ts, status)
+    cols = [Order.__table__.c[name] for name in ORDER_SUMMARY_COLUMNS]
+    result = db.session.execute(
+        select(*cols)
+        .where(*clauses)
+        .order_by(Order.order_time.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    )
+    rows = [dict(zip(_SUMMARY_KEYS, r)) for r in result]
+
+    if with_item_counts and rows:
+        item = OrderItem.__table__.c
+        counts = {
+            order_id: (lines, qty)
+            for order_id, lines, qty in db.session.execute(
+                select(item.orderid, func.count(), func.sum(item.quantity))
+                .where(item.orderid.in_([r["id"] for r in rows]))
+                .group_by(item.orderid)
+            )
         }
-    ]
+        for r in rows:
+            lines, qty = counts.get(r["id"], (0, 0))
+            r["item_count"] = lines
+            r["item_quantity"] = int(qty or 0)
+
+    return rows, count_orders(clauses)
+
+
+def recent_transactions(limit: int = 10):
+    """Latest orders for the dashboard feed, newest first (two queries)."""
+    o = Order.__table__.c
+    c = Cashier.__table__.c
+    orders = db.session.execute(
+        select(o.id, o.ordertime, o.status, o.total, c.name)
+        .select_from(Order.__table__.outerjoin(Cashier.__table__, c.id == o.cashierid))
+        .order_by(o.ordertime.desc(), o.id.desc())
+        .limit(limit)
+    ).all()
+    if not orders:
+        return []
+
+    i = OrderItem.__table__.c
+    p = Product.__table__.c
+    lines: dict = {}
+    for order_id, name, customizations in db.session.execute(
+        select(i.orderid, p.name, i.customizations)
+        .outerjoin(Product.__table__, p.id == i.productid)
+        .where(i.orderid.in_([r.id for r in orders]))
+        .order_by(i.orderid, i.productid)
+    ):
+        lines.setdefault(order_id, []).append((name or "Item", customizations or ""))
+
+    out = []
+    for r in orders:
+        items = lines.get(r.id, [])
+        title = items[0][0] if items else f"Order #{r.id}"
+        if len(items) > 1:
+            title += f" +{len(items) - 1} more"
+        out.append({
+            "order_id": r.id,
+            "title": title,
+            "description": items[0][1] if items else "",
+            "status": r.status,
+            "assignee": r.name or "",
+            "time": r.ordertime.strftime("%I:%M %p").lstrip("0") if r.ordertime else "",
+            "total_money": f"${(r.total or 0.0):.2f}",
+        })
+    return out
@@ -1,5 +1,6 @@
-from app.db import db
+from app.db import db, reads
 from app.db.models import Product, ProductIngredient, InventoryItem
+from app.services.menu_service import bump_version as bump_menu_version, schedule_rebuild as schedule_menu_rebuild
 from app.utils.errors import NotFoundError, BadRequestError
 
 
@@ -72,16 +73,11 @@ def create_product(body: dict):
         description=description
     )
     db.session.add(p)
+    bump_menu_version()
     db.session.commit()
+    schedule_menu_rebuild()
 
-    return {
-        "id": p.id,
-        "name": p.name,
-        "category": p.category,
-        "base_price": p.base_price,
-        "is_popular": p.is_popular,
-        "description": p.description,
-    }
+    return reads.product_dict(p)
 
 
 def update_product(product_id: int, body: dict):
@@ -120,16 +116,11 @@ def update_product(product_id: int, body: dict):
         else:
             p.description = str(body["description"]).strip()
 
+    bump_menu_version()
     db.session.commit()
+    schedule_menu_rebuild()
 
-    return {
-        "id": p.id,
-        "name": p.name,
-        "category": p.category,
-        "base_price": p.base_price,
-        "is_popular": p.is_popular,
-        "description": p.description,
-    }
+    return reads.product_dict(p)
 
 
 def delete_product(product_id: int):
@@ -141,25 +132,14 @@ def delete_product(product_id: int):
     ProductIngredient.query.filter_by(product_id=product_id).delete()
 
     db.session.delete(p)
+    bump_menu_version()
     db.session.commit()
+    schedule_menu_rebuild()
 
 
 def list_product_ingredients(product_id: int):
-    # later: join ProductIngredient -> InventoryItem to show "oat milk 200 ml"
-    links = ProductIngredient.query.filter_by(product_id=product_id).all()
-
-    # build a friendly response
-    result = []
-    for link in links:
-        inv: InventoryItem | None = InventoryItem.query.get(link.inventory_id)
-        result.append({
-            "inventory_id": link.inventory_id,
-            "item_name": inv.item_name if inv else None,
-            "quantity_used": link.quantity_used,
-            "unit": link.unit,
-        })
-
-    return result
+    # "oat milk 200 ml": recipe links joined to inventory names in one query
+    return [reads.ingredient_dict(r) for r in reads.ingredient_rows(product_id)]
 
 
 def add_product_ingredient(product_id: int, body: dict):
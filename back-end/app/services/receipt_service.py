@@ -0,0 +1,250 @@
+"""
+Receipt rendering (JSON, plain text, ESC/POS) with a per-order cache.
+
+A sold order's items never change; only a refund adds a Payment row. So a
+rendered receipt is cached per order id together with the number of payments it
+was built from. Each reprint runs one indexed COUNT on payment to check that
+number, which also catches refunds made by another worker process. A refund in
+this process calls invalidate() directly. Text and ESC/POS bytes are rendered
+lazily from the cached receipt and kept with it.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from app.db import db
+from app.db.models import Order, OrderItem, Payment, Product
+
+FORMATS = ("json", "text", "escpos")
+
+_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+# ESC/POS control sequences (Epson TM-series subset)
+ESC_INIT = b"\x1b@"
+ESC_ALIGN_LEFT = b"\x1ba\x00"
+ESC_ALIGN_CENTER = b"\x1ba\x01"
+ESC_BOLD_ON = b"\x1bE\x01"
+ESC_BOLD_OFF = b"\x1bE\x00"
+GS_SIZE_DOUBLE = b"\x1d!\x11"
+GS_SIZE_NORMAL = b"\x1d!\x00"
+ESC_FEED_4 = b"\x1bd\x04"
+GS_PARTIAL_CUT = b"\x1dVB\x00"
+
+PAYMENT_LABELS = {"card": "Card", "cash": "Cash", "other": "Other"}
+
+
+# --- loading --------------------------------------------------------------
+
+def _payment_counts(order_ids: Iterable[int]) -> Dict[int, int]:
+    ids = list(order_ids)
+    if not ids:
+        return {}
+    p = Payment.__table__.c
+    rows = db.session.execute(
+        select(p.orderid, func.count()).where(p.orderid.in_(ids)).group_by(p.orderid)
+    )
+    return {order_id: n for order_id, n in rows}
+
+
+def _load(order_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Build receipt dicts for order_ids with three queries in total."""
+    o = Order.__table__.c
+    orders = db.session.execute(
+        select(o.id, o.cashierid, o.status, o.ordertime, o.subtotal, o.tax, o.total).where(o.id.in_(order_ids))
+    ).all()
+    if not orders:
+        return {}
+
+    receipts: Dict[int, Dict[str, Any]] = {}
+    for oid, cashier_id, status, order_time, subtotal, tax, total in orders:
+        receipts[oid] = {
+            "order_id": oid,
+            "cashier_id": cashier_id,
+            "status": status,
+            "order_time": order_time,
+            "subtotal": subtotal,
+            "tax": tax,
+            "total": total,
+            "items": [],
+            "payments": [],
+        }
+
+    i = OrderItem.__table__.c
+    p = Product.__table__.c
+    item_rows = db.session.execute(
+        select(i.orderid, i.productid, p.name, i.quantity, i.customizations, i.unitprice, i.lineprice)
+        .outerjoin(Product.__table__, p.id == i.productid)
+        .where(i.orderid.in_(list(receipts)))
+        .order_by(i.orderid, i.productid)
+    )
+    for oid, pid, name, qty, customizations, unit_price, line_price in item_rows:
+        receipts[oid]["items"].append({
+            "product_id": pid,
+            "name": name,
+            "quantity": qty,
+            "customizations": customizations,
+            "unit_price": unit_price if unit_price is not None else 0.0,
+            "line_price": line_price if line_price is not None else 0.0,
+        })
+
+    pay = Payment.__table__.c
+    pay_rows = db.session.execute(
+        select(pay.orderid, pay.paymentmethod, pay.amountpaid, pay.paymenttime)
+        .where(pay.orderid.in_(list(receipts)))
+        .order_by(pay.orderid, pay.paymenttime)
+    )
+    for oid, method, amount, paid_at in pay_rows:
+        receipts[oid]["payments"].append({"method": method, "amount": amount, "time": paid_at})
+    return receipts
+
+
+# --- cache ----------------------------------------------------------------
+
+def _cache_limit() -> int:
+    return int(current_app.config.get("RECEIPT_CACHE_ENTRIES", 2048))
+
+
+def _entries(order_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Cache entries for order_ids (missing orders are absent), rebuilding stale ones."""
+    counts = _payment_counts(order_ids)
+    fresh: Dict[int, Dict[str, Any]] = {}
+    stale: List[int] = []
+    with _cache_lock:
+        for oid in order_ids:
+            entry = _cache.get(oid)
+            if entry is not None and entry["payment_count"] == counts.get(oid, 0):
+                _cache.move_to_end(oid)
+                fresh[oid] = entry
+            else:
+                stale.append(oid)
+
+    if stale:
+        built = _load(stale)
+        limit = _cache_limit()
+        with _cache_lock:
+            for oid, receipt in built.items():
+                entry = {"receipt": receipt, "payment_count": len(receipt["payments"])}
+                _cache[oid] = entry
+                _cache.move_to_end(oid)
+                fresh[oid] = entry
+            while len(_cache) > limit:
+                _cache.popitem(last=False)
+    return fresh
+
+
+def invalidate(order_id: int) -> None:
+    with _cache_lock:
+        _cache.pop(order_id, None)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+# --- rendering ------------------------------------------------------------
+
+def _money(v: float) -> str:
+    return f"{v:,.2f}"
+
+
+def _row(left: str, right: str, width: int) -> str:
+    room = width - len(right) - 1
+    if len(left) > room:
+        left = left[: max(room - 1, 0)] + "~"
+    return f"{left}{' ' * (width - len(left) - len(right))}{right}"
+
+
+def _lines(receipt: Dict[str, Any], width: int) -> List[Tuple[str, str]]:
+    """Receipt as (style, text) lines; style is one of header/center/body/bold/rule."""
+    header = current_app.config.get("RECEIPT_HEADER", "KungFu Tea")
+    footer = current_app.config.get("RECEIPT_FOOTER", "Thank you!")
+    when = receipt["order_time"].strftime("%Y-%m-%d %H:%M") if receipt["order_time"] else ""
+
+    out: List[Tuple[str, str]] = [("header", header)]
+    out.append(("body", _row(f"Order #{receipt['order_id']}", when, width)))
+    if receipt["cashier_id"] is not None:
+        out.append(("body", f"Cashier {receipt['cashier_id']}"))
+    out.append(("rule", "-" * width))
+
+    for item in receipt["items"]:
+        name = item["name"] or f"Product {item['product_id']}"
+        out.append(("body", _row(f"{item['quantity']} x {name}", _money(item["line_price"]), width)))
+        if item["customizations"]:
+            text = item["customizations"]
+            while text:
+                out.append(("body", "    " + text[: width - 4]))
+                text = text[width - 4:]
+    out.append(("rule", "-" * width))
+
+    out.append(("body", _row("Subtotal", _money(receipt["subtotal"]), width)))
+    out.append(("body", _row("Tax", _money(receipt["tax"]), width)))
+    out.append(("bold", _row("TOTAL", _money(receipt["total"]), width)))
+    for pay in receipt["payments"]:
+        label = PAYMENT_LABELS.get(pay["method"], str(pay["method"]).title())
+        if pay["amount"] < 0:
+            label = f"Refund ({label.lower()})"
+        out.append(("body", _row(label, _money(pay["amount"]), width)))
+    out.append(("rule", "-" * width))
+
+    if receipt["status"] != "Complete":
+        out.append(("bold", f"Status: {receipt['status']}"))
+    out.append(("center", footer))
+    return out
+
+
+def render_text(receipt: Dict[str, Any], width: int) -> str:
+    rendered = []
+    for style, text in _lines(receipt, width):
+        rendered.append(text.center(width).rstrip() if style in ("header", "center") else text)
+    return "\n".join(rendered) + "\n"
+
+
+def render_escpos(receipt: Dict[str, Any], width: int) -> bytes:
+    buf = bytearray(ESC_INIT)
+    for style, text in _lines(receipt, width):
+        data = text.encode("cp437", errors="replace") + b"\n"
+        if style == "header":
+            buf += ESC_ALIGN_CENTER + GS_SIZE_DOUBLE + ESC_BOLD_ON + data + ESC_BOLD_OFF + GS_SIZE_NORMAL + ESC_ALIGN_LEFT
+        elif style == "center":
+            buf += ESC_ALIGN_CENTER + data + ESC_ALIGN_LEFT
+        elif style == "bold":
+            buf += ESC_BOLD_ON + data + ESC_BOLD_OFF
+        else:
+            buf += data
+    buf += ESC_FEED_4 + GS_PARTIAL_CUT
+    return bytes(buf)
+
+
+def _rendered(entry: Dict[str, Any], fmt: str):
+    if fmt == "json":
+        return entry["receipt"]
+    rendered = entry.get(fmt)
+    if rendered is None:
+        width = int(current_app.config.get("RECEIPT_WIDTH", 42))
+        rendered = render_text(entry["receipt"], width) if fmt == "text" else render_escpos(entry["receipt"], width)
+        entry[fmt] = rendered  # same value from any thread, so a racing write is harmless
+    return rendered
+
+
+# --- public API -----------------------------------------------------------
+
+def get_receipt(order_id: int, fmt: str = "json") -> Optional[Tuple[Any, int]]:
+    """(rendered receipt, payment count) or None if the order doesn't exist."""
+    entry = _entries([order_id]).get(order_id)
+    if entry is None:
+        return None
+    return _rendered(entry, fmt), entry["payment_count"]
+
+
+def get_receipts(order_ids: List[int], fmt: str = "json") -> Tuple[List[Tuple[int, Any]], List[int]]:
+    """Bulk reprint: ([(order_id, rendered), ...] in request order, missing ids)."""
+    unique = list(dict.fromkeys(order_ids))
+    entries = _entries(unique)
+    found = [(oid, _rendered(entries[oid], fmt)) for oid in unique if oid in entries]
+    missing = [oid for oid in unique if oid not in entries]
+    return found, missing
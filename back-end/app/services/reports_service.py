@@ -1,23 +1,83 @@
 from datetime import datetime
+from sqlalchemy import text
 from app.db import db
 from app.db.models import ZClosure
-# we'll fill in SQL-ish aggregates later from Order/Payment
+
+BUCKET_FIELDS = ("sales", "orders", "returns", "voids", "discards", "cash", "card", "other")
+TENDERS = ("cash", "card", "other")
+
+
+def _hour_sql(column: str) -> str:
+    # SQLite (local dev fallback) has no EXTRACT(); PostgreSQL has no strftime()
+    if db.engine.dialect.name == "sqlite":
+        return f"CAST(strftime('%H', {column}) AS INTEGER)"
+    return f"EXTRACT(HOUR FROM {column})::integer"
+
+
+def x_report_start(now: datetime | None = None) -> datetime:
+    """Start of the X-report window: last Z close, or start of the current UTC day."""
+    last_close = db.session.query(ZClosure.closed_at).order_by(ZClosure.closed_at.desc()).first()
+    if last_close and last_close[0] is not None:
+        return last_close[0]
+    now = now or datetime.utcnow()
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def empty_bucket(hour: int) -> dict:
+    bucket = {"hour": hour}
+    for field in BUCKET_FIELDS:
+        bucket[field] = 0 if field == "orders" else 0.0
+    return bucket
+
+
+def hourly_buckets(start_ts: datetime) -> dict[int, dict]:
+    """
+    Hourly (UTC) buckets since start_ts, keyed by hour: sales/orders by order time,
+    tender splits (net of refunds) and returns by payment time.
+    """
+    orders_sql = text(
+        f"""
+        SELECT {_hour_sql("ordertime")} AS hr,
+               COUNT(1) AS orders_cnt,
+               COALESCE(SUM(total), 0.0) AS sales_sum
+        FROM orders
+        WHERE ordertime >= :start_ts
+        GROUP BY hr
+        ORDER BY hr
+        """
+    )
+    payments_sql = text(
+        f"""
+        SELECT {_hour_sql("paymenttime")} AS hr,
+               LOWER(paymentmethod) AS method,
+               COALESCE(SUM(amountpaid), 0.0) AS amt,
+               COALESCE(SUM(CASE WHEN amountpaid < 0 THEN -amountpaid ELSE 0 END), 0.0) AS returned
+        FROM payment
+        WHERE paymenttime >= :start_ts
+        GROUP BY hr, method
+        """
+    )
+
+    buckets: dict[int, dict] = {}
+    for hr, orders_cnt, sales_sum in db.session.execute(orders_sql, {"start_ts": start_ts}):
+        row = buckets.setdefault(int(hr), empty_bucket(int(hr)))
+        row["sales"] = float(sales_sum or 0.0)
+        row["orders"] = int(orders_cnt or 0)
+
+    for hr, method, amt, returned in db.session.execute(payments_sql, {"start_ts": start_ts}):
+        row = buckets.setdefault(int(hr), empty_bucket(int(hr)))
+        m = (method or "").lower()
+        if m in TENDERS:
+            row[m] += float(amt or 0.0)
+        row["returns"] += float(returned or 0.0)
+    return buckets
+
 
 def get_x_report_today():
-    # Placeholder hourly buckets
-    return [
-        {
-            "hour": 14,
-            "sales": 125.40,
-            "orders": 9,
-            "returns": 5.00,
-            "voids": 0.00,
-            "discards": 3.50,
-            "cash": 60.00,
-            "card": 65.40,
-            "other": 0.00
-        }
-    ]
+    """X-report rows (hourly since the last Z close), sorted by hour."""
+    buckets = hourly_buckets(x_report_start())
+    return [buckets[k] for k in sorted(buckets)]
+
 
 def run_z_report_today(reset: bool):
     # Placeholder summary for Manager -> Reports tab
@@ -41,3 +101,98 @@ def run_z_report_today(reset: bool):
         db.session.commit()
 
     return summary
+
+
+# --- Range reports as mergeable partial aggregates --------------------------
+# Each takes anything with .execute() (the request session, or a Connection to
+# another store's database) and returns sums that add up across stores and the
+# archive. Winners are picked only after merging (top_items / top_item_per_day).
+
+SALES_TOTALS_SQL = text(
+    """
+    SELECT COALESCE(SUM(total), 0.0) AS gross_sales,
+           COUNT(1)                AS orders_cnt
+    FROM orders
+    WHERE ordertime >= :start_ts AND ordertime < :end_ts
+    """
+)
+
+ITEM_QUANTITIES_SQL = text(
+    """
+    SELECT p.name AS name,
+           COALESCE(SUM(oi.quantity), 0) AS qty
+    FROM orderitem oi
+    JOIN product p ON p.id = oi.productid
+    JOIN orders o  ON o.id = oi.orderid
+    WHERE o.ordertime >= :start_ts AND o.ordertime < :end_ts
+    GROUP BY p.name
+    """
+)
+
+DAILY_ITEM_QUANTITIES_SQL = text(
+    """
+    SELECT DATE(o.ordertime) AS day,
+           p.name AS name,
+           COALESCE(SUM(oi.quantity), 0) AS qty
+    FROM orderitem oi
+    JOIN product p ON p.id = oi.productid
+    JOIN orders  o ON o.id = oi.orderid
+    WHERE o.ordertime >= :start_ts AND o.ordertime < :end_ts
+    GROUP BY day, p.name
+    """
+)
+
+
+def _day_iso(day_raw) -> str:
+    # DATE() is a date on PostgreSQL and a 'YYYY-MM-DD' string on SQLite
+    if hasattr(day_raw, "isoformat"):
+        return day_raw.isoformat()[:10]
+    return str(day_raw)[:10]
+
+
+def sales_totals(conn, start_ts: datetime, end_ts: datetime) -> tuple[float, int]:
+    """(gross sales, order count) for orders in [start_ts, end_ts)."""
+    row = conn.execute(SALES_TOTALS_SQL, {"start_ts": start_ts, "end_ts": end_ts}).first()
+    return (float(row[0] or 0.0), int(row[1] or 0)) if row else (0.0, 0)
+
+
+def item_quantities(conn, start_ts: datetime, end_ts: datetime) -> dict[str, int]:
+    """{product name: quantity sold} for orders in [start_ts, end_ts)."""
+    rows = conn.execute(ITEM_QUANTITIES_SQL, {"start_ts": start_ts, "end_ts": end_ts})
+    return {name: int(qty or 0) for name, qty in rows}
+
+
+def daily_item_quantities(conn, start_ts: datetime, end_ts: datetime) -> dict[str, dict[str, int]]:
+    """{"YYYY-MM-DD": {product name: quantity sold}} for orders in [start_ts, end_ts)."""
+    days: dict[str, dict[str, int]] = {}
+    for day_raw, name, qty in conn.execute(DAILY_ITEM_QUANTITIES_SQL, {"start_ts": start_ts, "end_ts": end_ts}):
+        day = days.setdefault(_day_iso(day_raw), {})
+        day[name] = day.get(name, 0) + int(qty or 0)
+    return days
+
+
+def merge_counts(target: dict, counts: dict) -> dict:
+    """Add counts into target in place (nested one level for per-day counts)."""
+    for key, value in counts.items():
+        if isinstance(value, dict):
+            merge_counts(target.setdefault(key, {}), value)
+        else:
+            target[key] = target.get(key, 0) + value
+    return target
+
+
+def top_items(qty: dict[str, int], limit: int | None = None) -> list[dict]:
+    """Weekly-items rows, largest first (ties alphabetically)."""
+    ranked = sorted(qty.items(), key=lambda kv: (-kv[1], kv[0] or ""))
+    return [{"name": name, "value": value} for name, value in ranked[:limit]]
+
+
+def top_item_per_day(days: dict[str, dict[str, int]]) -> list[dict]:
+    """Daily-top rows: each day's best seller (ties go to the first alphabetically)."""
+    data = []
+    for day in sorted(days):
+        if not days[day]:
+            continue
+        name, qty = min(days[day].items(), key=lambda kv: (-kv[1], kv[0] or ""))
+        data.append({"day": day, "item": name, "value": qty})
+    return data
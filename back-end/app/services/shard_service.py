@@ -0,0 +1,131 @@
+"""
+Map-reduce execution of long range reports over date shards (REPORT_PARALLELISM).
+
+SQLite runs a query on one core, so a year-long weekly-items or daily-top is
+CPU-bound in a single thread. With REPORT_PARALLELISM > 1 on a file-backed
+SQLite database, aggregate() splits a window longer than REPORT_SHARD_MIN_DAYS
+into day-aligned shards and runs the report's partial aggregate
+(reports_service.sales_totals / item_quantities / daily_item_quantities) for each
+shard in a separate process. Each process has its own read-only connection, and
+the per-shard sums and counts are merged here. Ranking (top-k, top per day) still
+happens after the merge, in the routes.
+
+Short windows, PostgreSQL (which has its own parallel query) and
+REPORT_PARALLELISM=1 run in the request's session exactly as before. The process
+pool uses "spawn" and is started on first use, once per web worker.
+"""
+import multiprocessing
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.db import db
+from app.services import reports_service
+
+REPORTS = ("sales_totals", "item_quantities", "daily_item_quantities")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+# --- worker side ----------------------------------------------------------
+
+_worker_engines: Dict[str, Any] = {}
+
+
+def _worker_engine(path: str):
+    engine = _worker_engines.get(path)
+    if engine is None:
+        engine = create_engine(
+            "sqlite://",
+            creator=lambda: sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False),
+            poolclass=StaticPool,
+        )
+        _worker_engines[path] = engine
+    return engine
+
+
+def _run_shard(path: str, report: str, start_ts: datetime, end_ts: datetime):
+    with _worker_engine(path).connect() as conn:
+        return getattr(reports_service, report)(conn, start_ts, end_ts)
+
+
+# --- request side ---------------------------------------------------------
+
+def shard_windows(start_ts: datetime, end_ts: datetime, shards: int) -> List[Tuple[datetime, datetime]]:
+    """Split [start_ts, end_ts) into at most `shards` pieces with inner edges at midnight."""
+    span = end_ts - start_ts
+    edges = [start_ts]
+    for i in range(1, shards):
+        edge = (start_ts + span * i / shards).replace(hour=0, minute=0, second=0, microsecond=0)
+        if edges[-1] < edge < end_ts:
+            edges.append(edge)
+    edges.append(end_ts)
+    return list(zip(edges, edges[1:]))
+
+
+def _sqlite_path() -> Optional[str]:
+    # The bind this request reads from (a replica when routed to one)
+    url = db.session.get_bind().url
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    return url.database
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_size = workers
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool, _pool_size = None, 0
+
+
+def _merge(acc, part):
+    if isinstance(acc, tuple):
+        return tuple(a + b for a, b in zip(acc, part))
+    return reports_service.merge_counts(acc, part)
+
+
+def aggregate(report: str, start_ts: datetime, end_ts: datetime, parallelism: Optional[int] = None):
+    """reports_service.<report> over [start_ts, end_ts), sharded across processes when worthwhile."""
+    if report not in REPORTS:
+        raise ValueError(f"unknown report {report!r}")
+    workers = int(parallelism if parallelism is not None else current_app.config.get("REPORT_PARALLELISM", 1))
+    min_days = float(current_app.config.get("REPORT_SHARD_MIN_DAYS", 31))
+    path = _sqlite_path() if workers > 1 else None
+    if path is None or end_ts - start_ts <= timedelta(days=min_days):
+        return getattr(reports_service, report)(db.session, start_ts, end_ts)
+
+    try:
+        futures = [
+            _executor(workers).submit(_run_shard, path, report, shard_start, shard_end)
+            for shard_start, shard_end in shard_windows(start_ts, end_ts, workers)
+        ]
+        merged = None
+        for future in futures:
+            part = future.result()
+            merged = part if merged is None else _merge(merged, part)
+        return merged
+    except BrokenProcessPool as e:
+        _reset_pool()
+        print(f"Report shard pool failed ({e!r}); running {report} in-process")
+        return getattr(reports_service, report)(db.session, start_ts, end_ts)
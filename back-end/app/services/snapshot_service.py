@@ -0,0 +1,296 @@
+"""
+Columnar snapshot of the sales fact for historical reports (?source=snapshot).
+
+`python -m scripts.export_snapshot` (nightly, from cron) writes every order line
+up to the export time into fixed-width NumPy column files under SNAPSHOT_DIR:
+
+    <version>/lines/{ts,order_id,product_id,product,category,cashier_id,qty,revenue,method}.npy
+    <version>/orders/{ts,order_id,total,cashier_id,method}.npy
+    <version>/dictionary.json   product / category / method strings, indexed by the code columns
+    <version>/meta.json         row counts, export time, dtypes
+    CURRENT                     name of the newest complete version (replaced last)
+
+Rows are sorted by timestamp (epoch seconds, UTC), so a report window is two
+binary searches and a slice. Readers open the columns with np.load(mmap_mode="r"):
+nothing is copied into the process, and every worker maps the same page-cache
+pages. A reader keeps using the version it opened until CURRENT changes. Older
+versions are deleted after SNAPSHOT_KEEP exports, and a worker that still has
+one mapped keeps reading it until it switches.
+
+numpy is optional (the "snapshot" extra); without it the export and source=snapshot
+report a clear error and everything else is unaffected.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import text
+
+from app.db import db
+from app.utils.errors import BadRequestError
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # optional ("snapshot" extra)
+    np = None
+
+CHUNK = 50_000
+NULL_ID = -1
+
+LINE_DTYPES = {
+    "ts": "<i8",          # order time, epoch seconds (UTC)
+    "order_id": "<i8",
+    "product_id": "<i4",
+    "product": "<u4",     # dictionary code -> product name
+    "category": "<u2",    # dictionary code -> category
+    "cashier_id": "<i4",  # NULL_ID when unknown
+    "qty": "<i4",
+    "revenue": "<f8",     # sale-time line price (pre-tax)
+    "method": "<u2",      # dictionary code -> payment method ("" if unpaid)
+}
+ORDER_DTYPES = {
+    "ts": "<i8",
+    "order_id": "<i8",
+    "total": "<f8",       # tax included, as orders.total
+    "cashier_id": "<i4",
+    "method": "<u2",
+}
+
+# First non-refund tender per order
+_METHOD_SUBQUERY = """
+    LEFT JOIN (
+        SELECT orderid, MIN(LOWER(paymentmethod)) AS method
+        FROM payment
+        WHERE amountpaid > 0
+        GROUP BY orderid
+    ) m ON m.orderid = o.id
+"""
+
+LINES_SQL = text(
+    f"""
+    SELECT o.ordertime, o.id, oi.productid, p.name, p.category, o.cashierid,
+           oi.quantity, COALESCE(oi.lineprice, oi.unitprice * oi.quantity, 0.0), m.method
+    FROM orderitem oi
+    JOIN orders o ON o.id = oi.orderid
+    LEFT JOIN product p ON p.id = oi.productid
+    {_METHOD_SUBQUERY}
+    WHERE o.ordertime < :as_of
+    ORDER BY o.ordertime, o.id, oi.productid
+    """
+)
+ORDERS_SQL = text(
+    f"""
+    SELECT o.ordertime, o.id, o.total, o.cashierid, m.method
+    FROM orders o
+    {_METHOD_SUBQUERY}
+    WHERE o.ordertime < :as_of
+    ORDER BY o.ordertime, o.id
+    """
+)
+LINES_COUNT_SQL = text(
+    "SELECT COUNT(1) FROM orderitem oi JOIN orders o ON o.id = oi.orderid WHERE o.ordertime < :as_of"
+)
+ORDERS_COUNT_SQL = text("SELECT COUNT(1) FROM orders o WHERE o.ordertime < :as_of")
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise BadRequestError("Snapshots need numpy (install the 'snapshot' extra).")
+
+
+def snapshot_dir() -> Path:
+    configured = current_app.config.get("SNAPSHOT_DIR")
+    return Path(configured) if configured else Path(current_app.instance_path) / "snapshot"
+
+
+def _epoch(ts) -> int:
+    if isinstance(ts, str):  # raw SQLite text
+        ts = datetime.fromisoformat(ts)
+    return int(ts.replace(tzinfo=timezone.utc).timestamp())
+
+
+# --- export ---------------------------------------------------------------
+
+class _Dictionary:
+    def __init__(self):
+        self.values: Dict[str, List[str]] = {"product": [], "category": [], "method": [""]}
+        self._codes: Dict[str, Dict[str, int]] = {k: {v: i for i, v in enumerate(vs)} for k, vs in self.values.items()}
+
+    def code(self, kind: str, value: Optional[str]) -> int:
+        value = value or ""
+        codes = self._codes[kind]
+        if value not in codes:
+            codes[value] = len(self.values[kind])
+            self.values[kind].append(value)
+        return codes[value]
+
+
+def _epochs(values) -> "np.ndarray":
+    # datetimes (or SQLite's ISO strings) -> epoch seconds, a whole chunk at a time
+    return np.array(values, dtype="datetime64[us]").astype("datetime64[s]").astype("<i8")
+
+
+def _fill(conn, sql, as_of, count: int, folder: Path, dtypes: Dict[str, str], convert) -> int:
+    folder.mkdir(parents=True)
+    columns = {
+        name: np.lib.format.open_memmap(folder / f"{name}.npy", mode="w+", dtype=dtype, shape=(count,))
+        for name, dtype in dtypes.items()
+    }
+    filled = 0
+    result = conn.execution_options(stream_results=True).execute(sql, {"as_of": as_of})
+    for rows in result.partitions(CHUNK):
+        rows = rows[: count - filled]
+        if not rows:
+            break
+        converted = list(zip(*(convert(r) for r in rows)))
+        end = filled + len(rows)
+        for position, name in enumerate(dtypes):
+            values = converted[position]
+            columns[name][filled:end] = _epochs(values) if name == "ts" else values
+        filled = end
+    result.close()
+    for column in columns.values():
+        column.flush()
+    del columns
+    if filled < count:  # rows deleted mid-export (archival); keep only what was read
+        for name in dtypes:
+            path = folder / f"{name}.npy"
+            np.save(path, np.load(path, mmap_mode="r")[:filled].copy())
+    return filled
+
+
+def export(as_of: Optional[datetime] = None, keep: Optional[int] = None) -> Dict[str, Any]:
+    """Write a new snapshot version of everything ordered before as_of (default now) and make it current."""
+    _require_numpy()
+    as_of = as_of or datetime.utcnow()
+    keep = keep if keep is not None else int(current_app.config.get("SNAPSHOT_KEEP", 2))
+    root = snapshot_dir()
+    root.mkdir(parents=True, exist_ok=True)
+    version = as_of.strftime("%Y%m%dT%H%M%S")
+    staging = root / f".{version}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+
+    started = time.perf_counter()
+    dictionary = _Dictionary()
+
+    def _line(r):
+        return (
+            r[0], r[1], r[2] if r[2] is not None else NULL_ID,
+            dictionary.code("product", r[3]), dictionary.code("category", r[4]),
+            r[5] if r[5] is not None else NULL_ID, int(r[6] or 0), float(r[7] or 0.0),
+            dictionary.code("method", r[8]),
+        )
+
+    def _order(r):
+        return (
+            r[0], r[1], float(r[2] or 0.0),
+            r[3] if r[3] is not None else NULL_ID, dictionary.code("method", r[4]),
+        )
+
+    with db.engine.connect() as conn:
+        if conn.dialect.name == "postgresql":  # both passes see the same database state
+            conn = conn.execution_options(isolation_level="REPEATABLE READ")
+        line_count = conn.execute(LINES_COUNT_SQL, {"as_of": as_of}).scalar() or 0
+        order_count = conn.execute(ORDERS_COUNT_SQL, {"as_of": as_of}).scalar() or 0
+        lines = _fill(conn, LINES_SQL, as_of, line_count, staging / "lines", LINE_DTYPES, _line)
+        orders = _fill(conn, ORDERS_SQL, as_of, order_count, staging / "orders", ORDER_DTYPES, _order)
+
+    meta = {
+        "version": version,
+        "as_of": as_of.isoformat() + "Z",
+        "lines": lines,
+        "orders": orders,
+        "line_dtypes": LINE_DTYPES,
+        "order_dtypes": ORDER_DTYPES,
+        "export_seconds": round(time.perf_counter() - started, 3),
+    }
+    (staging / "dictionary.json").write_text(json.dumps(dictionary.values))
+    (staging / "meta.json").write_text(json.dumps(meta, indent=2))
+    os.replace(staging, root / version)
+
+    current_tmp = root / "CURRENT.tmp"
+    current_tmp.write_text(version)
+    os.replace(current_tmp, root / "CURRENT")
+
+    versions = sorted(p.name for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in versions[: max(0, len(versions) - max(keep, 1))]:
+        shutil.rmtree(root / old, ignore_errors=True)
+    return meta
+
+
+# --- reads ----------------------------------------------------------------
+
+class Snapshot:
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self.meta = json.loads((folder / "meta.json").read_text())
+        self.dictionary = json.loads((folder / "dictionary.json").read_text())
+        self.lines = {n: np.load(folder / "lines" / f"{n}.npy", mmap_mode="r") for n in LINE_DTYPES}
+        self.orders = {n: np.load(folder / "orders" / f"{n}.npy", mmap_mode="r") for n in ORDER_DTYPES}
+
+    def _slice(self, columns, start_ts: datetime, end_ts: datetime) -> slice:
+        ts = columns["ts"]
+        return slice(
+            int(np.searchsorted(ts, _epoch(start_ts), side="left")),
+            int(np.searchsorted(ts, _epoch(end_ts), side="left")),
+        )
+
+    def sales_totals(self, start_ts: datetime, end_ts: datetime) -> Tuple[float, int]:
+        window = self._slice(self.orders, start_ts, end_ts)
+        totals = self.orders["total"][window]
+        return float(totals.sum()), int(totals.shape[0])
+
+    def item_quantities(self, start_ts: datetime, end_ts: datetime) -> Dict[str, int]:
+        window = self._slice(self.lines, start_ts, end_ts)
+        sums = np.bincount(self.lines["product"][window], weights=self.lines["qty"][window],
+                           minlength=len(self.dictionary["product"]))
+        names = self.dictionary["product"]
+        return {names[code]: int(sums[code]) for code in np.flatnonzero(sums)}
+
+    def daily_item_quantities(self, start_ts: datetime, end_ts: datetime) -> Dict[str, Dict[str, int]]:
+        window = self._slice(self.lines, start_ts, end_ts)
+        products = len(self.dictionary["product"])
+        day = self.lines["ts"][window] // 86400
+        if day.shape[0] == 0:
+            return {}
+        first_day = int(day[0])
+        keys = (day - first_day) * products + self.lines["product"][window]
+        sums = np.bincount(keys, weights=self.lines["qty"][window])
+        names = self.dictionary["product"]
+        days: Dict[str, Dict[str, int]] = {}
+        for key in np.flatnonzero(sums):
+            offset, code = divmod(int(key), products)
+            iso = datetime.fromtimestamp((first_day + offset) * 86400, tz=timezone.utc).date().isoformat()
+            days.setdefault(iso, {})[names[code]] = int(sums[key])
+        return days
+
+
+_loaded: Dict[str, Snapshot] = {}
+_loaded_lock = threading.Lock()
+
+
+def current() -> Snapshot:
+    """The newest complete snapshot, mapped once per process and version."""
+    _require_numpy()
+    root = snapshot_dir()
+    try:
+        version = (root / "CURRENT").read_text().strip()
+    except FileNotFoundError:
+        raise BadRequestError("No snapshot yet; run `python -m scripts.export_snapshot`.") from None
+    key = str(root / version)
+    snapshot = _loaded.get(key)
+    if snapshot is None:
+        with _loaded_lock:
+            snapshot = _loaded.get(key)
+            if snapshot is None:
+                snapshot = Snapshot(root / version)
+                _loaded.clear()  # drop maps of replaced versions
+                _loaded[key] = snapshot
+    return snapshot
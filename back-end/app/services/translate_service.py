@@ -0,0 +1,103 @@
+"""
+Translation service (MyMemory API) shared by the translate route and the localized menu
+"""
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Tuple
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from app.utils.errors import BadRequestError
+
+# MyMemory Translation API (Free, no API key required)
+MYMEMORY_API_URL = "https://api.mymemory.translated.net/get"
+
+# How many strings we translate concurrently when building a whole menu
+MAX_PARALLEL_TRANSLATIONS = 8
+
+# (text, source, target) -> translated text. Only successful translations are cached.
+_cache: Dict[Tuple[str, str, str], str] = {}
+_cache_lock = threading.Lock()
+
+
+def _fetch_json(params: Dict[str, str]) -> Dict[str, Any]:
+    # requests is imported on first use (not at app startup); stdlib fallback if missing
+    try:
+        import requests  # type: ignore
+    except ImportError:
+        url = f"{MYMEMORY_API_URL}?{urlencode(params)}"
+        with urlopen(url, timeout=5) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+    response = requests.get(MYMEMORY_API_URL, params=params, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+
+def translate(text: str, target: str = "es", source: str = "en") -> str:
+    """Translate a single string, raising BadRequestError if the API call fails."""
+    if not text or source == target:
+        return text
+
+    key = (text, source, target)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    params = {"q": text, "langpair": f"{source}|{target}"}
+    try:
+        result = _fetch_json(params)
+    except Exception as e:
+        raise BadRequestError(f"Translation API request failed: {str(e)}")
+
+    # Check if translation was successful
+    if result.get("responseStatus") == 200 or result.get("responseData"):
+        translated = result["responseData"]["translatedText"]
+        with _cache_lock:
+            _cache[key] = translated
+        return translated
+
+    error_msg = result.get("responseDetails", "Translation failed")
+    raise BadRequestError(f"Translation failed: {error_msg}")
+
+
+def translate_many(texts: Iterable[str], target: str, source: str = "en") -> Tuple[Dict[str, str], int]:
+    """
+    Translate a batch of strings, falling back to the original text on failure.
+    Returns ({original: translated}, number_of_failures).
+    """
+    unique = sorted({t for t in texts if t})
+    if source == target:
+        return {t: t for t in unique}, 0
+
+    out: Dict[str, str] = {}
+    pending = []
+    with _cache_lock:
+        for t in unique:
+            cached = _cache.get((t, source, target))
+            if cached is not None:
+                out[t] = cached
+            else:
+                pending.append(t)
+
+    if not pending:
+        return out, 0
+
+    failures = 0
+
+    def _one(text: str):
+        try:
+            return text, translate(text, target=target, source=source), True
+        except BadRequestError as e:
+            print(f"Translation fallback for {text!r}: {e}")
+            return text, text, False
+
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_TRANSLATIONS, len(pending))) as pool:
+        for text, translated, ok in pool.map(_one, pending):
+            out[text] = translated
+            if not ok:
+                failures += 1
+
+    return out, failures
@@ -0,0 +1,138 @@
+"""
+Negotiated response compression (gzip, plus brotli/zstd when installed).
+
+An after_request hook picks the best encoding the client accepts (q-values from
+Accept-Encoding; ties go to br > zstd > gzip) for compressible bodies of at least
+COMPRESS_MIN_BYTES. Streamed responses, server-sent events and bodies that are
+already encoded are left alone. Responses that carry an ETag (the menu, for one)
+are cached compressed per (endpoint, ETag, encoding) in a small LRU so identical
+payloads are compressed once; their ETag is made weak since the bytes differ per
+encoding, which keeps If-None-Match/304 working.
+"""
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import request
+
+from app.utils import metrics
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # optional ("perf" extra)
+    brotli = None
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # optional ("perf" extra)
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+_cache: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def available_encoders(gzip_level: int = 6) -> Dict[str, Callable[[bytes], bytes]]:
+    """Encoders in server preference order (best ratio first)."""
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+    if brotli is not None:
+        encoders["br"] = lambda data: brotli.compress(data, quality=5)
+    if zstandard is not None:
+        # compressor objects aren't thread-safe; they're cheap to create
+        encoders["zstd"] = lambda data: zstandard.ZstdCompressor(level=3).compress(data)
+    encoders["gzip"] = lambda data: gzip.compress(data, compresslevel=gzip_level, mtime=0)
+    return encoders
+
+
+def choose_encoding(accept_encodings, encoders) -> Optional[str]:
+    """Highest-q encoding we support; None if the client only takes identity."""
+    best, best_q = None, 0.0
+    for name in encoders:
+        q = accept_encodings.quality(name)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _is_compressible(mimetype: str) -> bool:
+    if mimetype == "text/event-stream":
+        return False
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES
+
+
+def _cache_get(key):
+    with _cache_lock:
+        body = _cache.get(key)
+        if body is not None:
+            _cache.move_to_end(key)
+        return body
+
+
+def _cache_put(key, body: bytes, max_entries: int) -> None:
+    with _cache_lock:
+        _cache[key] = body
+        _cache.move_to_end(key)
+        while len(_cache) > max_entries:
+            _cache.popitem(last=False)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def init_app(app) -> None:
+    """Install the compression hook (COMPRESS_ENABLED, COMPRESS_MIN_BYTES, COMPRESS_CACHE_ENTRIES)."""
+    if not app.config.get("COMPRESS_ENABLED", True):
+        return
+    min_bytes = int(app.config.get("COMPRESS_MIN_BYTES", 1024))
+    cache_entries = int(app.config.get("COMPRESS_CACHE_ENTRIES", 64))
+    encoders = available_encoders(int(app.config.get("COMPRESS_GZIP_LEVEL", 6)))
+    metrics.describe("http_response_compressed_total", "counter", "Responses compressed, by encoding.")
+    metrics.describe("http_response_compression_saved_bytes_total", "counter", "Bytes saved by compression.")
+
+    @app.after_request
+    def _compress(response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or "no-transform" in (response.headers.get("Cache-Control") or "")
+            or not _is_compressible(response.mimetype or "")
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return response
+        if (response.content_length or 0) < min_bytes:
+            return response
+        encoding = choose_encoding(request.accept_encodings, encoders)
+        if encoding is None:
+            return response
+
+        etag, _ = response.get_etag()
+        key = (request.endpoint or "", etag, encoding) if etag else None
+        body = _cache_get(key) if key else None
+        raw = response.get_data()
+        if body is None:
+            body = encoders[encoding](raw)
+            if key:
+                _cache_put(key, body, cache_entries)
+        if len(body) >= len(raw):
+            return response
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            response.set_etag(etag, weak=True)
+        metrics.inc("http_response_compressed_total", {"encoding": encoding})
+        metrics.inc("http_response_compression_saved_bytes_total", {"encoding": encoding}, len(raw) - len(body))
+        return response
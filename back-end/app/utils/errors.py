@@ -1,4 +1,5 @@
-from flask import jsonify
+from flask import jsonify, request
+from app.utils import metrics
 
 class NotFoundError(Exception):
     """Raise this in services when something (like a product or cashier) isn't found."""
@@ -12,6 +13,10 @@ class UnauthorizedError(Exception):
     """Raise this when authentication is required or fails."""
     pass
 
+class ServiceUnavailableError(Exception):
+    """Raise this when a dependency (e.g. the group-commit writer) can't answer in time; retry later."""
+    pass
+
 def register_error_handlers(app):
     # 404-style business errors from our code
     @app.errorhandler(NotFoundError)
@@ -37,6 +42,14 @@ def register_error_handlers(app):
             "message": str(err),
         }), 401
 
+    # 503-style temporary failures (the client may retry)
+    @app.errorhandler(ServiceUnavailableError)
+    def handle_unavailable(err):
+        return jsonify({
+            "error": "unavailable",
+            "message": str(err),
+        }), 503
+
     # Catch-all safety net so React always gets JSON, not an HTML traceback
     @app.errorhandler(Exception)
     def handle_generic_error(err):
@@ -45,6 +58,10 @@ def register_error_handlers(app):
         import traceback
         print("UNHANDLED EXCEPTION:", repr(err))
         traceback.print_exc()
+        metrics.inc("http_unhandled_exceptions_total", {
+            "endpoint": request.endpoint or "unmatched",
+            "exception": type(err).__name__,
+        })
 
         return jsonify({
             "error": "internal_error",
@@ -0,0 +1,85 @@
+"""
+JSON provider used by jsonify/request.get_json.
+
+Uses orjson when it's installed (JSON_ENCODER=auto|orjson) and the stdlib
+encoder otherwise (or with JSON_ENCODER=stdlib). Both write dates and datetimes as
+ISO 8601 (what the routes used to do by hand with .isoformat()), keep Flask's key
+sorting/indent behavior, and fall back to Flask's handling for Decimal, UUID,
+dataclasses and __html__ objects.
+"""
+import json
+from datetime import date, time
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider, _default as _flask_default
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional speedup ("perf" extra)
+    orjson = None
+
+
+def _default(o: Any) -> Any:
+    # Flask's own default renders dates as HTTP dates; we want ISO 8601
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    return _flask_default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def __init__(self, app, backend: str = "auto"):
+        super().__init__(app)
+        if backend not in ("auto", "orjson", "stdlib"):
+            raise ValueError(f"JSON_ENCODER must be auto, orjson or stdlib (got {backend!r})")
+        if backend == "orjson" and orjson is None:
+            raise ValueError("JSON_ENCODER=orjson but orjson is not installed")
+        self.backend = "orjson" if orjson is not None and backend != "stdlib" else "stdlib"
+
+    def _indent(self) -> bool:
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def _orjson_dumps(self, obj: Any, indent: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # orjson only for the plain call; any stdlib-specific kwargs go to json.dumps
+        if self.backend == "orjson" and not kwargs:
+            try:
+                return self._orjson_dumps(obj).decode("utf-8")
+            except (TypeError, orjson.JSONEncodeError):
+                pass  # e.g. ints beyond 64 bits; the stdlib handles them
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if self.backend == "orjson" and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass  # let json raise its usual error (NaN/Infinity are also accepted there)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self._indent()
+        if self.backend == "orjson":
+            try:
+                body = self._orjson_dumps(obj, indent=indent) + b"\n"
+                return self._app.response_class(body, mimetype=self.mimetype)
+            except (TypeError, orjson.JSONEncodeError):
+                pass
+        dump_args = {"indent": 2} if indent else {"separators": (",", ":")}
+        return self._app.response_class(
+            f"{super().dumps(obj, **dump_args)}\n", mimetype=self.mimetype
+        )
+
+
+def init_app(app) -> None:
+    """Install the provider; JSON_ENCODER picks the backend."""
+    app.json = FastJSONProvider(app, app.config.get("JSON_ENCODER", "auto"))
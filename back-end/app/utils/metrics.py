@@ -0,0 +1,227 @@
+"""
+Request metrics in Prometheus text format.
+
+Every thread records into its own dictionaries (no locks on the request path);
+a scrape merges all threads' buckets. Threads that have exited are folded into a
+retired aggregate so per-request threads (dev server) don't grow the registry.
+"""
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from flask import g, request
+
+# Latency buckets in seconds (upper bounds); +Inf is implicit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# metric name -> (type, help)
+_METRIC_INFO: Dict[str, Tuple[str, str]] = {
+    "http_request_duration_seconds": ("histogram", "Request latency by route."),
+    "http_requests_total": ("counter", "Requests by route and status code."),
+    "http_requests_in_flight": ("gauge", "Requests currently being served by route."),
+    "http_unhandled_exceptions_total": ("counter", "Requests that hit the catch-all error handler."),
+}
+
+
+class _ThreadStats:
+    __slots__ = ("thread", "histograms", "counters", "gauges")
+
+    def __init__(self, thread):
+        self.thread = thread
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+
+
+# histogram name -> bucket bounds it was first observed with
+_BUCKETS: Dict[str, Tuple[float, ...]] = {}
+
+_local = threading.local()
+_registry: List[_ThreadStats] = []
+_registry_lock = threading.Lock()  # only taken when a thread registers and on scrape
+_retired = _ThreadStats(None)
+_PRUNE_EVERY = 64
+
+
+def _fold(into: _ThreadStats, src: _ThreadStats) -> None:
+    for key, buckets in list(src.histograms.items()):
+        cur = into.histograms.get(key)
+        if cur is None:
+            into.histograms[key] = list(buckets)
+        else:
+            for i, v in enumerate(buckets):
+                cur[i] += v
+    for key, v in list(src.counters.items()):
+        into.counters[key] = into.counters.get(key, 0.0) + v
+    for key, v in list(src.gauges.items()):
+        into.gauges[key] = into.gauges.get(key, 0.0) + v
+
+
+def _prune_dead() -> None:
+    # caller holds _registry_lock; dead threads can't write anymore, so folding is safe
+    alive = []
+    for st in _registry:
+        if st.thread.is_alive():
+            alive.append(st)
+        else:
+            _fold(_retired, st)
+    _registry[:] = alive
+
+
+def _stats() -> _ThreadStats:
+    st = getattr(_local, "stats", None)
+    if st is None:
+        st = _ThreadStats(threading.current_thread())
+        with _registry_lock:
+            if len(_registry) % _PRUNE_EVERY == 0:
+                _prune_dead()
+            _registry.append(st)
+        _local.stats = st
+    return st
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def describe(name: str, kind: str, help_text: str) -> None:
+    """Register HELP/TYPE metadata for a metric recorded elsewhere."""
+    _METRIC_INFO[name] = (kind, help_text)
+
+
+def observe(name: str, labels: Dict[str, str], value: float, buckets=DEFAULT_BUCKETS) -> None:
+    """Record value into a histogram (layout: one count per bucket, +Inf, sum)."""
+    buckets = _BUCKETS.setdefault(name, tuple(buckets))
+    key = (name, _labels(labels))
+    histograms = _stats().histograms
+    hist = histograms.get(key)
+    if hist is None:
+        hist = [0.0] * (len(buckets) + 2)
+        histograms[key] = hist
+    i = 0
+    for bound in buckets:
+        if value <= bound:
+            break
+        i += 1
+    hist[i] += 1
+    hist[-1] += value
+
+
+def inc(name: str, labels: Dict[str, str], amount: float = 1.0) -> None:
+    key = (name, _labels(labels))
+    counters = _stats().counters
+    counters[key] = counters.get(key, 0.0) + amount
+
+
+def gauge_add(name: str, labels: Dict[str, str], amount: float) -> None:
+    key = (name, _labels(labels))
+    gauges = _stats().gauges
+    gauges[key] = gauges.get(key, 0.0) + amount
+
+
+def _route_labels() -> Dict[str, str]:
+    return {
+        "blueprint": request.blueprint or "",
+        "endpoint": request.endpoint or "unmatched",
+        "method": request.method,
+    }
+
+
+def init_app(app) -> None:
+    """Install the request hooks that feed the HTTP metrics."""
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_started = time.perf_counter()
+        g._metrics_labels = _route_labels()
+        gauge_add("http_requests_in_flight", g._metrics_labels, 1)
+
+    @app.after_request
+    def _metrics_record(response):
+        started = g.get("_metrics_started")
+        if started is not None:
+            labels = g._metrics_labels
+            observe("http_request_duration_seconds", labels, time.perf_counter() - started)
+            inc("http_requests_total", {**labels, "status": response.status_code})
+        return response
+
+    @app.teardown_request
+    def _metrics_done(exc=None):
+        labels = g.pop("_metrics_labels", None)
+        if labels is not None:
+            gauge_add("http_requests_in_flight", labels, -1)
+
+
+def _merged() -> _ThreadStats:
+    total = _ThreadStats(None)
+    with _registry_lock:
+        _prune_dead()
+        _fold(total, _retired)
+        for st in _registry:
+            _fold(total, st)
+    return total
+
+
+def _fmt_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in items
+    )
+    return "{" + body + "}"
+
+
+def _fmt_value(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def render(extra_gauges: Dict[str, Tuple[str, float]] = None) -> str:
+    """
+    Prometheus text exposition of everything recorded so far.
+    extra_gauges: {name: (help, value)} sampled at scrape time (e.g. pool stats).
+    """
+    total = _merged()
+    lines: List[str] = []
+
+    def _header(name: str, default_kind: str):
+        kind, help_text = _METRIC_INFO.get(name, (default_kind, name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    by_name: Dict[str, list] = {}
+    for (name, labels), hist in total.histograms.items():
+        by_name.setdefault(name, []).append((labels, hist))
+    for name in sorted(by_name):
+        _header(name, "histogram")
+        buckets = _BUCKETS[name]
+        for labels, hist in sorted(by_name[name]):
+            cumulative = 0.0
+            for bound, count in zip(buckets, hist):
+                cumulative += count
+                lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', repr(bound)),))} {_fmt_value(cumulative)}")
+            cumulative += hist[len(buckets)]
+            lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', '+Inf'),))} {_fmt_value(cumulative)}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_value(hist[-1])}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {_fmt_value(cumulative)}")
+
+    for store, kind in ((total.counters, "counter"), (total.gauges, "gauge")):
+        by_name = {}
+        for (name, labels), v in store.items():
+            by_name.setdefault(name, []).append((labels, v))
+        for name in sorted(by_name):
+            _header(name, kind)
+            for labels, v in sorted(by_name[name]):
+                lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(v)}")
+
+    for name, (help_text, value) in sorted((extra_gauges or {}).items()):
+        if value is None:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {_fmt_value(value)}")
+
+    return "\n".join(lines) + "\n"
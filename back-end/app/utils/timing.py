@@ -0,0 +1,61 @@
+"""
+Sampled phase timers for latency-sensitive routes.
+
+A route calls begin(<name>) to opt a (sampled) request in; code on the request
+path then wraps its phases in `with phase("..."):`. Sampled requests get a
+Server-Timing header and feed the <name>_phase_duration_seconds histogram.
+Unsampled requests (and code running outside a request) pay one dict lookup.
+"""
+import random
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context
+
+from app.utils import metrics
+
+
+def begin(name: str) -> bool:
+    """Start timing this request's phases if it falls in SERVER_TIMING_SAMPLE_RATE."""
+    rate = float(current_app.config.get("SERVER_TIMING_SAMPLE_RATE", 0.0))
+    if rate <= 0.0 or (rate < 1.0 and random.random() >= rate):
+        return False
+    g._phase_timer = {"name": name, "started": time.perf_counter(), "phases": []}
+    return True
+
+
+@contextmanager
+def phase(name: str):
+    timer = g.get("_phase_timer") if has_request_context() else None
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer["phases"].append((name, time.perf_counter() - started))
+
+
+def init_app(app) -> None:
+    """Emit Server-Timing and record phase histograms for sampled requests."""
+
+    @app.after_request
+    def _emit_server_timing(response):
+        timer = g.pop("_phase_timer", None)
+        if timer is None:
+            return response
+        metric = f"{timer['name']}_phase_duration_seconds"
+        metrics.describe(metric, "histogram", f"Sampled {timer['name']} phase latency.")
+
+        entries = []
+        for name, seconds in timer["phases"]:
+            metrics.observe(metric, {"phase": name}, seconds)
+            entries.append(f"{name};dur={seconds * 1000.0:.3f}")
+        total = time.perf_counter() - timer["started"]
+        metrics.observe(metric, {"phase": "total"}, total)
+        entries.append(f"total;dur={total * 1000.0:.3f}")
+
+        existing = response.headers.get("Server-Timing")
+        response.headers["Server-Timing"] = ", ".join(([existing] if existing else []) + entries)
+        return response
@@ -0,0 +1,14 @@
+-- Migration: Create running_counter table for maintained totals
+-- Date: 2025-12-01
+-- Description: Constant-time /api/meta/stats. create_order bumps these rows in the
+--              checkout transaction; a reconciliation job recomputes them from
+--              orders/orderitem to correct any drift. Rows are seeded lazily by the
+--              first read, so no backfill is needed here.
+
+CREATE TABLE IF NOT EXISTS running_counter (
+    name VARCHAR(255) PRIMARY KEY,
+    value DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE running_counter IS 'Running totals maintained by checkout (orders_total, items_total, revenue:<day>, drinks:<day>)';
@@ -0,0 +1,13 @@
+-- Migration: Store sale-time prices on order items
+-- Date: 2025-12-08
+-- Description: create_order now writes the unit price (base price + size delta) and
+--              the line price. Reads no longer join product, and history stays correct
+--              after menu price changes. Existing rows stay NULL until
+--              `python -m scripts.backfill_orderitem_prices` fills them. The backfill
+--              splits each order's stored subtotal across its lines.
+
+ALTER TABLE orderitem ADD COLUMN IF NOT EXISTS unitprice DOUBLE PRECISION;
+ALTER TABLE orderitem ADD COLUMN IF NOT EXISTS lineprice DOUBLE PRECISION;
+
+COMMENT ON COLUMN orderitem.unitprice IS 'Unit price at sale time, size delta included';
+COMMENT ON COLUMN orderitem.lineprice IS 'unitprice * quantity at sale time';
@@ -0,0 +1,99 @@
+-- Migration: Partition orders and payment by month
+-- Date: 2025-12-15
+-- Description: orders becomes PARTITION BY RANGE (ordertime) and payment becomes
+--              PARTITION BY RANGE (paymenttime), with one partition per calendar month
+--              (orders_2025_11, payment_2025_11, ...) plus a DEFAULT partition each.
+--              Reports and list_orders already filter on those columns, so the planner
+--              prunes old months. Closed months can be moved to compressed archive files
+--              with `python -m scripts.order_partitions archive`, which drops their
+--              partitions. Run `python -m scripts.order_partitions create` monthly (cron)
+--              to add partitions ahead of time.
+--
+--              Foreign keys from orderitem/payment to orders are dropped: a partitioned
+--              table's unique key must include the partition key, so orders' key becomes
+--              (id, ordertime). The orders.id sequence is kept (same name, same values).
+--              orderitem is not partitioned (it has no timestamp); archival deletes its
+--              rows by orderid.
+--
+--              ordertime must not be NULL; check first with
+--              SELECT COUNT(*) FROM orders WHERE ordertime IS NULL;
+
+BEGIN;
+
+-- Creates one monthly partition of parent (idempotent); also used by scripts/order_partitions.py
+CREATE OR REPLACE FUNCTION create_month_partition(parent regclass, month_start date)
+RETURNS text LANGUAGE plpgsql AS $$
+DECLARE
+    first_day date := date_trunc('month', month_start)::date;
+    part_name text := format('%s_%s', parent::text, to_char(first_day, 'YYYY_MM'));
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+        part_name, parent, first_day, (first_day + interval '1 month')::date
+    );
+    RETURN part_name;
+END $$;
+
+ALTER TABLE orderitem DROP CONSTRAINT IF EXISTS orderitem_orderid_fkey;
+ALTER TABLE payment DROP CONSTRAINT IF EXISTS payment_orderid_fkey;
+
+-- Keep the id sequence alive while the old table is dropped (re-owned at the end)
+CREATE TEMP TABLE orders_id_seq_name ON COMMIT DROP AS
+    SELECT pg_get_serial_sequence('orders', 'id') AS seq;
+DO $$
+DECLARE seq text := (SELECT seq FROM orders_id_seq_name);
+BEGIN
+    IF seq IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY NONE', seq);
+    END IF;
+END $$;
+
+ALTER TABLE orders RENAME TO orders_unpartitioned;
+ALTER TABLE payment RENAME TO payment_unpartitioned;
+
+CREATE TABLE orders (LIKE orders_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (ordertime);
+ALTER TABLE orders ALTER COLUMN ordertime SET NOT NULL;
+ALTER TABLE orders ADD PRIMARY KEY (id, ordertime);
+CREATE INDEX ix_orders_ordertime ON orders (ordertime);
+CREATE TABLE orders_default PARTITION OF orders DEFAULT;
+
+CREATE TABLE payment (LIKE payment_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (paymenttime);
+ALTER TABLE payment ADD PRIMARY KEY (orderid, paymenttime);
+CREATE INDEX ix_payment_paymenttime ON payment (paymenttime);
+CREATE TABLE payment_default PARTITION OF payment DEFAULT;
+
+-- A partition for every month that has data, through three months ahead
+DO $$
+DECLARE
+    first_month date;
+    m date;
+BEGIN
+    SELECT date_trunc('month', LEAST(
+        COALESCE((SELECT MIN(ordertime) FROM orders_unpartitioned), now()),
+        COALESCE((SELECT MIN(paymenttime) FROM payment_unpartitioned), now())
+    ))::date INTO first_month;
+    m := first_month;
+    WHILE m <= (date_trunc('month', now()) + interval '3 months')::date LOOP
+        PERFORM create_month_partition('orders', m);
+        PERFORM create_month_partition('payment', m);
+        m := (m + interval '1 month')::date;
+    END LOOP;
+END $$;
+
+INSERT INTO orders SELECT * FROM orders_unpartitioned;
+INSERT INTO payment SELECT * FROM payment_unpartitioned;
+
+-- CASCADE only removes foreign keys still pointing at the old tables under other names
+DROP TABLE orders_unpartitioned CASCADE;
+DROP TABLE payment_unpartitioned CASCADE;
+
+-- LIKE ... INCLUDING DEFAULTS kept nextval('<seq>') as the id default
+DO $$
+DECLARE seq text := (SELECT seq FROM orders_id_seq_name);
+BEGIN
+    IF seq IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY orders.id', seq);
+    END IF;
+END $$;
+
+COMMIT;
@@ -0,0 +1,31 @@
+-- Migration: Structured order-line modifiers
+-- Date: 2025-12-18
+-- Description: `modifier` holds one row per option key from /api/meta/options
+--              (toppings, ice_levels, sweetness_levels, bases, sizes, flavor_shots), with a
+--              SMALLINT id. `orderitem_modifier` links an order line to each option parsed
+--              from its customizations text and copies the line's quantity, so modifier
+--              totals come from the covering (modifierid, orderid, quantity) index without parsing text.
+--              The app adds the modifier rows on first use. Fill orderitem_modifier for
+--              existing orders with `python -m scripts.backfill_modifiers`; after that, the
+--              app's background indexer keeps it current (MODIFIER_INDEX_SECONDS).
+
+CREATE TABLE IF NOT EXISTS modifier (
+    id          SMALLINT PRIMARY KEY,
+    optiongroup VARCHAR NOT NULL,
+    optionkey   VARCHAR NOT NULL,
+    label       VARCHAR NOT NULL,
+    CONSTRAINT uq_modifier_option UNIQUE (optiongroup, optionkey)
+);
+
+CREATE TABLE IF NOT EXISTS orderitem_modifier (
+    orderid    INTEGER  NOT NULL,
+    productid  INTEGER  NOT NULL,
+    modifierid SMALLINT NOT NULL REFERENCES modifier (id),
+    quantity   INTEGER  NOT NULL,
+    PRIMARY KEY (orderid, productid, modifierid),
+    FOREIGN KEY (orderid, productid) REFERENCES orderitem (orderid, productid)
+);
+
+CREATE INDEX IF NOT EXISTS ix_orderitem_modifier_modifier ON orderitem_modifier (modifierid, orderid, quantity);
+
+COMMENT ON TABLE orderitem_modifier IS 'Options parsed from orderitem.customizations (see app/services/modifier_service.py)';
@@ -0,0 +1,32 @@
+"""
+Parse orderitem.customizations of existing orders into orderitem_modifier (migrations/005).
+
+Picks up from the indexer's watermark (running_counter "modifiers_indexed_through"),
+so it can be stopped and re-run. --rebuild starts over, for example after a
+change to the parser or to MENU_OPTIONS.
+
+Usage (from back-end/): python -m scripts.backfill_modifiers [--batch 5000] [--rebuild]
+"""
+import argparse
+import time
+
+from app import create_app
+from app.services import modifier_service
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill structured order-line modifiers.")
+    parser.add_argument("--batch", type=int, default=5000, help="orders per transaction (default 5000)")
+    parser.add_argument("--rebuild", action="store_true", help="drop parsed modifiers and index every order again")
+    opts = parser.parse_args()
+
+    app = create_app('dev')
+    with app.app_context():
+        started = time.perf_counter()
+        if opts.rebuild:
+            result = modifier_service.rebuild(opts.batch)
+        else:
+            result = modifier_service.catch_up(opts.batch)
+        elapsed = time.perf_counter() - started
+        print(f"Done: {result['orders']} orders, {result['modifier_rows']} modifier rows in {elapsed:.1f}s "
+              f"(indexed through order {result['indexed_through']})")
@@ -0,0 +1,109 @@
+"""
+Fill orderitem.unitprice / lineprice for rows written before migrations/003.
+
+The part of each order's stored subtotal not already carried by priced lines is
+split across its unpriced lines in proportion to (current base price + size
+delta) * quantity, so an order's lines add up to what the customer was actually
+charged even if menu prices changed since. Only rows with a NULL lineprice are
+touched, so the script can be re-run, including after one that stopped halfway.
+
+lineprice is the figure that sums to the subtotal. A backfilled unitprice is
+lineprice / quantity, unrounded, so unitprice * quantity gives lineprice back;
+round it only for display.
+
+Usage (from back-end/): python -m scripts.backfill_orderitem_prices [--batch 5000]
+"""
+import argparse
+
+from sqlalchemy import text
+
+from app import create_app
+from app.db import db
+from app.services.orders_service import SIZE_PRICE_DELTAS, size_from_customizations
+
+
+def allocate(subtotal, lines):
+    """
+    lines: [(product_id, quantity, customizations, base_price)]
+    Returns [(product_id, unit_price, line_price)] whose line prices sum to subtotal
+    (the amount still to allocate, i.e. without lines that are already priced).
+    """
+    estimates = []
+    for pid, qty, customizations, base in lines:
+        size = size_from_customizations(customizations)
+        unit = float(base or 0.0) + SIZE_PRICE_DELTAS.get(size, 0.0)
+        estimates.append(unit * qty)
+    total_est = sum(estimates)
+    total_qty = sum(qty for _, qty, _, _ in lines) or 1
+
+    out = []
+    remaining = round(float(subtotal), 2) if subtotal is not None else None
+    for i, ((pid, qty, _, _), est) in enumerate(zip(lines, estimates)):
+        if remaining is None:
+            line = round(est, 2)
+        elif i == len(lines) - 1:
+            line = round(remaining, 2)  # absorb rounding so lines sum to the subtotal
+        elif total_est > 0:
+            line = round(float(subtotal) * est / total_est, 2)
+        else:
+            line = round(float(subtotal) * qty / total_qty, 2)
+        if remaining is not None and i < len(lines) - 1:
+            remaining -= line
+        out.append((pid, line / qty if qty else line, line))
+    return out
+
+
+def backfill(batch_size=5000):
+    after = 0
+    updated = 0
+    while True:
+        ids = db.session.execute(text(
+            "SELECT DISTINCT orderid FROM orderitem WHERE lineprice IS NULL AND orderid > :after "
+            "ORDER BY orderid LIMIT :limit"
+        ), {"after": after, "limit": batch_size}).scalars().all()
+        if not ids:
+            break
+        upper = ids[-1]
+
+        rows = db.session.execute(text(
+            "SELECT oi.orderid, oi.productid, oi.quantity, oi.customizations, p.baseprice, "
+            "o.subtotal - COALESCE((SELECT SUM(x.lineprice) FROM orderitem x "
+            "WHERE x.orderid = o.id AND x.lineprice IS NOT NULL), 0) "
+            "FROM orderitem oi "
+            "JOIN orders o ON o.id = oi.orderid "
+            "LEFT JOIN product p ON p.id = oi.productid "
+            "WHERE oi.lineprice IS NULL AND oi.orderid > :after AND oi.orderid <= :upper "
+            "ORDER BY oi.orderid, oi.productid"
+        ), {"after": after, "upper": upper}).all()
+
+        by_order = {}
+        for order_id, pid, qty, customizations, base, unpriced in rows:
+            entry = by_order.setdefault(order_id, [unpriced, []])
+            entry[1].append((pid, int(qty), customizations, base))
+
+        params = [
+            {"o": order_id, "p": pid, "u": unit, "l": line}
+            for order_id, (unpriced, lines) in by_order.items()
+            for pid, unit, line in allocate(unpriced, lines)
+        ]
+        if params:
+            db.session.execute(text(
+                "UPDATE orderitem SET unitprice = :u, lineprice = :l WHERE orderid = :o AND productid = :p"
+            ), params)
+        db.session.commit()
+
+        updated += len(params)
+        after = upper
+        print(f"  orders <= {upper}: {updated} lines backfilled")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill sale-time prices on order items.")
+    parser.add_argument("--batch", type=int, default=5000, help="orders per transaction (default 5000)")
+    opts = parser.parse_args()
+
+    app = create_app('dev')
+    with app.app_context():
+        total = backfill(opts.batch)
+        print(f"Done: {total} order lines backfilled")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Checkout throughput with and without group commit at 1-64 concurrent registers.
+
+Runs the checkout-only load benchmark (scripts/bench_load.py, in-process threads)
+once per register count with GROUP_COMMIT_ENABLED off and once with it on, each
+against a fresh throwaway database unless --database-url is given. Prints a JSON
+report with throughput, p50/p95/p99 and error counts per run, plus the speedup.
+
+Usage (from back-end/):
+    python -m scripts.bench_group_commit
+    python -m scripts.bench_group_commit --registers 1,8,32 --duration 10 --max-wait-ms 5
+    python -m scripts.bench_group_commit --database-url postgresql://user:pw@localhost/pos_bench --i-know-this-writes
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.bench_load import WRITES_FLAG, refuse_unless_throwaway, run_benchmark  # noqa: E402
+
+DEFAULT_REGISTERS = "1,2,4,8,16,32,64"
+
+
+def _run(registers, enabled, args):
+    os.environ["GROUP_COMMIT_ENABLED"] = "1" if enabled else "0"
+    os.environ["GROUP_COMMIT_MAX_BATCH"] = str(args.max_batch)
+    os.environ["GROUP_COMMIT_MAX_WAIT_MS"] = str(args.max_wait_ms)
+    report = run_benchmark(
+        duration=args.duration, concurrency=registers, mix="checkout=100", mode="threads",
+        warmup=args.warmup, database_url=args.database_url, seed=args.seed, allow_writes=args.allow_writes,
+    )
+    stats = report["operations"].get("checkout", report["overall"])
+    return {
+        "registers": registers,
+        "group_commit": enabled,
+        "throughput_rps": stats["throughput_rps"],
+        "p50_ms": stats["p50_ms"],
+        "p95_ms": stats["p95_ms"],
+        "p99_ms": stats["p99_ms"],
+        "errors": stats["errors"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registers", default=DEFAULT_REGISTERS, help=f"concurrency levels (default {DEFAULT_REGISTERS})")
+    parser.add_argument("--duration", type=float, default=5.0, help="measured seconds per run (default 5)")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before each run")
+    parser.add_argument("--max-batch", type=int, default=32, help="GROUP_COMMIT_MAX_BATCH for the group runs")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="GROUP_COMMIT_MAX_WAIT_MS for the group runs")
+    parser.add_argument("--database-url", help="database to run against (default: throwaway SQLite file per run)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(WRITES_FLAG, dest="allow_writes", action="store_true",
+                        help="allow --database-url: the runs write orders and reset stock there")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    refuse_unless_throwaway(args.database_url, allow_writes=args.allow_writes)
+
+    runs = []
+    # the app prints to stdout; keep it clear for the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        for registers in [int(v) for v in args.registers.split(",")]:
+            baseline = _run(registers, False, args)
+            grouped = _run(registers, True, args)
+            if baseline["throughput_rps"] and grouped["throughput_rps"]:
+                grouped["speedup"] = round(grouped["throughput_rps"] / baseline["throughput_rps"], 2)
+            runs += [baseline, grouped]
+            print(f"{registers:>3} registers: {baseline['throughput_rps']:>8.1f} -> "
+                  f"{grouped['throughput_rps']:>8.1f} checkouts/s", file=sys.stderr)
+
+    report = {
+        "meta": {"duration_s": args.duration, "max_batch": args.max_batch,
+                 "max_wait_ms": args.max_wait_ms, "target": args.database_url or "sqlite (throwaway)"},
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        print(f"wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+JSON encoding benchmark on representative order-history pages.
+
+Builds list_orders-shaped pages (orders with 1-4 items and 1-2 payments, datetimes
+left for the encoder) and times the full jsonify path for each encoder:
+
+    legacy  - stdlib provider with .isoformat() done per row beforehand (the old routes)
+    stdlib  - FastJSONProvider with JSON_ENCODER=stdlib
+    orjson  - FastJSONProvider with JSON_ENCODER=orjson (skipped if not installed)
+
+Usage (from back-end/):
+    python -m scripts.bench_json
+    python -m scripts.bench_json --page-sizes 50,200,1000 --repeat 200 --output json.json
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app.utils import json_provider  # noqa: E402
+
+CUSTOMIZATIONS = ["Size: Medium", "Size: Large; 50% ice, Oat Milk, Boba", "Size: Small; No Ice", ""]
+
+
+def make_page(rng, size, iso=False):
+    """One page in the shape list_orders returns; iso=True pre-formats datetimes like the old routes."""
+    start = datetime(2026, 1, 1, 9)
+    orders = []
+    for i in range(size):
+        ts = start + timedelta(minutes=7 * i, seconds=rng.randrange(60), microseconds=rng.randrange(10 ** 6))
+        items = [
+            {
+                "product_id": rng.randrange(1, 30),
+                "quantity": rng.choice((1, 1, 2)),
+                "customizations": rng.choice(CUSTOMIZATIONS),
+                "line_price": round(rng.uniform(4, 12), 2),
+            }
+            for _ in range(rng.choice((1, 1, 2, 3, 4)))
+        ]
+        subtotal = round(sum(it["line_price"] for it in items), 2)
+        payments = [{"method": rng.choice(("card", "cash")), "amount": round(subtotal * 1.0825, 2),
+                     "time": ts.isoformat() if iso else ts}]
+        if rng.random() < 0.05:
+            payments.append({"method": "card", "amount": -payments[0]["amount"],
+                             "time": (ts + timedelta(minutes=5)).isoformat() if iso else ts + timedelta(minutes=5)})
+        orders.append({
+            "id": 100000 + i,
+            "cashier_id": rng.randrange(1, 9),
+            "subtotal": subtotal,
+            "tax": round(subtotal * 0.0825, 2),
+            "total": round(subtotal * 1.0825, 2),
+            "order_time": ts.isoformat() if iso else ts,
+            "status": "Complete",
+            "items": items,
+            "payments": payments,
+        })
+    return {"orders": orders, "page": 1, "page_size": size, "total": size * 40}
+
+
+def _time(fn, repeat):
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+    }
+
+
+def run(page_sizes, repeat, seed=7):
+    app = Flask(__name__)
+    encoders = {"legacy": DefaultJSONProvider(app), "stdlib": json_provider.FastJSONProvider(app, "stdlib")}
+    if json_provider.orjson is not None:
+        encoders["orjson"] = json_provider.FastJSONProvider(app, "orjson")
+
+    results = {}
+    with app.app_context():
+        for size in page_sizes:
+            raw = make_page(random.Random(seed), size)
+            row = {}
+            # the old routes paid for .isoformat() per row before jsonify; time page-building with
+            # and without it so legacy is charged encode + isoformat but not the fake data itself
+            plain = _time(lambda: make_page(random.Random(seed), size), repeat)
+            for name, provider in encoders.items():
+                if name == "legacy":
+                    stats = _time(lambda p=provider: p.response(make_page(random.Random(seed), size, iso=True)), repeat)
+                    stats = {k: round(stats[k] - plain[k], 4) for k in stats}
+                else:
+                    stats = _time(lambda p=provider: p.response(raw), repeat)
+                row[name] = {**stats, "bytes": len(provider.response(raw).get_data())}
+            base = row["legacy"]["median_ms"]
+            for name in row:
+                row[name]["speedup_vs_legacy"] = round(base / row[name]["median_ms"], 2) if row[name]["median_ms"] else None
+            results[str(size)] = row
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "orjson": getattr(json_provider.orjson, "__version__", None),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "page_sizes": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", default="50,200,1000", help="comma-separated orders per page")
+    parser.add_argument("--repeat", type=int, default=100, help="timed encodes per encoder and size")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    opts = parser.parse_args(argv)
+
+    report = run([int(s) for s in opts.page_sizes.split(",")], max(1, opts.repeat))
+    text = json.dumps(report, indent=2)
+    if opts.output:
+        Path(opts.output).write_text(text + "\n")
+        print(f"wrote {opts.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+End-to-end load benchmark with a realistic shop traffic mix.
+
+Boots create_app against a local seeded database (a throwaway SQLite file by
+default) and drives a weighted mix of checkouts, menu reads, order-history pages,
+X-report polls and restocks from N threads or processes. Prints (or writes) a
+JSON report with throughput and p50/p95/p99 per operation so runs can be compared
+across commits.
+
+Usage (from back-end/):
+    python -m scripts.bench_load --duration 30 --concurrency 8
+    python -m scripts.bench_load --mix checkout=60,menu=40 --mode processes --output bench.json
+    python -m scripts.bench_load --base-url http://localhost:5001 --i-know-this-writes
+
+The run creates tables, sets the cup/lid/straw stock to BENCH_STOCK and writes
+orders, so any target other than the default throwaway file (--database-url,
+--base-url) needs --i-know-this-writes.
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DEFAULT_MIX = "checkout=40,menu=30,history=15,xreport=10,restock=5"
+
+# Enough disposables that a long run never trips the stock check
+BENCH_STOCK = 10 ** 9
+
+WRITES_FLAG = "--i-know-this-writes"
+
+
+def refuse_unless_throwaway(database_url=None, base_url=None, allow_writes=False) -> None:
+    """Exit unless the target is the default throwaway SQLite file or writing to it was allowed."""
+    target = base_url or database_url
+    if target and not allow_writes:
+        raise SystemExit(
+            f"{target.split('@')[-1]} is not a throwaway database: the benchmark creates tables, sets "
+            f"cup/lid/straw stock to {BENCH_STOCK} and writes orders there. Re-run with {WRITES_FLAG} "
+            "if that's what you want."
+        )
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# --- database preparation -------------------------------------------------
+
+def prepare_database(app) -> dict:
+    """Create/seed tables if empty and make sure checkouts can't run out of stock."""
+    from app.db import db
+    from app.db.models import Product, InventoryItem
+    from app.db.seed import seed
+    from app.services.orders_service import DISPOSABLE_INVENTORY_ITEMS
+
+    with app.app_context():
+        db.create_all()
+        if Product.query.count() == 0:
+            seed()
+            db.session.commit()
+
+        disposables = []
+        for name in DISPOSABLE_INVENTORY_ITEMS:
+            row = InventoryItem.query.filter_by(item_name=name).first()
+            if row is None:
+                row = InventoryItem(item_name=name, current_stock=BENCH_STOCK, min_threshold=100, unit="count")
+                db.session.add(row)
+            else:
+                row.current_stock = BENCH_STOCK
+            disposables.append(row)
+        db.session.commit()
+
+        return {
+            "product_ids": [p.id for p in Product.query.all()],
+            "restock_ids": [r.id for r in disposables],
+        }
+
+
+# --- operations -----------------------------------------------------------
+
+def op_checkout(client, rng, ctx):
+    picks = rng.sample(ctx["product_ids"], k=min(len(ctx["product_ids"]), rng.choice([1, 1, 2, 3])))
+    items = [
+        {
+            "product_id": pid,
+            "quantity": rng.choice([1, 1, 1, 2]),
+            "size": rng.choice(["Small", "Medium", "Medium", "Large"]),
+            "customizations": rng.choice(["", "50% ice, boba", "Oat Milk, boba", "No Ice"]),
+        }
+        for pid in picks
+    ]
+    body = {"cashier_id": None, "items": items, "payment": {"method": rng.choice(["card", "cash"]), "amount": 50.0}}
+    return client.request("POST", "/api/orders/", json=body)
+
+
+def op_menu(client, rng, ctx):
+    return client.request("GET", "/api/products/menu?lang=en")
+
+
+def op_history(client, rng, ctx):
+    return client.request("GET", f"/api/orders/?page={rng.randint(1, 5)}&page_size=50")
+
+
+def op_xreport(client, rng, ctx):
+    return client.request("GET", "/api/reports/x-report")
+
+
+def op_restock(client, rng, ctx):
+    item_id = rng.choice(ctx["restock_ids"])
+    return client.request("POST", f"/api/inventory/{item_id}/restock", json={"amount": 10})
+
+
+OPERATIONS = {
+    "checkout": op_checkout,
+    "menu": op_menu,
+    "history": op_history,
+    "xreport": op_xreport,
+    "restock": op_restock,
+}
+
+
+# --- clients --------------------------------------------------------------
+
+class _TestClient:
+    """In-process Flask test client (no network/server overhead)."""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, json=None):
+        resp = self._client.open(path, method=method, json=json)
+        resp.close()
+        return resp.status_code
+
+
+class _HttpClient:
+    """Requests session against an already running server."""
+
+    def __init__(self, base_url):
+        import requests
+        self._session = requests.Session()
+        self._base = base_url.rstrip("/")
+
+    def request(self, method, path, json=None):
+        return self._session.request(method, self._base + path, json=json, timeout=30).status_code
+
+
+def _make_client(args):
+    if args["base_url"]:
+        return _HttpClient(args["base_url"])
+    from app import create_app
+    return _TestClient(create_app("dev"))
+
+
+# --- workers --------------------------------------------------------------
+
+def _run_worker(worker_id, args, ctx, start_at, stop_at, client=None):
+    """Run operations until stop_at; returns [(op, latency_ms, status), ...] recorded after start_at."""
+    client = client or _make_client(args)
+    rng = random.Random(args["seed"] * 1000 + worker_id)
+    names = list(args["mix"].keys())
+    weights = list(args["mix"].values())
+    samples = []
+    while True:
+        now = time.perf_counter()
+        if now >= stop_at:
+            break
+        op = rng.choices(names, weights)[0]
+        t0 = time.perf_counter()
+        try:
+            status = OPERATIONS[op](client, rng, ctx)
+        except Exception:
+            status = 0
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        if t0 >= start_at:
+            samples.append((op, elapsed_ms, status))
+    return samples
+
+
+def _process_worker(payload):
+    worker_id, args, ctx, warmup, duration = payload
+    # the app prints to stdout; keep it clear for the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        client = _make_client(args)
+        # perf_counter isn't shared across processes; each child times its own window after booting
+        start_at = time.perf_counter() + warmup
+        return _run_worker(worker_id, args, ctx, start_at, start_at + duration, client=client)
+
+
+# --- reporting ------------------------------------------------------------
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return round(sorted_values[idx], 3)
+
+
+def summarize(samples, duration):
+    by_op = {}
+    for op, ms, status in samples:
+        by_op.setdefault(op, []).append((ms, status))
+
+    def _stats(entries):
+        lat = sorted(ms for ms, _ in entries)
+        errors = sum(1 for _, status in entries if not (200 <= status < 400))
+        return {
+            "count": len(entries),
+            "errors": errors,
+            "throughput_rps": round(len(entries) / duration, 3) if duration else None,
+            "mean_ms": round(sum(lat) / len(lat), 3) if lat else None,
+            "p50_ms": _percentile(lat, 50),
+            "p95_ms": _percentile(lat, 95),
+            "p99_ms": _percentile(lat, 99),
+            "max_ms": round(lat[-1], 3) if lat else None,
+        }
+
+    return {
+        "overall": _stats([(ms, status) for _, ms, status in samples]),
+        "operations": {op: _stats(entries) for op, entries in sorted(by_op.items())},
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(duration=30.0, concurrency=8, mix=DEFAULT_MIX, mode="threads", warmup=2.0,
+                  database_url=None, base_url=None, seed=42, allow_writes=False):
+    """Run one benchmark and return the JSON-ready report (see refuse_unless_throwaway for targets)."""
+    refuse_unless_throwaway(database_url, base_url, allow_writes)
+    tmp_dir = None
+    if not base_url:
+        if not database_url:
+            tmp_dir = tempfile.mkdtemp(prefix="bench-")
+            database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        os.environ["DATABASE_URL"] = database_url
+
+    args = {"mix": parse_mix(mix) if isinstance(mix, str) else dict(mix), "base_url": base_url, "seed": seed}
+
+    app = None
+    if base_url:
+        ctx = _discover_remote_context(base_url)
+    else:
+        from app import create_app
+        app = create_app("dev")
+        ctx = prepare_database(app)
+
+    samples = []
+    if mode == "processes":
+        payloads = [(i, args, ctx, warmup, duration) for i in range(concurrency)]
+        with multiprocessing.get_context("spawn").Pool(concurrency) as pool:
+            for part in pool.map(_process_worker, payloads):
+                samples.extend(part)
+    else:
+        start_at = time.perf_counter() + warmup
+        stop_at = start_at + duration
+        lock = threading.Lock()
+
+        def _thread(i):
+            client = _TestClient(app) if app is not None else None
+            part = _run_worker(i, args, ctx, start_at, stop_at, client=client)
+            with lock:
+                samples.extend(part)
+
+        threads = [threading.Thread(target=_thread, args=(i,)) for i in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": base_url or database_url.split("@")[-1],
+            "mode": mode,
+            "concurrency": concurrency,
+            "duration_s": duration,
+            "warmup_s": warmup,
+            "mix": args["mix"],
+            "seed": seed,
+        },
+        **summarize(samples, duration),
+    }
+    return report
+
+
+def _discover_remote_context(base_url):
+    import requests
+    base = base_url.rstrip("/")
+    products = requests.get(f"{base}/api/products/all", timeout=30).json()
+    inventory = requests.get(f"{base}/api/inventory/", timeout=30).json()
+    from app.services.orders_service import DISPOSABLE_INVENTORY_ITEMS
+    wanted = {n.lower() for n in DISPOSABLE_INVENTORY_ITEMS}
+    return {
+        "product_ids": [p["id"] for p in products],
+        "restock_ids": [i["id"] for i in inventory if i["item_name"].lower() in wanted],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds (default 30)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before timing starts")
+    parser.add_argument("--concurrency", type=int, default=8, help="number of concurrent workers")
+    parser.add_argument("--mode", choices=["threads", "processes"], default="threads")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted operations (default {DEFAULT_MIX})")
+    parser.add_argument("--database-url", help="database to boot against (default: throwaway SQLite file)")
+    parser.add_argument("--base-url", help="drive a running server over HTTP instead of booting the app")
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed for the traffic mix")
+    parser.add_argument(WRITES_FLAG, dest="allow_writes", action="store_true",
+                        help="allow --database-url/--base-url: the run writes orders and resets stock there")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    opts = parser.parse_args(argv)
+    refuse_unless_throwaway(opts.database_url, opts.base_url, opts.allow_writes)
+
+    # the app prints to stdout; keep it clear for the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run_benchmark(
+            duration=opts.duration, concurrency=opts.concurrency, mix=opts.mix, mode=opts.mode,
+            warmup=opts.warmup, database_url=opts.database_url, base_url=opts.base_url, seed=opts.seed,
+            allow_writes=opts.allow_writes,
+        )
+    text = json.dumps(report, indent=2)
+    if opts.output:
+        Path(opts.output).write_text(text + "\n")
+        print(f"wrote {opts.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
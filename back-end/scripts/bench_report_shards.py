@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Year-long report latency at REPORT_PARALLELISM = 1..N on SQLite.
+
+Generates a throwaway year of history (scripts/generate_history.py) unless
+--database-url points at an existing SQLite file, then times summary, weekly-items
+and daily-top over the whole window through the routes, once per parallelism level
+(the process pool is warmed up first). Prints a JSON report with median latency per
+report and level, plus the speedup over level 1.
+
+Usage (from back-end/):
+    python -m scripts.bench_report_shards
+    python -m scripts.bench_report_shards --levels 1,2,4,8 --repeat 5 --days 730
+    python -m scripts.bench_report_shards --database-url sqlite:////tmp/history.db
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+REPORTS = {
+    "summary": "/api/reports/summary?from={start}&to={end}",
+    "weekly_items": "/api/reports/weekly-items?from={start}&to={end}",
+    "daily_top": "/api/reports/daily-top?from={start}&to={end}",
+}
+
+
+def _default_levels() -> str:
+    cores = os.cpu_count() or 1
+    levels, n = [], 1
+    while n < cores:
+        levels.append(n)
+        n *= 2
+    return ",".join(str(x) for x in levels + [cores])
+
+
+def run(database_url: str, levels, repeat: int, start: date, end: date) -> dict:
+    os.environ["DATABASE_URL"] = database_url
+    from app import create_app
+
+    with contextlib.redirect_stdout(sys.stderr):
+        app = create_app("dev")
+    client = app.test_client()
+    paths = {name: path.format(start=start, end=end) for name, path in REPORTS.items()}
+
+    results = {}
+    for level in levels:
+        app.config["REPORT_PARALLELISM"] = level
+        for path in paths.values():  # warm up: pool start, page cache
+            assert client.get(path).status_code == 200
+        timings = {}
+        for name, path in paths.items():
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                resp = client.get(path)
+                samples.append((time.perf_counter() - started) * 1000.0)
+                assert resp.status_code == 200, resp.get_data(as_text=True)
+            timings[name] = round(statistics.median(samples), 1)
+        results[level] = timings
+
+    base = results[levels[0]]
+    return {
+        "cpu_count": os.cpu_count(),
+        "window": {"from": start.isoformat(), "to": end.isoformat()},
+        "repeat": repeat,
+        "median_ms": {str(level): t for level, t in results.items()},
+        "speedup": {
+            str(level): {name: round(base[name] / t[name], 2) for name in t if t[name]}
+            for level, t in results.items()
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="existing SQLite database (default: generate a throwaway one)")
+    parser.add_argument("--levels", default=_default_levels(), help="REPORT_PARALLELISM values (default 1,2,4..cores)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed requests per report and level")
+    parser.add_argument("--days", type=int, default=365, help="history length and report window (default 365)")
+    parser.add_argument("--orders-per-day", type=float, default=400.0)
+    args = parser.parse_args(argv)
+
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=args.days - 1)
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url
+        if not database_url:
+            from scripts import generate_history
+
+            database_url = f"sqlite:///{Path(tmp) / 'history.db'}"
+            with contextlib.redirect_stdout(sys.stderr):
+                generate_history.main([
+                    "--database-url", database_url, "--days", str(args.days),
+                    "--end", end.isoformat(), "--orders-per-day", str(args.orders_per_day),
+                ])
+        report = run(database_url, levels, args.repeat, start, end)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: time `import app` and create_app() in fresh interpreters.
+
+Each run is a new Python process (nothing cached in sys.modules), against a
+throwaway SQLite file by default, so the first run pays schema creation and the
+rest hit the schema-version stamp. Prints a JSON report with min/median/max per
+phase and the per-blueprint import breakdown from /api/meta/startup.
+
+Usage (from back-end/):
+    python -m scripts.bench_startup --runs 10
+    python -X importtime -c "from app import create_app; create_app()" 2> import.log   # deeper dive
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Loaded by the first request that needs them; none should be imported at boot
+DEFERRED_MODULES = (
+    "requests", "numpy", "multiprocessing",
+    "app.services.translate_service", "app.services.snapshot_service", "app.services.federation_service",
+    "app.services.shard_service", "app.services.archive_service",
+)
+
+_CHILD = r"""
+import json, os, sys, time, contextlib
+DEFERRED = %r
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+with contextlib.redirect_stdout(sys.stderr):
+    flask_app = app.create_app("dev")
+t2 = time.perf_counter()
+report = flask_app.extensions["startup"]
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000.0,
+    "create_app_ms": (t2 - t1) * 1000.0,
+    "schema": report.get("schema", {}).get("status"),
+    "phases_ms": report["phases_ms"],
+    "blueprints_ms": report["blueprints_ms"],
+    "requests_imported": "requests" in sys.modules,
+    "deferred_imported": sorted(m for m in DEFERRED if m in sys.modules),
+}))
+"""
+
+
+def _spread(values):
+    return {
+        "min": round(min(values), 3),
+        "median": round(statistics.median(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def run(runs: int, database_url: str):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD % (DEFERRED_MODULES,)], cwd=BACKEND_DIR, env=env,
+            check=True, capture_output=True, text=True,
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+
+    warm = samples[1:] or samples  # the first run may have created the schema
+    blueprints = {name: _spread([s["blueprints_ms"][name] for s in warm]) for name in warm[0]["blueprints_ms"]}
+    phases = {name: _spread([s["phases_ms"][name] for s in warm]) for name in warm[0]["phases_ms"]}
+    return {
+        "runs": runs,
+        "target": database_url.split("@")[-1],
+        "first_run": {
+            "import_ms": round(samples[0]["import_ms"], 3),
+            "create_app_ms": round(samples[0]["create_app_ms"], 3),
+            "schema": samples[0]["schema"],
+        },
+        "import_ms": _spread([s["import_ms"] for s in warm]),
+        "create_app_ms": _spread([s["create_app_ms"] for s in warm]),
+        "total_ms": _spread([s["import_ms"] + s["create_app_ms"] for s in warm]),
+        "phases_ms": phases,
+        "blueprints_ms": blueprints,
+        "requests_imported": any(s["requests_imported"] for s in samples),
+        "deferred_imported": sorted({m for s in samples for m in s["deferred_imported"]}),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters to start (default 10)")
+    parser.add_argument("--database-url", help="database to boot against (default: throwaway SQLite file)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    opts = parser.parse_args(argv)
+
+    database_url = opts.database_url
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-startup-'), 'startup.db')}"
+
+    text = json.dumps(run(max(1, opts.runs), database_url), indent=2)
+    if opts.output:
+        Path(opts.output).write_text(text + "\n")
+        print(f"wrote {opts.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Nightly columnar export of the sales fact for ?source=snapshot reports.
+
+Writes a new version of order lines and orders placed before now into SNAPSHOT_DIR
+(see app/services/snapshot_service.py), switches CURRENT to it, and keeps the last
+SNAPSHOT_KEEP versions. Running web workers pick the new version up on their next
+snapshot request. Needs numpy.
+
+Usage (from back-end/):
+    python -m scripts.export_snapshot
+    python -m scripts.export_snapshot --as-of 2025-12-01     # everything before that date
+    # crontab: 15 3 * * *  cd /srv/pos/back-end && python -m scripts.export_snapshot
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import create_app  # noqa: E402
+from app.services import snapshot_service  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--as-of", help="export orders before this UTC date/time (default: now)")
+    parser.add_argument("--keep", type=int, default=None, help="versions to keep (default SNAPSHOT_KEEP)")
+    args = parser.parse_args(argv)
+
+    app = create_app("dev")
+    with app.app_context():
+        as_of = datetime.fromisoformat(args.as_of) if args.as_of else None
+        meta = snapshot_service.export(as_of=as_of, keep=args.keep)
+        folder = snapshot_service.snapshot_dir() / meta["version"]
+    print(f"✓ Snapshot {meta['version']}: {meta['lines']:,} lines, {meta['orders']:,} orders "
+          f"in {meta['export_seconds']:.2f}s -> {folder}")
+    print(json.dumps(meta, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+High-volume synthetic order history for benchmarking reports and pagination.
+
+Generates months to years of orders with hourly/weekly seasonality, product
+popularity skew, drink sizes, refunds and multiple cashiers, and bulk-loads them
+(executemany on SQLite, COPY on PostgreSQL) in parallel day-range chunks. The same
+--seed always produces the same history.
+
+Usage (from back-end/):
+    python -m scripts.generate_history --days 365 --orders-per-day 400
+    python -m scripts.generate_history --database-url postgresql://user:pw@localhost/pos_bench --days 730 --workers 8
+"""
+import argparse
+import csv
+import io
+import multiprocessing
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, event, func, select, text  # noqa: E402
+
+from app.db import db  # noqa: E402
+from app.db.models import Cashier, Order, Product  # noqa: E402
+from app.services.orders_service import SIZE_PRICE_DELTAS  # noqa: E402
+
+TAX_RATE = 0.0825
+
+# Share of a day's orders per hour (shop opens 9:00, closes 22:00; lunch + after-school peaks)
+HOURLY_WEIGHTS = {
+    9: 3, 10: 4, 11: 7, 12: 11, 13: 10, 14: 8, 15: 9,
+    16: 11, 17: 10, 18: 8, 19: 7, 20: 6, 21: 4,
+}
+# Monday..Sunday
+WEEKDAY_FACTORS = [0.85, 0.85, 0.9, 0.95, 1.1, 1.3, 1.2]
+
+SIZE_WEIGHTS = {"Small": 0.2, "Medium": 0.55, "Large": 0.25}
+PAYMENT_WEIGHTS = {"card": 0.7, "cash": 0.25, "other": 0.05}
+ICE = ["", "", "No Ice", "25% ice", "50% ice", "75% ice", "Extra Ice"]
+BASES = ["", "", "Whole Milk", "Oat Milk", "Almond Milk", "Soy Milk"]
+TOPPINGS = ["Boba", "Lychee Jelly", "Egg Pudding", "Grass Jelly"]
+
+# Used when the target database has (almost) no menu yet
+DEFAULT_CATALOG = [
+    ("Brown Sugar Milk Tea", 5.50, "Milk Tea", True),
+    ("Classic Milk Tea", 4.75, "Milk Tea", True),
+    ("Taro Milk Tea", 5.25, "Milk Tea", True),
+    ("Thai Milk Tea", 5.25, "Milk Tea", False),
+    ("Matcha Milk Tea", 5.50, "Milk Tea", False),
+    ("Honeydew Milk Tea", 5.25, "Milk Tea", False),
+    ("Oolong Milk Tea", 4.95, "Milk Tea", False),
+    ("Strawberry Fruit Tea", 5.25, "Fruit Tea", True),
+    ("Mango Green Tea", 5.25, "Fruit Tea", True),
+    ("Passion Fruit Tea", 5.00, "Fruit Tea", False),
+    ("Peach Oolong Tea", 5.00, "Fruit Tea", False),
+    ("Lychee Black Tea", 5.00, "Fruit Tea", False),
+    ("Jasmine Green Tea", 4.25, "Brewed Tea", False),
+    ("Classic Black Tea", 4.25, "Brewed Tea", False),
+    ("Mango Smoothie", 5.95, "Smoothie", True),
+    ("Strawberry Smoothie", 5.95, "Smoothie", False),
+    ("Taro Smoothie", 5.95, "Smoothie", False),
+    ("Coffee Milk Tea", 5.25, "Specialty", False),
+    ("Tiger Sugar Latte", 6.25, "Specialty", True),
+    ("Cheese Foam Green Tea", 5.95, "Specialty", False),
+    ("Egg Puff Waffle", 6.50, "Snacks", False),
+    ("Popcorn Chicken", 6.95, "Snacks", True),
+    ("Mochi Trio", 4.50, "Dessert", False),
+]
+DEFAULT_CASHIERS = ["Benjamin", "Leenser", "Ava", "Mateo", "Priya", "Noah", "Sofia", "Kenji"]
+
+ORDER_COLUMNS = ["id", "customerid", "cashierid", "subtotal", "tax", "total", "ordertime", "status"]
+ITEM_COLUMNS = ["orderid", "productid", "quantity", "customizations", "unitprice", "lineprice"]
+PAYMENT_COLUMNS = ["orderid", "paymenttime", "amountpaid", "paymentmethod", "tipamount"]
+SQLITE_DATETIME = "%Y-%m-%d %H:%M:%S.%f"
+
+
+# --- planning (parent process) --------------------------------------------
+
+def plan_daily_counts(start: date, days: int, orders_per_day: float, seed: int):
+    """Deterministic per-day order counts with weekday seasonality, slow growth and noise."""
+    rng = random.Random(seed)
+    counts = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        trend = 1.0 + 0.15 * (i / max(days, 1))
+        noise = rng.lognormvariate(0.0, 0.12)
+        counts.append(max(0, int(round(orders_per_day * WEEKDAY_FACTORS[day.weekday()] * trend * noise))))
+    return counts
+
+
+def ensure_reference_data(engine, cashiers: int):
+    """Top up the catalog/cashiers so popularity skew and multi-cashier history are meaningful."""
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(Product.__table__)).scalar() < 10:
+            conn.execute(Product.__table__.insert(), [
+                {"name": n, "baseprice": p, "category": c, "ispopular": pop, "description": ""}
+                for n, p, c, pop in DEFAULT_CATALOG
+            ])
+        have = conn.execute(select(func.count()).select_from(Cashier.__table__)).scalar()
+        if have < cashiers:
+            conn.execute(Cashier.__table__.insert(), [
+                {"name": DEFAULT_CASHIERS[i % len(DEFAULT_CASHIERS)], "employeecode": f"GEN{i + 1:03d}",
+                 "role": "cashier", "isactive": True, "hiredate": date(2023, 1, 1)}
+                for i in range(have, cashiers)
+            ])
+
+        products = conn.execute(select(
+            Product.__table__.c.id, Product.__table__.c.baseprice,
+            Product.__table__.c.category, Product.__table__.c.ispopular,
+        ).order_by(Product.__table__.c.id)).all()
+        cashier_ids = [r[0] for r in conn.execute(select(Cashier.__table__.c.id)).all()]
+        next_id = (conn.execute(select(func.max(Order.__table__.c.id))).scalar() or 0) + 1
+
+    catalog = [(int(pid), float(price), category or "", bool(popular)) for pid, price, category, popular in products]
+    return catalog, cashier_ids[:cashiers] if cashiers else cashier_ids, next_id
+
+
+def popularity_weights(catalog, seed: int):
+    """Zipf-like skew over a seeded shuffle of the menu, boosted for 'popular' items."""
+    rng = random.Random(seed + 7)
+    order = list(range(len(catalog)))
+    rng.shuffle(order)
+    weights = [0.0] * len(catalog)
+    for rank, idx in enumerate(order, start=1):
+        weights[idx] = (1.0 / rank ** 1.1) * (2.0 if catalog[idx][3] else 1.0)
+    return weights
+
+
+# --- generation (worker processes) ----------------------------------------
+
+def _customization(rng, size, is_drink):
+    if not is_drink:
+        return ""
+    parts = [p for p in (rng.choice(ICE), rng.choice(BASES)) if p]
+    if rng.random() < 0.55:
+        parts.append(rng.choice(TOPPINGS))
+    text_part = ", ".join(parts)
+    return f"Size: {size}" + (f"; {text_part}" if text_part else "")
+
+
+def generate_chunk(task):
+    """Build the rows for a contiguous range of days; ids start at task['first_id']."""
+    rng = random.Random(task["seed"] * 100_003 + task["chunk"])
+    catalog, weights, cashier_ids = task["catalog"], task["weights"], task["cashier_ids"]
+    refund_rate = task["refund_rate"]
+    hours = list(HOURLY_WEIGHTS.keys())
+    hour_weights = list(HOURLY_WEIGHTS.values())
+    sizes = list(SIZE_WEIGHTS.keys())
+    size_weights = list(SIZE_WEIGHTS.values())
+    methods = list(PAYMENT_WEIGHTS.keys())
+    method_weights = list(PAYMENT_WEIGHTS.values())
+    product_idx = range(len(catalog))
+
+    orders, items, payments = [], [], []
+    order_id = task["first_id"]
+    for day_offset, count in zip(range(task["days"]), task["counts"]):
+        day = datetime.combine(task["start"] + timedelta(days=day_offset), datetime.min.time())
+        stamps = sorted(
+            day + timedelta(hours=h, seconds=rng.randrange(3600))
+            for h in rng.choices(hours, hour_weights, k=count)
+        )
+        for ts in stamps:
+            n_lines = min(len(catalog), rng.choices((1, 2, 3, 4), (0.55, 0.3, 0.1, 0.05))[0])
+            picks = set()
+            while len(picks) < n_lines:
+                picks.add(rng.choices(product_idx, weights)[0])
+
+            subtotal = 0.0
+            for idx in picks:
+                pid, price, category, _ = catalog[idx]
+                is_drink = not any(tok in category.lower() for tok in ("snack", "food", "dessert"))
+                size = rng.choices(sizes, size_weights)[0] if is_drink else None
+                qty = rng.choices((1, 2, 3), (0.82, 0.15, 0.03))[0]
+                unit = round(price + (SIZE_PRICE_DELTAS[size] if size else 0.0), 2)
+                line = round(unit * qty, 2)
+                subtotal += line
+                items.append((order_id, pid, qty, _customization(rng, size, is_drink), unit, line))
+
+            subtotal = round(subtotal, 2)
+            tax = round(subtotal * TAX_RATE, 2)
+            total = round(subtotal + tax, 2)
+            method = rng.choices(methods, method_weights)[0]
+            tip = round(rng.choice((0.0, 0.0, 0.5, 1.0, 2.0)), 2) if method == "card" else 0.0
+            refunded = rng.random() < refund_rate
+
+            orders.append((order_id, None, rng.choice(cashier_ids) if cashier_ids else None,
+                           subtotal, tax, total, ts, "Refunded" if refunded else "Complete"))
+            payments.append((order_id, ts + timedelta(seconds=rng.randint(5, 90)), total, method, tip))
+            if refunded:
+                payments.append((order_id, ts + timedelta(minutes=rng.randint(3, 45)), -total, method, 0.0))
+            order_id += 1
+    return orders, items, payments
+
+
+def _copy_rows(raw_conn, table, columns, rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(["" if v is None else (v.isoformat(sep=" ") if isinstance(v, datetime) else v) for v in row])
+    buf.seek(0)
+    with raw_conn.cursor() as cur:
+        cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '')", buf)
+
+
+def _executemany(conn, table, columns, rows):
+    # store datetimes the way SQLAlchemy's SQLite DateTime type does
+    rows = [tuple(v.strftime(SQLITE_DATETIME) if isinstance(v, datetime) else v for v in row) for row in rows]
+    conn.exec_driver_sql(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows
+    )
+
+
+def load_chunk(task):
+    """Generate and insert one chunk in its own connection/transaction; returns row counts."""
+    started = time.perf_counter()
+    orders, items, payments = generate_chunk(task)
+    generated = time.perf_counter()
+
+    engine = _make_engine(task["database_url"])
+    try:
+        if engine.dialect.name == "postgresql":
+            raw = engine.raw_connection()
+            try:
+                _copy_rows(raw, "orders", ORDER_COLUMNS, orders)
+                _copy_rows(raw, "orderitem", ITEM_COLUMNS, items)
+                _copy_rows(raw, "payment", PAYMENT_COLUMNS, payments)
+                raw.commit()
+            finally:
+                raw.close()
+        else:
+            with engine.begin() as conn:
+                _executemany(conn, "orders", ORDER_COLUMNS, orders)
+                _executemany(conn, "orderitem", ITEM_COLUMNS, items)
+                _executemany(conn, "payment", PAYMENT_COLUMNS, payments)
+    finally:
+        engine.dispose()
+
+    return {
+        "chunk": task["chunk"],
+        "orders": len(orders),
+        "items": len(items),
+        "payments": len(payments),
+        "generate_s": round(generated - started, 3),
+        "insert_s": round(time.perf_counter() - generated, 3),
+    }
+
+
+def _make_engine(url):
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"timeout": 300})
+
+        @event.listens_for(engine, "connect")
+        def _bulk_pragmas(dbapi_conn, _record):
+            cur = dbapi_conn.cursor()
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=OFF")
+            cur.close()
+
+        return engine
+    return create_engine(url)
+
+
+def _default_database_url():
+    from app.config import get_config
+    url = get_config("dev")["SQLALCHEMY_DATABASE_URI"]
+    if url == "sqlite:///pos_dev.db":
+        # Flask-SQLAlchemy resolves relative SQLite paths against instance/
+        url = f"sqlite:///{Path(__file__).resolve().parent.parent / 'instance' / 'pos_dev.db'}"
+    return url
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="target database (default: the dev config / DATABASE_URL)")
+    parser.add_argument("--days", type=int, default=365, help="days of history to generate (default 365)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="last day (YYYY-MM-DD, default yesterday)")
+    parser.add_argument("--orders-per-day", type=float, default=400.0, help="average orders per day (default 400)")
+    parser.add_argument("--refund-rate", type=float, default=0.02, help="fraction of orders refunded (default 0.02)")
+    parser.add_argument("--cashiers", type=int, default=8, help="cashiers to spread orders across (default 8)")
+    parser.add_argument("--chunk-days", type=int, default=14, help="days per parallel chunk (default 14)")
+    parser.add_argument("--workers", type=int, default=max(1, min(8, os.cpu_count() or 1)))
+    parser.add_argument("--seed", type=int, default=1, help="RNG seed; same seed -> same history")
+    opts = parser.parse_args(argv)
+
+    url = opts.database_url or _default_database_url()
+    end = opts.end or (datetime.utcnow().date() - timedelta(days=1))
+    start = end - timedelta(days=opts.days - 1)
+
+    engine = _make_engine(url)
+    if engine.dialect.name == "sqlite":
+        # PostgreSQL schemas come from migrations/, as in app/db/schema.py
+        db.metadata.create_all(engine)
+    catalog, cashier_ids, next_id = ensure_reference_data(engine, opts.cashiers)
+    weights = popularity_weights(catalog, opts.seed)
+    counts = plan_daily_counts(start, opts.days, opts.orders_per_day, opts.seed)
+
+    # Contiguous id ranges per chunk keep ids in time order without coordination
+    tasks = []
+    first_id = next_id
+    for chunk, offset in enumerate(range(0, opts.days, opts.chunk_days)):
+        chunk_counts = counts[offset:offset + opts.chunk_days]
+        tasks.append({
+            "chunk": chunk, "seed": opts.seed, "database_url": url,
+            "start": start + timedelta(days=offset), "days": len(chunk_counts), "counts": chunk_counts,
+            "first_id": first_id, "catalog": catalog, "weights": weights,
+            "cashier_ids": cashier_ids, "refund_rate": opts.refund_rate,
+        })
+        first_id += sum(chunk_counts)
+
+    print(f"Generating {sum(counts):,} orders from {start} to {end} into {url.split('@')[-1]} "
+          f"({len(tasks)} chunks, {opts.workers} workers)")
+    started = time.perf_counter()
+    totals = {"orders": 0, "items": 0, "payments": 0}
+    with multiprocessing.get_context("spawn").Pool(opts.workers) as pool:
+        for res in pool.imap_unordered(load_chunk, tasks):
+            for k in totals:
+                totals[k] += res[k]
+            print(f"  chunk {res['chunk']:>3}: {res['orders']:>8,} orders "
+                  f"(gen {res['generate_s']}s, insert {res['insert_s']}s)")
+    elapsed = time.perf_counter() - started
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('orders', 'id'), (SELECT MAX(id) FROM orders))"))
+        # running counters are reseeded from the tables on next read
+        conn.execute(text("DELETE FROM running_counter"))
+    engine.dispose()
+
+    rows = sum(totals.values())
+    print(f"Inserted {totals['orders']:,} orders, {totals['items']:,} items, {totals['payments']:,} payments "
+          f"in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
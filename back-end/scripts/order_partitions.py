@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Monthly partitions and archival for orders / payment (migrations/004).
+
+    create    add the next --months-ahead monthly partitions (PostgreSQL; run monthly from cron)
+    archive   move closed months older than --keep-months into gzip JSON-lines files under
+              ORDER_ARCHIVE_DIR and drop their rows / partitions (see app/services/archive_service.py)
+    list      show archived months and, on PostgreSQL, the current partitions
+
+On SQLite there are no partitions (orders and payment are indexed on their timestamps
+instead); `archive` works the same way and `create` is a no-op.
+
+Usage (from back-end/):
+    python -m scripts.order_partitions create --months-ahead 3
+    python -m scripts.order_partitions archive --keep-months 13 --dry-run
+    python -m scripts.order_partitions list
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.db import db  # noqa: E402
+from app.services import archive_service  # noqa: E402
+
+
+def _add_months(month_start: datetime, n: int) -> datetime:
+    index = month_start.year * 12 + month_start.month - 1 + n
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def create(months_ahead: int) -> None:
+    if db.engine.dialect.name != "postgresql":
+        print("✓ Not PostgreSQL: nothing to create (SQLite uses ordertime/paymenttime indexes)")
+        return
+    this_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for n in range(months_ahead + 1):
+        month = _add_months(this_month, n).date()
+        for parent in ("orders", "payment"):
+            name = db.session.execute(
+                text("SELECT create_month_partition(CAST(:p AS regclass), :m)"), {"p": parent, "m": month}
+            ).scalar()
+            print(f"✓ {name}")
+    db.session.commit()
+
+
+def archive(keep_months: int, dry_run: bool) -> None:
+    this_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    cutoff = _add_months(this_month, -(max(keep_months, 1) - 1))
+    # Months an interrupted run left pending are finished first
+    months = sorted(set(archive_service.closed_months_before(cutoff)) | set(archive_service.pending_months()))
+    if not months:
+        print(f"✓ Nothing to archive before {cutoff:%Y-%m}")
+        return
+    for month in months:
+        result = archive_service.archive_month(month, dry_run=dry_run)
+        print(f"✓ {json.dumps(result)}")
+
+
+def list_months() -> None:
+    print(json.dumps(archive_service.manifest(), indent=2))
+    if db.engine.dialect.name == "postgresql":
+        rows = db.session.execute(text(
+            "SELECT inhparent::regclass::text, inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent IN ('orders'::regclass, 'payment'::regclass) ORDER BY 1, 2"
+        ))
+        for parent, child in rows:
+            print(f"{parent}: {child}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_create = sub.add_parser("create", help="create upcoming monthly partitions")
+    p_create.add_argument("--months-ahead", type=int, default=3)
+    p_archive = sub.add_parser("archive", help="archive closed months")
+    p_archive.add_argument("--keep-months", type=int, default=None,
+                           help="months kept in the database, counting the current one (default ARCHIVE_KEEP_MONTHS)")
+    p_archive.add_argument("--dry-run", action="store_true", help="only report what would be archived")
+    sub.add_parser("list", help="show archived months and partitions")
+    args = parser.parse_args(argv)
+
+    app = create_app("dev")
+    with app.app_context():
+        if args.command == "create":
+            create(args.months_ahead)
+        elif args.command == "archive":
+            keep = args.keep_months if args.keep_months is not None else app.config["ARCHIVE_KEEP_MONTHS"]
+            archive(keep, args.dry_run)
+        else:
+            list_months()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Recompute the running counters behind /api/meta/stats from the order tables.
+Safe to run from cron; prints any drift it corrected.
+
+Usage (from back-end/): python -m scripts.reconcile_counters [YYYY-MM-DD ...]
+"""
+import sys
+from datetime import date
+
+from app import create_app
+from app.services import counters_service
+
+app = create_app('dev')
+with app.app_context():
+    names = None
+    if len(sys.argv) > 1:
+        days = [date.fromisoformat(arg) for arg in sys.argv[1:]]
+        names = list(counters_service.GLOBAL_COUNTERS) + [
+            counters_service.daily_name(kind, d) for d in days for kind in counters_service.DAILY_COUNTERS
+        ]
+    for name, entry in counters_service.reconcile(names).items():
+        marker = "" if entry["before"] == entry["after"] else "  (corrected)"
+        print(f"{name}: {entry['before']} -> {entry['after']}{marker}")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Poor man's read replica for local testing of DATABASE_REPLICA_URLS with SQLite.
+
+Copies the primary SQLite file into the replica file with the online backup API
+every --interval seconds, so the replica lags the primary by up to that long
+(like a real streaming replica under load). Stop with Ctrl-C.
+
+Usage (from back-end/):
+    python -m scripts.sqlite_replica --primary instance/pos_dev.db --replica /tmp/pos_replica.db --interval 2
+    DATABASE_URL=sqlite:///$PWD/instance/pos_dev.db \
+    DATABASE_REPLICA_URLS=sqlite:////tmp/pos_replica.db python app.py
+
+Responses served from a replica carry X-DB-Route: replica_0; right after a write
+the same client is served by the primary for READ_REPLICA_PIN_SECONDS.
+"""
+import argparse
+import sqlite3
+import time
+
+
+def copy_once(primary: str, replica: str) -> float:
+    started = time.perf_counter()
+    src = sqlite3.connect(primary)
+    dst = sqlite3.connect(replica)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--primary", required=True, help="path of the primary SQLite file")
+    parser.add_argument("--replica", required=True, help="path of the replica SQLite file (overwritten)")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between copies (replication lag)")
+    parser.add_argument("--once", action="store_true", help="copy once and exit")
+    args = parser.parse_args(argv)
+
+    while True:
+        elapsed = copy_once(args.primary, args.replica)
+        print(f"✓ Replicated {args.primary} -> {args.replica} in {elapsed * 1000:.0f} ms")
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Checkout latency under an injected network delay.
+
+Every statement and commit sleeps NETWORK_DELAY_S before it runs, like a remote
+database would, so checkout latency is dominated by round trips. The number of
+round trips per checkout must be small and must not grow with the number of items.
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+NETWORK_DELAY_S = 0.005
+MAX_ROUND_TRIPS = 8
+
+
+@pytest.fixture
+def delayed_app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'checkout.db'}")
+    monkeypatch.setenv("GROUP_COMMIT_ENABLED", "0")
+    monkeypatch.setenv("SERVER_TIMING_SAMPLE_RATE", "0")
+    monkeypatch.setenv("MODIFIER_INDEX_SECONDS", "0")  # no background statements during the count
+    from sqlalchemy import event
+    from app import create_app
+    from app.db import db
+    from app.db.models import Product
+    from app.db.seed import seed
+
+    app = create_app("dev")  # creates the SQLite schema
+    with app.app_context():
+        # the seed has two products (and 500 cups, lids, straws); an order has one line per product
+        seed()
+        db.session.add_all(
+            Product(name=f"Test Tea {n}", base_price=5.0, category="Milk Tea", is_popular=False)
+            for n in range(10)
+        )
+        db.session.commit()
+        ctx = {"product_ids": [p.id for p in Product.query.order_by(Product.id)]}
+        engine = db.engine
+
+    trips = []
+
+    def _delay(*_args, **_kwargs):
+        trips.append(1)
+        time.sleep(NETWORK_DELAY_S)
+
+    event.listen(engine, "before_cursor_execute", _delay)
+    event.listen(engine, "commit", _delay)
+    yield app, ctx, trips
+    event.remove(engine, "before_cursor_execute", _delay)
+    event.remove(engine, "commit", _delay)
+
+
+def _checkout(client, product_ids, trips):
+    body = {
+        "cashier_id": None,
+        "items": [{"product_id": pid, "quantity": 1, "size": "Medium"} for pid in product_ids],
+        "payment": {"method": "card", "amount": 100.0},
+    }
+    trips.clear()
+    started = time.perf_counter()
+    resp = client.post("/api/orders/", json=body)
+    elapsed = time.perf_counter() - started
+    assert resp.status_code == 201, resp.get_data(as_text=True)
+    return len(trips), elapsed
+
+
+def test_checkout_round_trips_are_fixed(delayed_app):
+    app, ctx, trips = delayed_app
+    client = app.test_client()
+    products = ctx["product_ids"]
+    _checkout(client, products[:1], trips)  # warm up (first-use queries, metadata)
+
+    one_trips, one_elapsed = _checkout(client, products[:1], trips)
+    many_trips, many_elapsed = _checkout(client, products[:10], trips)
+
+    assert one_trips <= MAX_ROUND_TRIPS, f"{one_trips} round trips for a one-item checkout"
+    assert many_trips == one_trips, f"{many_trips} round trips for 10 items vs {one_trips} for one"
+    # latency is round trips x delay plus local work, not a function of the item count
+    assert many_elapsed < one_elapsed + 3 * NETWORK_DELAY_S + 0.05, (
+        f"10 items took {many_elapsed * 1000:.1f} ms vs {one_elapsed * 1000:.1f} ms for one"
+    )
+    assert one_elapsed < (MAX_ROUND_TRIPS + 2) * NETWORK_DELAY_S + 0.1, (
+        f"one-item checkout took {one_elapsed * 1000:.1f} ms at {NETWORK_DELAY_S * 1000:.0f} ms per trip"
+    )
+
+
+def test_postgres_checkout_is_one_statement(delayed_app):
+    # Compiled for PostgreSQL without a server: order, items and payment in one WITH statement
+    from datetime import datetime
+    from sqlalchemy.dialects import postgresql
+    from app.services import orders_service
+
+    app, ctx, _trips = delayed_app
+    with app.app_context():
+        plan = orders_service.prepare_order({
+            "cashier_id": None,
+            "items": [{"product_id": pid, "quantity": 2} for pid in ctx["product_ids"][:3]],
+            "payment": {"method": "cash", "amount": 50.0},
+        })
+    compiled = orders_service.order_insert_cte(plan, datetime.utcnow()).compile(dialect=postgresql.psycopg2.dialect())
+    sql = str(compiled)
+
+    assert sql.lstrip().startswith("WITH new_order AS")
+    assert sql.count("INSERT INTO") == 3 and "RETURNING orders.id" in sql
+    assert len(compiled.params) == 6 + 3 * 5 + 4  # order, three item rows, payment
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v", "-s"]))
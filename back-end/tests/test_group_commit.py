@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Group commit: one rejected order in a batch must not store or duplicate the others.
+
+A cart with the same product twice (Small and Large) breaks the orderitem
+(orderid, productid) primary key, so the batch's single commit fails and the writer
+retries order by order. Only the valid order may be stored, exactly once.
+"""
+import sys
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'group_commit.db'}")
+    monkeypatch.setenv("GROUP_COMMIT_ENABLED", "0")
+    monkeypatch.setenv("MODIFIER_INDEX_SECONDS", "0")
+    from app import create_app
+    from app.db import db
+    from app.db.seed import seed
+
+    app = create_app("dev")  # creates the SQLite schema
+    with app.app_context():
+        seed()  # two products, one order, plus cups, lids and straws (left uncommitted)
+        db.session.commit()
+    return app
+
+
+def test_failed_batch_retries_without_leftovers(app):
+    from app.db import db
+    from app.db.models import Order, Product
+    from app.services import orders_service
+    from app.services.group_commit_service import GroupCommitWriter
+
+    with app.app_context():
+        first, second = [p.id for p in Product.query.order_by(Product.id).limit(2)]
+        seeded = set(db.session.execute(db.select(Order.id)).scalars())
+        valid = orders_service.prepare_order({
+            "cashier_id": None,
+            "items": [{"product_id": first, "quantity": 1, "size": "Medium"}],
+            "payment": {"method": "card", "amount": 20.0},
+        })
+        duplicate_line = orders_service.prepare_order({
+            "cashier_id": None,
+            "items": [{"product_id": second, "quantity": 1, "size": "Small"},
+                      {"product_id": second, "quantity": 1, "size": "Large"}],
+            "payment": {"method": "card", "amount": 20.0},
+        })
+        batch = [(valid, Future()), (duplicate_line, Future())]
+        for _plan, future in batch:
+            future.set_running_or_notify_cancel()
+
+        writer = GroupCommitWriter(app, max_batch=2, max_wait=0.0)
+        writer._write(batch)
+        db.session.remove()
+
+        stored = [oid for oid in db.session.execute(db.select(Order.id)).scalars() if oid not in seeded]
+        assert batch[0][1].result()["order_id"] in stored
+        assert batch[1][1].exception() is not None, "the duplicate-line cart should be rejected"
+        assert len(stored) == 1, f"expected only the valid order, found orders {stored}"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v", "-s"]))
@@ -16,9 +16,25 @@ export const apiClient = axios.create({
   },
 });
 
+// Read-your-writes with read replicas: after a write the API returns X-DB-Primary-Until,
+// and sending it back keeps this client's reads on the primary on every backend worker
+const PIN_HEADER = 'X-DB-Primary-Until';
+let primaryUntil: string | null = null;
+
+apiClient.interceptors.request.use((config) => {
+  if (primaryUntil && Number(primaryUntil) * 1000 > Date.now()) {
+    config.headers.set(PIN_HEADER, primaryUntil);
+  }
+  return config;
+});
+
 // Response interceptor for error handling
 apiClient.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const until = response.headers[PIN_HEADER.toLowerCase()];
+    if (until) primaryUntil = String(until);
+    return response;
+  },
   (error) => {
     // Log error for debugging
     console.error('API Error:', error.response?.data || error.message);